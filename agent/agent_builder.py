@@ -1,9 +1,9 @@
 from typing import List
-from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.agents import create_tool_calling_agent, AgentExecutor
 from .config import OPENAI_MODEL, VERBOSE
 from .prompts import SYSTEM
+from .llm_registry import get_llm
 from .lc_tools import (
     make_spend_summary_tool,
     make_spend_by_category_tool,
@@ -37,6 +37,6 @@ def build_agent() -> AgentExecutor:
     MessagesPlaceholder("agent_scratchpad"),
 ])
 
-    llm = ChatOpenAI(model=OPENAI_MODEL, temperature=0)
+    llm = get_llm(OPENAI_MODEL)
     agent = create_tool_calling_agent(llm, tools, prompt)
     return AgentExecutor(agent=agent, tools=tools, verbose=VERBOSE)
@@ -1,6 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .routes.chat import router as chat_router
+from .routes.chat import router as chat_router, get_agent
+from .config import MCP_URL, MCP_POOL_SIZE
+from .llm_registry import aclose as close_llm_clients
+from .mcp_pool import close_pools, get_pool
+from .utils.logging import get_logger
+
+log = get_logger("agent.app")
 
 app = FastAPI(title="myPayments Agent API")
 
@@ -15,6 +21,20 @@ app.add_middleware(
 
 app.include_router(chat_router)
 
+@app.on_event("startup")
+async def _warm():
+    get_agent()                            # LLM client, prompt and executor, before the first request
+    if MCP_POOL_SIZE > 0:
+        try:
+            await get_pool(MCP_URL).warm(1)
+        except Exception as e:             # the MCP server may start after us; the first call connects
+            log.warning("could not open an MCP session at startup: %s", e)
+
+@app.on_event("shutdown")
+async def _close_clients():
+    await close_pools()
+    await close_llm_clients()
+
 @app.get("/health")
 async def health():
     return {"ok": True}
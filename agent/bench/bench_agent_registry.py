@@ -0,0 +1,99 @@
+"""Per-turn cost of rebuilding LLM clients and agent executors vs the cached registry (agent/llm_registry.py).
+
+    python -m agent.bench.bench_agent_registry [--turns 50] [--latency-ms 5]
+
+A read turn of the multi-agent graph is orchestrate -> data step -> summarize: before the registry it
+built three ChatOpenAI clients (each with its own connection pool) plus the data step's prompt and
+AgentExecutor. Measured here per turn, without tool calls:
+  build   CPU and wall time of constructing those objects, old way vs registry lookups
+  llm     three sequential LLM requests against a local OpenAI-compatible stand-in (plain HTTP, so
+          only the TCP connect is saved; against the real API each fresh client also pays TLS)
+Needs the agent dependencies (langchain, langchain-openai).
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Callable, List, Tuple
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from mcpServer.bench.standin import ServedStandIn
+
+
+def fake_openai(latency_ms: float) -> Starlette:
+    async def completions(req: Request) -> JSONResponse:
+        body = await req.json()
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        return JSONResponse({
+            "id": "chatcmpl-bench", "object": "chat.completion", "created": 0, "model": body.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "{}"}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        })
+    return Starlette(routes=[Route("/v1/chat/completions", completions, methods=["POST"])])
+
+
+def _timed(fn: Callable[[], None], turns: int) -> Tuple[List[float], float]:
+    wall: List[float] = []
+    cpu0 = time.process_time()
+    for _ in range(turns):
+        t0 = time.perf_counter()
+        fn()
+        wall.append((time.perf_counter() - t0) * 1000)
+    return wall, (time.process_time() - cpu0) * 1000 / turns
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--turns", type=int, default=50)
+    ap.add_argument("--latency-ms", type=float, default=5.0, help="stand-in LLM latency per request")
+    args = ap.parse_args()
+    with ServedStandIn(fake_openai(args.latency_ms)) as llm_api:
+        os.environ["OPENAI_API_KEY"] = os.environ.get("OPENAI_API_KEY") or "bench"
+        os.environ["OPENAI_API_BASE"] = os.environ["OPENAI_BASE_URL"] = f"http://{llm_api.host}:{llm_api.port}/v1"
+        from langchain_openai import ChatOpenAI
+        from agent.llm_registry import get_llm, registry_stats
+        from agent_multi.nodes import data_agent
+
+        tools = data_agent._tools_for_operation("transactions.list")
+        model = "gpt-4o-mini"
+
+        def build_old():
+            ChatOpenAI(model=model, temperature=0)                      # orchestrate
+            data_agent._build_llm_agent(tools, model)                   # data step (its own ChatOpenAI)
+            ChatOpenAI(model=model, temperature=0)                      # summarize
+
+        def build_new():
+            get_llm(model)
+            data_agent._agent_for(tools, model)
+            get_llm(model)
+
+        def llm_old():
+            for _ in range(3):
+                ChatOpenAI(model=model, temperature=0).invoke("hi")
+
+        def llm_new():
+            for _ in range(3):
+                get_llm(model).invoke("hi")
+
+        print(f"{args.turns} turns, stand-in LLM latency {args.latency_ms} ms")
+        print(f"{'part':<8} {'mode':<10} {'p50 ms':>8} {'mean ms':>8} {'cpu ms/turn':>12}")
+        for part, old, new in (("build", build_old, build_new), ("llm", llm_old, llm_new)):
+            means = {}
+            for mode, fn in (("rebuild", old), ("registry", new)):
+                fn()                                                    # warm-up (imports, first build)
+                wall, cpu = _timed(fn, args.turns)
+                means[mode] = (statistics.mean(wall), cpu)
+                print(f"{part:<8} {mode:<10} {statistics.median(wall):>8.2f} {means[mode][0]:>8.2f} {cpu:>12.2f}")
+            print(f"{part:<8} saved {means['rebuild'][0] - means['registry'][0]:.2f} ms and "
+                  f"{means['rebuild'][1] - means['registry'][1]:.2f} ms CPU per turn")
+        print(f"registry: {registry_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Per-tool-call latency: an MCP session per call (the old lc_tools pattern), the agent's session pool,
+and the pool over the in-process transport (MCP_URL=inproc://).
+
+    python -m agent.bench.bench_mcp_sessions [--calls 300] [--concurrency 4] [--latency-ms 1] [--pool-size 8]
+
+The MCP server (streamable HTTP) and the stand-in upstream both run on real sockets in background
+threads of this process, so the client, the server and the upstream share one interpreter: absolute
+numbers are higher than across machines, the difference between the modes is what matters. The
+inproc mode calls the same server object over fastmcp's in-memory transport.
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from agent.mcp_bridge import MCPBridge
+from agent.mcp_pool import MCPSessionPool, close_pools
+from mcpServer.bench.standin import ServedStandIn, StandInData, build_app
+from mcpServer.payments_api import client as client_mod
+from mcpServer.payments_api.client import PaymentsApiClient
+from mcpServer.runtime import http_app
+from mcpServer.tools import analytics, customers, transactions  # noqa: F401  (registers tools)
+
+HEADERS = {"x-mcp-api-key": "lovethisapp"}
+
+
+def _pct(samples: List[float], p: float) -> float:
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(round(p / 100.0 * (len(s) - 1))))]
+
+
+async def _drive(call: Callable[[int], Awaitable[None]], calls: int, concurrency: int) -> List[float]:
+    samples: List[float] = []
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with sem:
+            t0 = time.perf_counter()
+            await call(i)
+            samples.append((time.perf_counter() - t0) * 1000)
+
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    return samples
+
+
+OPS = {
+    "get_customer": lambda i: ("get_customer", {"id": 1 + i % 50}),
+    "search_transactions": lambda i: ("search_transactions", {"customerId": 1 + i % 50, "size": 5}),
+}
+
+
+async def run(url: str, modes: List[str], calls: int, concurrency: int, pool_size: int) -> Dict[str, Dict[str, List[float]]]:
+    pool = MCPSessionPool(url, size=pool_size)
+    out: Dict[str, Dict[str, List[float]]] = {name: {} for name in OPS}
+    try:
+        for name, op in OPS.items():
+            async def per_call(i: int):
+                async with MCPBridge(url) as mcp:
+                    await mcp.call(*op(i), headers=HEADERS)
+
+            async def pooled(i: int):
+                await pool.call(*op(i), headers=HEADERS)
+
+            for mode in modes:
+                call = per_call if mode == "per-call" else pooled
+                await _drive(call, min(30, calls), concurrency)  # warm-up
+                out[name][mode] = await _drive(call, calls, concurrency)
+    finally:
+        await pool.close()
+        await close_pools()
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--calls", type=int, default=300)
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--latency-ms", type=float, default=1.0, help="stand-in server-side latency per request")
+    ap.add_argument("--pool-size", type=int, default=8)
+    args = ap.parse_args()
+    logging.getLogger("mcpServer").setLevel(logging.WARNING)
+    opts = (args.calls, args.concurrency, args.pool_size)
+    with ServedStandIn(build_app(StandInData.from_sql(), latency_ms=args.latency_ms)) as upstream:
+        # the upstream client belongs to the loop that serves the tools: one per phase
+        client_mod._shared = PaymentsApiClient(base_url=upstream.base_url)
+        with ServedStandIn(http_app()) as server:
+            results = asyncio.run(run(f"http://{server.host}:{server.port}/mcp", ["per-call", "pooled"], *opts))
+        client_mod._shared = PaymentsApiClient(base_url=upstream.base_url)
+        inproc = asyncio.run(run("inproc://", ["inproc"], *opts))
+    print(f"{args.concurrency} concurrent, {args.calls} calls per tool and mode")
+    print(f"{'tool':<20} {'mode':<12} {'p50 ms':>8} {'p99 ms':>8} {'mean ms':>8}")
+    for name in OPS:
+        samples = {**results[name], **inproc[name]}
+        means = {mode: statistics.mean(s) for mode, s in samples.items()}
+        for mode, s in samples.items():
+            print(f"{name:<20} {mode:<12} {_pct(s, 50):>8.2f} {_pct(s, 99):>8.2f} {means[mode]:>8.2f}")
+        print(f"{name:<20} pooled saves {means['per-call'] - means['pooled']:.2f} ms per call "
+              f"({1 - means['pooled'] / means['per-call']:.0%}); inproc saves {means['pooled'] - means['inproc']:.2f} ms "
+              f"more ({1 - means['inproc'] / means['pooled']:.0%} of pooled HTTP)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,25 @@
 import os
 
 # MCP
-MCP_URL = os.getenv("MCP_URL", "http://localhost:8765/mcp/")
+MCP_URL = os.getenv("MCP_URL", "http://localhost:8765/mcp/")  # inproc:// = run the MCP server inside this process
 MCP_API_KEY = os.getenv("MCP_API_KEY", "lovethisapp") 
 
 # LLM
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")  # required for LangChain OpenAI
+# One keep-alive HTTP pool for every ChatOpenAI in the process (agent/llm_registry.py)
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))  # seconds an idle LLM connection lives
+LLM_TIMEOUT_SECS = float(os.getenv("LLM_TIMEOUT_SECS", "60"))
 
 # Behavior
 MAX_WINDOW_DAYS = int(os.getenv("MAX_WINDOW_DAYS", "90"))
+BATCH_MAX_IDS = int(os.getenv("BATCH_MAX_IDS", "100"))  # ids per batch tool call; same variable as the server's cap
+PAGINATE_PAGE_SIZE = int(os.getenv("PAGINATE_PAGE_SIZE", "200"))  # largest search `limit`; same variable as the server's cap
 VERBOSE = bool(int(os.getenv("VERBOSE", "1")))
+
+# MCP sessions (agent/mcp_pool.py): initialized sessions shared by all tools in the process
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "8"))                             # 0 = a new session per tool call
+MCP_POOL_CALL_TIMEOUT_SECS = float(os.getenv("MCP_POOL_CALL_TIMEOUT_SECS", "60"))  # per tool call (and per wait for a session)
+MCP_POOL_CONNECT_TIMEOUT_SECS = float(os.getenv("MCP_POOL_CONNECT_TIMEOUT_SECS", "10"))
+MCP_POOL_PING_SECS = float(os.getenv("MCP_POOL_PING_SECS", "30"))                # ping sessions idle longer than this before reuse
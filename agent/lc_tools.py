@@ -1,8 +1,11 @@
-from typing import Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field, ConfigDict, AliasChoices
 from langchain.tools import StructuredTool
-from .mcp_bridge import MCPBridge
-from .config import MCP_URL, MCP_API_KEY
+from .mcp_pool import call_tool
+from .config import MCP_API_KEY, BATCH_MAX_IDS, PAGINATE_PAGE_SIZE
+from .utils.logging import get_logger
+
+log = get_logger("agent.tools")
 
 # ---------- Pydantic Schemas (inputs to tools) ----------
 
@@ -18,6 +21,7 @@ class SpendByCategoryIn(BaseModel):
     customerId: int = Field(..., ge=1)
     from_: str = Field(..., alias="from", validation_alias=AliasChoices("from", "from_"))
     to: str
+    format: Optional[Literal["rows", "columnar"]] = None
 
 class SearchTransactionsIn(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
@@ -28,8 +32,11 @@ class SearchTransactionsIn(BaseModel):
     from_: Optional[str] = Field(default=None, alias="from", validation_alias=AliasChoices("from", "from_"))
     to: Optional[str] = None
     page: int = 0
-    size: int = 20
+    size: int = 20                          # not sent when only `limit` is given: the page is that many rows
+    limit: Optional[int] = Field(default=None, ge=1, le=PAGINATE_PAGE_SIZE)
     sort: str = "createdAt,desc"
+    fields: Optional[List[str]] = None      # e.g. ["amount","status","createdAt"]; id is always returned
+    format: Optional[Literal["rows", "columnar"]] = None   # columnar: content as {columns, rows, dictionaries}
 
 def _headers() -> Optional[dict]:
     return {"x-mcp-api-key": MCP_API_KEY} if MCP_API_KEY else None
@@ -39,8 +46,7 @@ def _headers() -> Optional[dict]:
 def make_spend_summary_tool():
     async def _run(**kwargs):
         data = SpendSummaryIn.model_validate(kwargs)  # validate kwargs into model
-        async with MCPBridge(MCP_URL) as mcp:
-            return await mcp.call("spend_summary", data.model_dump(by_alias=True), headers=_headers())
+        return await call_tool("spend_summary", data.model_dump(by_alias=True), headers=_headers())
     return StructuredTool.from_function(
         coroutine=_run,
         name="spend_summary",
@@ -51,27 +57,75 @@ def make_spend_summary_tool():
 def make_spend_by_category_tool():
     async def _run(**kwargs):
         data = SpendByCategoryIn.model_validate(kwargs)
-        async with MCPBridge(MCP_URL) as mcp:
-            return await mcp.call("spend_by_category", data.model_dump(by_alias=True), headers=_headers())
+        return await call_tool("spend_by_category", data.model_dump(by_alias=True, exclude_none=True), headers=_headers())
     return StructuredTool.from_function(
         coroutine=_run,
         name="spend_by_category",
-        description="Category-wise totals. Use keys: customerId, from, to.",
+        description="Category-wise totals. Use keys: customerId, from, to. Optional format=\"columnar\" returns items as "
+                    "{columns, rows, dictionaries} (string cells that are integers index dictionaries[column]).",
         args_schema=SpendByCategoryIn,
     )
 
+class CohortAnalyticsIn(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+    customerIds: Optional[List[int]] = None
+    from_: str = Field(..., alias="from", validation_alias=AliasChoices("from", "from_"))
+    to: str
+    category: Optional[str] = None
+    currency: Optional[str] = None
+    topN: int = 5
+
+def make_cohort_analytics_tool():
+    async def _run(**kwargs):
+        data = CohortAnalyticsIn.model_validate(kwargs)
+        return await call_tool("cohort_analytics", data.model_dump(by_alias=True, exclude_none=True), headers=_headers())
+    return StructuredTool.from_function(
+        coroutine=_run,
+        name="cohort_analytics",
+        description="Spend across MANY customers in one call (per-customer/category tables, top-N). "
+                    "Use keys: customerIds (list, optional = all customers), from, to, optional category/currency, topN.",
+        args_schema=CohortAnalyticsIn,
+    )
+
 def make_search_transactions_tool():
     async def _run(**kwargs):
         data = SearchTransactionsIn.model_validate(kwargs)
-        async with MCPBridge(MCP_URL) as mcp:
-            return await mcp.call("search_transactions", data.model_dump(by_alias=True, exclude_none=True), headers=_headers())
+        exclude = {"size"} if data.limit is not None and "size" not in data.model_fields_set else None
+        payload = data.model_dump(by_alias=True, exclude_none=True, exclude=exclude)
+        return await call_tool("search_transactions", payload, headers=_headers())
     return StructuredTool.from_function(
         coroutine=_run,
         name="search_transactions",
-        description="Search transactions by filters (customerId/status/category/currency, from/to, page/size).",
+        description="Search transactions by filters (customerId/status/category/currency, from/to, page/size). "
+                    "For the last N transactions pass limit=N (sort createdAt,desc). Optional fields: list of keys "
+                    "to return per row (id, customerId, amount, currency, category, status, createdAt, description). "
+                    "Optional format=\"columnar\" for long pages: content as {columns, rows, dictionaries}.",
         args_schema=SearchTransactionsIn,
     )
 
+class SearchTransactionsAllIn(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+    customerId: Optional[int] = None
+    status: Optional[str] = None
+    category: Optional[str] = None
+    currency: Optional[str] = None
+    from_: Optional[str] = Field(default=None, alias="from", validation_alias=AliasChoices("from", "from_"))
+    to: Optional[str] = None
+    sort: str = "createdAt,desc"
+    maxRows: Optional[int] = None   # server default/cap when omitted
+
+def make_search_transactions_all_tool():
+    async def _run(**kwargs):
+        data = SearchTransactionsAllIn.model_validate(kwargs)
+        return await call_tool("search_transactions_all", data.model_dump(by_alias=True, exclude_none=True), headers=_headers())
+    return StructuredTool.from_function(
+        coroutine=_run,
+        name="search_transactions_all",
+        description="Return ALL transactions matching the filters in one call (no page/size; optional maxRows cap). "
+                    "Prefer this over paging search_transactions when the question needs every match.",
+        args_schema=SearchTransactionsAllIn,
+    )
+
 class GetCustomerIn(BaseModel):
     # allow using either alias or field name
     model_config = ConfigDict(populate_by_name=True)
@@ -81,22 +135,36 @@ class GetCustomerIn(BaseModel):
         alias="id",
         validation_alias=AliasChoices("id", "customerId")
     )
+    fields: Optional[List[str]] = None
+
 
 def make_get_customer_tool():
     async def _run(**kwargs):
         data = GetCustomerIn.model_validate(kwargs)
-        payload = data.model_dump(by_alias=True)
-    
-        async with MCPBridge(MCP_URL) as mcp:
-            print("----Payload ----->", payload)
-            return await mcp.call("get_customer", payload, headers=_headers())
+        payload = data.model_dump(by_alias=True, exclude_none=True)
+        log.debug("get_customer payload %s", payload)
+        return await call_tool("get_customer", payload, headers=_headers())
     return StructuredTool.from_function(
         coroutine=_run,
         name="get_customer",
-        description="Get customer details by customerId.",
+        description="Get customer details by customerId. Optional fields: keys to return (id, fullName, email, phoneNumber).",
         args_schema=GetCustomerIn,
     )
 
+class GetCustomersBatchIn(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=BATCH_MAX_IDS)
+
+def make_get_customers_batch_tool():
+    async def _run(**kwargs):
+        data = GetCustomersBatchIn.model_validate(kwargs)
+        return await call_tool("get_customers_batch", data.model_dump(by_alias=True), headers=_headers())
+    return StructuredTool.from_function(
+        coroutine=_run,
+        name="get_customers_batch",
+        description="Get details for several customers at once. Use key: ids (list of customerIds).",
+        args_schema=GetCustomersBatchIn,
+    )
+
 class CreateCustomerIn(BaseModel):
     fullName: str
     email: str
@@ -105,8 +173,7 @@ class CreateCustomerIn(BaseModel):
 def make_create_customer_tool():
     async def _run(**kwargs):
         data = CreateCustomerIn.model_validate(kwargs)
-        async with MCPBridge(MCP_URL) as mcp:
-            return await mcp.call("create_customer", data.model_dump(by_alias=True), headers=_headers())
+        return await call_tool("create_customer", data.model_dump(by_alias=True), headers=_headers())
     return StructuredTool.from_function(
         coroutine=_run,
         name="create_customer",
@@ -120,12 +187,12 @@ def make_create_customer_tool():
 
 class GetPaymentIn(BaseModel):
     id: int = Field(..., ge=1)
+    fields: Optional[List[str]] = None
 
 def make_get_payment_tool():
     async def _run(**kwargs):
         data = GetPaymentIn.model_validate(kwargs)
-        async with MCPBridge(MCP_URL) as mcp:
-            return await mcp.call("get_payment", data.model_dump(by_alias=True), headers=_headers())
+        return await call_tool("get_payment", data.model_dump(by_alias=True, exclude_none=True), headers=_headers())
     return StructuredTool.from_function(
         coroutine=_run,
         name="get_payment",
@@ -135,16 +202,16 @@ def make_get_payment_tool():
 
 class GetPaymentByTransactionIn(BaseModel):
     transactionId: int = Field(..., ge=1)
+    fields: Optional[List[str]] = None
 
 def make_get_payment_by_transaction_tool():
     async def _run(**kwargs):
         data = GetPaymentByTransactionIn.model_validate(kwargs)
-        async with MCPBridge(MCP_URL) as mcp:
-            return await mcp.call(
-                "get_payment_by_transaction",
-                data.model_dump(by_alias=True),
-                headers=_headers()
-            )
+        return await call_tool(
+            "get_payment_by_transaction",
+            data.model_dump(by_alias=True, exclude_none=True),
+            headers=_headers()
+        )
     return StructuredTool.from_function(
         coroutine=_run,
         name="get_payment_by_transaction",
@@ -152,6 +219,21 @@ def make_get_payment_by_transaction_tool():
         args_schema=GetPaymentByTransactionIn,
     )
 
+class GetPaymentsByTransactionsIn(BaseModel):
+    transactionIds: List[int] = Field(..., min_length=1, max_length=BATCH_MAX_IDS)
+    fields: Optional[List[str]] = None
+
+def make_get_payments_by_transactions_tool():
+    async def _run(**kwargs):
+        data = GetPaymentsByTransactionsIn.model_validate(kwargs)
+        return await call_tool("get_payments_by_transactions", data.model_dump(by_alias=True, exclude_none=True), headers=_headers())
+    return StructuredTool.from_function(
+        coroutine=_run,
+        name="get_payments_by_transactions",
+        description="Get the payment for each of several transactions in ONE call. Use key: transactionIds (list).",
+        args_schema=GetPaymentsByTransactionsIn,
+    )
+
 class MakePaymentIn(BaseModel):
     transactionId: int = Field(..., ge=1)
     method: str
@@ -160,8 +242,7 @@ class MakePaymentIn(BaseModel):
 def make_make_payment_tool():
     async def _run(**kwargs):
         data = MakePaymentIn.model_validate(kwargs)
-        async with MCPBridge(MCP_URL) as mcp:
-            return await mcp.call("make_payment", data.model_dump(by_alias=True), headers=_headers())
+        return await call_tool("make_payment", data.model_dump(by_alias=True), headers=_headers())
     return StructuredTool.from_function(
         coroutine=_run,
         name="make_payment",
@@ -221,12 +302,12 @@ def make_make_payment_tool():
 
 class GetTransactionDetailIn(BaseModel):
     id: int = Field(..., ge=1)
+    fields: Optional[List[str]] = None
 
 def make_get_transaction_detail_tool():
     async def _run(**kwargs):
         data = GetTransactionDetailIn.model_validate(kwargs)
-        async with MCPBridge(MCP_URL) as mcp:
-            return await mcp.call("get_transaction", data.model_dump(by_alias=True), headers=_headers())
+        return await call_tool("get_transaction", data.model_dump(by_alias=True, exclude_none=True), headers=_headers())
     return StructuredTool.from_function(
         coroutine=_run,
         name="get_transaction_detail",
@@ -234,6 +315,20 @@ def make_get_transaction_detail_tool():
         args_schema=GetTransactionDetailIn,
     )
 
+class GetTransactionsBatchIn(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=BATCH_MAX_IDS)
+
+def make_get_transactions_batch_tool():
+    async def _run(**kwargs):
+        data = GetTransactionsBatchIn.model_validate(kwargs)
+        return await call_tool("get_transactions_batch", data.model_dump(by_alias=True), headers=_headers())
+    return StructuredTool.from_function(
+        coroutine=_run,
+        name="get_transactions_batch",
+        description="Get details for several transactions at once. Use key: ids (list of transactionIds).",
+        args_schema=GetTransactionsBatchIn,
+    )
+
 #create_transaction
 class CreateTransactionIn(BaseModel):
     customerId: int = Field(..., ge=1)
@@ -246,8 +341,7 @@ class CreateTransactionIn(BaseModel):
 def make_create_transaction_tool():
     async def _run(**kwargs):
         data = CreateTransactionIn.model_validate(kwargs)
-        async with MCPBridge(MCP_URL) as mcp:
-            return await mcp.call("create_transaction", data.model_dump(by_alias=True), headers=_headers())
+        return await call_tool("create_transaction", data.model_dump(by_alias=True), headers=_headers())
     return StructuredTool.from_function(
         coroutine=_run,
         name="create_transaction",
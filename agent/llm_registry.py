@@ -0,0 +1,85 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+from .config import OPENAI_MODEL, LLM_MAX_CONNECTIONS, LLM_KEEPALIVE_EXPIRY, LLM_TIMEOUT_SECS
+from .utils.logging import get_logger
+
+# Process-wide cache of what the agents used to rebuild on every request or graph step: one
+# ChatOpenAI per (model, temperature) and one AgentExecutor (LLM, escaped tool inventory, prompt)
+# per key such as ("data", tool names, model). Every ChatOpenAI shares the same keep-alive httpx
+# clients, so node after node of a turn reuses the connection to the LLM API instead of
+# handshaking per node. Executors and models hold no per-run state, so concurrent requests share them.
+
+log = get_logger("agent.llm_registry")
+
+_lock = threading.Lock()
+_llms: Dict[Tuple[str, float], ChatOpenAI] = {}
+_executors: Dict[Hashable, Any] = {}
+_http: Optional[httpx.Client] = None
+_ahttp: Optional[httpx.AsyncClient] = None
+_stats = {"builds": 0, "hits": 0, "buildMs": 0.0}
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS,
+                        keepalive_expiry=LLM_KEEPALIVE_EXPIRY)
+
+
+def _http_clients() -> Tuple[httpx.Client, httpx.AsyncClient]:
+    global _http, _ahttp
+    if _http is None:
+        _http = httpx.Client(limits=_limits(), timeout=LLM_TIMEOUT_SECS)
+        _ahttp = httpx.AsyncClient(limits=_limits(), timeout=LLM_TIMEOUT_SECS)
+    return _http, _ahttp
+
+
+def get_llm(model: str = OPENAI_MODEL, temperature: float = 0.0) -> ChatOpenAI:
+    key = (model, float(temperature))
+    llm = _llms.get(key)
+    if llm is None:
+        with _lock:
+            llm = _llms.get(key)
+            if llm is None:
+                http, ahttp = _http_clients()
+                llm = _llms[key] = ChatOpenAI(model=model, temperature=temperature,
+                                              http_client=http, http_async_client=ahttp)
+    return llm
+
+
+def get_or_build(key: Hashable, build: Callable[[], Any]) -> Any:
+    """The executor cached under `key`, built by `build()` the first time it is asked for."""
+    agent = _executors.get(key)
+    if agent is not None:
+        _stats["hits"] += 1
+        return agent
+    with _lock:
+        agent = _executors.get(key)
+        if agent is None:
+            t0 = time.perf_counter()
+            agent = _executors[key] = build()
+            _stats["builds"] += 1
+            _stats["buildMs"] += (time.perf_counter() - t0) * 1000
+            log.debug("built agent %s", key)
+        else:
+            _stats["hits"] += 1
+    return agent
+
+
+def registry_stats() -> Dict[str, Any]:
+    return {"llms": len(_llms), "executors": len(_executors), **_stats, "buildMs": round(_stats["buildMs"], 1)}
+
+
+async def aclose() -> None:
+    """Drop the cache and close the shared LLM connections (app shutdown)."""
+    global _http, _ahttp
+    with _lock:
+        _llms.clear()
+        _executors.clear()
+        http, ahttp, _http, _ahttp = _http, _ahttp, None, None
+    if http is not None:
+        http.close()
+        await ahttp.aclose()
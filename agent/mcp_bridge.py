@@ -1,6 +1,19 @@
 from typing import Any, Dict, Optional
 from fastmcp import Client
 
+INPROC = "inproc://"
+
+def client_target(url: str):
+    """What fastmcp.Client connects to: the URL, or for inproc:// the MCP server object itself.
+
+    In-process calls go over fastmcp's in-memory transport: the same MCP messages, tool schemas,
+    middleware and `assert_mcp_auth` checks, without HTTP in between.
+    """
+    if url.startswith(INPROC):
+        from mcpServer.app import inproc_server
+        return inproc_server()
+    return url
+
 class MCPBridge:
     """Thin async wrapper around fastmcp.Client with simple helpers."""
 
@@ -9,7 +22,7 @@ class MCPBridge:
         self._client: Optional[Client] = None
 
     async def __aenter__(self):
-        self._client = Client(self.url)
+        self._client = Client(client_target(self.url))
         await self._client.__aenter__()
         return self
 
@@ -0,0 +1,255 @@
+import asyncio
+import contextlib
+import time
+import weakref
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from fastmcp import Client
+from fastmcp.exceptions import ToolError
+from mcp.shared.exceptions import McpError
+
+from .config import (
+    MCP_URL, MCP_POOL_SIZE, MCP_POOL_CALL_TIMEOUT_SECS, MCP_POOL_CONNECT_TIMEOUT_SECS, MCP_POOL_PING_SECS,
+)
+from .mcp_bridge import INPROC, MCPBridge, client_target
+from .utils.logging import get_logger
+
+# Long-lived, initialized MCP sessions shared by every LangChain tool in the process. A call checks
+# out an idle session (opening one while fewer than `size` exist, otherwise waiting), so the MCP
+# initialize handshake and the tools/list that fastmcp sends before the first structured result are
+# paid once per session instead of once per tool call.
+# Health: a session idle for more than MCP_POOL_PING_SECS is pinged before reuse; a failed ping, or
+# a call failing with anything but a tool error or an MCP error response, closes the session and the
+# next call opens a fresh one. A failed call is not retried, since it may have been a write.
+# fastmcp sessions run on a background task of the event loop that opened them, so there is one
+# pool per (url, loop).
+# MCP_URL=inproc:// hosts the MCP server in this process and connects over fastmcp's in-memory
+# transport; its background work and upstream pool live until close_pools().
+
+log = get_logger("agent.mcp_pool")
+
+# Tool calls made in the current context: [{tool, args, ms, ok}] (see trace_tool_calls)
+_TRACE: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("mcp_tool_trace", default=None)
+
+
+@contextlib.contextmanager
+def trace_tool_calls():
+    """Collect the tool calls made inside the block, like agent_multi's MCPBridge.calls."""
+    calls: List[Dict[str, Any]] = []
+    token = _TRACE.set(calls)
+    try:
+        yield calls
+    finally:
+        _TRACE.reset(token)
+
+
+def _record(name: str, args: Dict[str, Any], t0: float, ok: bool) -> None:
+    trace = _TRACE.get()
+    if trace is not None:
+        trace.append({"tool": name, "args": args, "ms": round((time.perf_counter() - t0) * 1000, 1), "ok": ok})
+
+
+class _Session:
+    __slots__ = ("client", "last_used", "calls")
+
+    def __init__(self, client: Client):
+        self.client = client
+        self.last_used = time.monotonic()
+        self.calls = 0
+
+
+class MCPSessionPool:
+    def __init__(
+        self,
+        url: str = MCP_URL,
+        size: int = MCP_POOL_SIZE,
+        call_timeout: float = MCP_POOL_CALL_TIMEOUT_SECS,
+        connect_timeout: float = MCP_POOL_CONNECT_TIMEOUT_SECS,
+        ping_after: float = MCP_POOL_PING_SECS,
+    ):
+        self.url = url
+        self.size = max(1, size)
+        self.call_timeout = call_timeout
+        self.connect_timeout = connect_timeout
+        self.ping_after = ping_after
+        self._idle: List[_Session] = []
+        self._open = 0                                  # sessions idle + checked out
+        self._available = asyncio.Condition()
+        self._closed = False
+        self.opened = self.reconnects = self.pings = self.waits = 0
+        self.calls = self.errors = 0
+
+    # --- sessions ---
+
+    async def _connect(self) -> _Session:
+        if self.url.startswith(INPROC):
+            await _enter_inproc()
+        client = Client(client_target(self.url), timeout=self.call_timeout, init_timeout=self.connect_timeout)
+        await client.__aenter__()
+        self.opened += 1
+        return _Session(client)
+
+    async def _discard(self, s: _Session) -> None:
+        async with self._available:
+            self._open -= 1
+            self._available.notify()
+        with contextlib.suppress(Exception):
+            await s.client.close()
+
+    async def _healthy(self, s: _Session) -> bool:
+        if not s.client.is_connected():
+            return False
+        if time.monotonic() - s.last_used < self.ping_after:
+            return True
+        self.pings += 1
+        try:
+            return await asyncio.wait_for(s.client.ping(), self.connect_timeout)
+        except Exception:
+            return False
+
+    async def _checkout(self) -> _Session:
+        deadline = time.monotonic() + self.call_timeout
+        while True:
+            async with self._available:
+                if self._closed:
+                    raise RuntimeError("MCP session pool is closed")
+                if not self._idle and self._open >= self.size:
+                    self.waits += 1
+                    try:
+                        await asyncio.wait_for(
+                            self._available.wait_for(lambda: self._idle or self._open < self.size or self._closed),
+                            max(0.0, deadline - time.monotonic()))
+                    except asyncio.TimeoutError:
+                        raise TimeoutError(f"no MCP session free within {self.call_timeout}s "
+                                           f"({self.size} in use)") from None
+                    continue
+                s = self._idle.pop() if self._idle else None
+                if s is None:
+                    self._open += 1                     # reserve the slot before connecting
+            if s is None:
+                try:
+                    return await self._connect()
+                except BaseException:
+                    async with self._available:
+                        self._open -= 1
+                        self._available.notify()
+                    raise
+            if await self._healthy(s):
+                return s
+            self.reconnects += 1
+            log.info("mcp session to %s went stale; reconnecting", self.url)
+            await self._discard(s)
+
+    async def _checkin(self, s: _Session) -> None:
+        s.last_used = time.monotonic()
+        async with self._available:
+            if self._closed:
+                self._open -= 1
+            else:
+                self._idle.append(s)                    # LIFO: the warmest session goes out next
+                self._available.notify()
+                return
+        with contextlib.suppress(Exception):
+            await s.client.close()
+
+    # --- calls ---
+
+    async def call(self, name: str, input_payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None,
+                   timeout: Optional[float] = None):
+        """Call an MCP tool on a pooled session; same payload and result shape as MCPBridge.call."""
+        payload: Dict[str, Any] = {"input": input_payload}
+        if headers:
+            payload["headers"] = headers
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            s = await self._checkout()
+            try:
+                result = await s.client.call_tool(name, payload, timeout=timeout or self.call_timeout)
+            except (ToolError, McpError):
+                await self._checkin(s)                  # the tool failed or timed out; the session is fine
+                raise
+            except BaseException:
+                await self._discard(s)
+                raise
+            s.calls += 1
+            await self._checkin(s)
+            ok = True
+            return result.structured_content or result.data or (result.content[0].text if result.content else None)
+        finally:
+            self.calls += 1
+            self.errors += not ok
+            _record(name, input_payload, t0, ok)
+
+    async def warm(self, n: Optional[int] = None) -> None:
+        """Open up to `n` (default: all) sessions ahead of the first call."""
+        sessions = []
+        try:
+            for _ in range(min(self.size, n or self.size)):
+                sessions.append(await self._checkout())
+        finally:
+            for s in sessions:
+                await self._checkin(s)
+
+    async def close(self) -> None:
+        async with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._available.notify_all()
+        for s in idle:
+            with contextlib.suppress(Exception):
+                await s.client.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url, "size": self.size, "open": self._open, "idle": len(self._idle),
+            "opened": self.opened, "reconnects": self.reconnects, "pings": self.pings, "waits": self.waits,
+            "calls": self.calls, "errors": self.errors,
+        }
+
+
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, MCPSessionPool]]" = weakref.WeakKeyDictionary()
+_inproc: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, contextlib.AsyncExitStack]" = weakref.WeakKeyDictionary()
+
+
+async def _enter_inproc() -> None:
+    loop = asyncio.get_running_loop()
+    if loop not in _inproc:
+        from mcpServer.app import inproc_lifetime
+        stack = _inproc[loop] = contextlib.AsyncExitStack()
+        await stack.enter_async_context(inproc_lifetime())
+
+
+def get_pool(url: str = MCP_URL) -> MCPSessionPool:
+    """The process-wide pool for `url` on the running event loop."""
+    per_loop = _pools.setdefault(asyncio.get_running_loop(), {})
+    pool = per_loop.get(url)
+    if pool is None:
+        pool = per_loop[url] = MCPSessionPool(url)
+    return pool
+
+
+async def call_tool(name: str, input_payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None,
+                    url: str = MCP_URL):
+    """Tool call through the shared pool, or a one-off MCPBridge session when MCP_POOL_SIZE=0."""
+    if MCP_POOL_SIZE > 0:
+        return await get_pool(url).call(name, input_payload, headers=headers)
+    t0, ok = time.perf_counter(), False
+    try:
+        async with MCPBridge(url) as mcp:
+            result = await mcp.call(name, input_payload, headers=headers)
+        ok = True
+        return result
+    finally:
+        _record(name, input_payload, t0, ok)
+
+
+async def close_pools() -> None:
+    loop = asyncio.get_running_loop()
+    for pool in list(_pools.pop(loop, {}).values()):
+        await pool.close()
+    stack = _inproc.pop(loop, None)
+    if stack is not None:
+        await stack.aclose()
@@ -4,6 +4,8 @@ from pydantic import BaseModel, Field
 from langchain_core.messages import HumanMessage, AIMessage
 
 from ..agent_builder import build_agent
+from ..config import OPENAI_MODEL
+from ..llm_registry import get_or_build
 from ..utils.guards import is_in_scope
 from ..prompts import REFUSAL
 from ..session_store import SESSION_HISTORY
@@ -24,8 +26,8 @@ class ChatResponse(BaseModel):
     answer: str
 
 def get_agent():
-    # You can switch this to a singleton if you prefer.
-    return build_agent()
+    # Built once per process (and at startup, see app.py); the executor keeps no per-request state
+    return get_or_build(("chat", OPENAI_MODEL), build_agent)
 
 @router.post("/chat")
 async def chat(req: ChatRequest, agent=Depends(get_agent)):
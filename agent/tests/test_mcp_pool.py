@@ -0,0 +1,74 @@
+import asyncio
+
+import httpx
+import pytest
+from fastmcp.exceptions import ToolError
+
+from agent.mcp_pool import MCPSessionPool, close_pools, get_pool, trace_tool_calls
+from mcpServer.bench.standin import ServedStandIn, StandInData, build_app
+from mcpServer.payments_api import client as client_mod
+from mcpServer.payments_api.client import PaymentsApiClient
+from mcpServer.runtime import http_app
+from mcpServer.tools import customers, transactions  # noqa: F401  (registers tools)
+
+HEADERS = {"x-mcp-api-key": "lovethisapp"}
+
+
+@pytest.fixture
+def mcp_url(monkeypatch):
+    with ServedStandIn(build_app(StandInData.from_sql())) as upstream:
+        monkeypatch.setattr(client_mod, "_shared", PaymentsApiClient(base_url=upstream.base_url))
+        with ServedStandIn(http_app()) as server:
+            yield f"http://{server.host}:{server.port}/mcp"
+
+
+def test_sessions_are_reused_bounded_and_traced(mcp_url):
+    async def _run():
+        pool = MCPSessionPool(mcp_url, size=2)
+        with trace_tool_calls() as calls:
+            got = await asyncio.gather(*(pool.call("get_customer", {"id": i % 50 + 1}, headers=HEADERS)
+                                         for i in range(20)))
+        stats = pool.stats()
+        await pool.close()
+        return got, calls, stats
+    got, calls, stats = asyncio.run(_run())
+    assert [c["id"] for c in got] == [i % 50 + 1 for i in range(20)]
+    assert stats["opened"] == 2 and stats["calls"] == 20 and stats["waits"] > 0
+    assert len(calls) == 20 and calls[0]["tool"] == "get_customer" and all(c["ok"] for c in calls)
+
+
+def test_tool_errors_keep_the_session_and_broken_sessions_are_replaced(mcp_url):
+    async def _run():
+        pool = MCPSessionPool(mcp_url, size=1, ping_after=0)
+        await pool.warm()
+        with pytest.raises(ToolError, match="Unauthorized"):
+            await pool.call("get_customer", {"id": 1}, headers={"x-mcp-api-key": "wrong"})
+        assert pool.stats()["opened"] == 1
+        await pool._idle[0].client.close()                          # the server went away meanwhile
+        assert (await pool.call("get_customer", {"id": 2}, headers=HEADERS))["id"] == 2
+        stats = pool.stats()
+        await pool.close()
+        return stats, pool.stats()
+    stats, closed = asyncio.run(_run())
+    assert stats["opened"] == 2 and stats["reconnects"] == 1 and stats["errors"] == 1 and stats["open"] == 1
+    assert closed["open"] == closed["idle"] == 0
+
+
+def test_inproc_transport_keeps_auth_and_schemas(monkeypatch):
+    app = build_app(StandInData.from_sql())
+    api = PaymentsApiClient(base_url="http://standin/api/v1/service", transport=httpx.ASGITransport(app=app))
+    monkeypatch.setattr(client_mod, "_shared", api)
+
+    async def _run():
+        pool = get_pool("inproc://")
+        got = await pool.call("get_customer", {"id": 3, "fields": ["email"]}, headers=HEADERS)
+        with pytest.raises(ToolError, match="Unauthorized"):
+            await pool.call("get_customer", {"id": 3}, headers={"x-mcp-api-key": "wrong"})
+        with pytest.raises(ToolError, match="validation"):
+            await pool.call("get_customer", {"customer": 3}, headers=HEADERS)
+        await close_pools()
+        return got, pool.stats()
+    got, stats = asyncio.run(_run())
+    assert got["id"] == 3 and set(got) == {"id", "email"}
+    assert stats["opened"] == 1 and stats["open"] == 0
+    assert app.state.hits and client_mod._shared is None          # the hosted server's upstream pool was closed
@@ -0,0 +1,5 @@
+# JSON logs for agent and agent_multi: same queue-fed writer thread, sampling and PII redaction
+# as the MCP server (mcpServer/util/logs.py), configured by the same LOG_* environment variables.
+from mcpServer.util.logs import get_logger, log_event, logging_stats, setup_logging, shutdown_logging
+
+__all__ = ["get_logger", "log_event", "logging_stats", "setup_logging", "shutdown_logging"]
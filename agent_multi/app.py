@@ -2,6 +2,14 @@ from fastapi import FastAPI
 from .routes.chat import router as chat_router
 from .routes.approval import router as approval_router
 from .routes.session import router as session_router
+from .config import MCP_URL
+from .workflow.graph import warm_agents
+from agent.config import MCP_POOL_SIZE
+from agent.llm_registry import aclose as close_llm_clients
+from agent.mcp_pool import close_pools, get_pool
+from agent.utils.logging import get_logger
+
+log = get_logger("agent_multi.app")
 
 # python
 from fastapi.middleware.cors import CORSMiddleware
@@ -17,3 +25,17 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+
+@app.on_event("startup")
+async def _warm():
+    warm_agents()                        # LLM client, prompts and executors, before the first turn
+    if MCP_POOL_SIZE > 0:
+        try:
+            await get_pool(MCP_URL).warm(1)
+        except Exception as e:           # the MCP server may start after us; the first call connects
+            log.warning("could not open an MCP session at startup: %s", e)
+
+@app.on_event("shutdown")
+async def _close_clients():
+    await close_pools()
+    await close_llm_clients()
@@ -1,6 +1,6 @@
 import os
 
-MCP_URL     = os.getenv("MCP_URL", "http://localhost:8765/mcp/")
+MCP_URL     = os.getenv("MCP_URL", "http://localhost:8765/mcp/")  # inproc:// = run the MCP server inside this process
 MCP_API_KEY = os.getenv("MCP_API_KEY", "lovethisapp")
 
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")  # or any supported
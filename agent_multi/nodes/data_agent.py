@@ -1,6 +1,6 @@
 from __future__ import annotations
+import logging
 from typing import Dict, Any, List
-from langchain_openai import ChatOpenAI
 from langchain.agents import create_tool_calling_agent, AgentExecutor
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, BaseMessage
@@ -8,18 +8,24 @@ from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, Base
 from ..prompts import DATA_SYSTEM
 from ..tools_registry import build_read_only_tools
 from ..utils.trace import push_trace, push_tool_call
+from agent.llm_registry import get_llm, get_or_build
+from agent.mcp_pool import trace_tool_calls
+from agent.utils.logging import get_logger, log_event
+
+log = get_logger("agent_multi.data_agent")
 
 # ---------- tools & routing ----------
 _DATA_TOOLS = build_read_only_tools()
 _TOOL_BY_NAME = {t.name: t for t in _DATA_TOOLS}
 
 _OP_CANDIDATES: Dict[str, List[str]] = {
-    "customers.get":      ["get_customer"],
-    "transactions.list":  ["search_transactions"],
-    "transactions.get":   ["get_transaction_detail"],
+    "customers.get":      ["get_customer", "get_customers_batch"],
+    "transactions.list":  ["search_transactions", "search_transactions_all"],
+    "transactions.get":   ["get_transaction_detail", "get_transactions_batch"],
     "analytics.spend":    ["spend_summary"],
     "analytics.category": ["spend_by_category"],
-    "payments.get":       ["get_payment", "get_payment_by_transaction"],
+    "analytics.cohort":   ["cohort_analytics"],
+    "payments.get":       ["get_payment", "get_payment_by_transaction", "get_payments_by_transactions"],
 }
 
 def _tools_for_operation(op: str):
@@ -53,7 +59,7 @@ def _coerce_history(raw) -> List[BaseMessage]:
     return msgs
 
 def _build_llm_agent(allowed_tools, model_name: str = "gpt-4o-mini") -> AgentExecutor:
-    llm = ChatOpenAI(model=model_name, temperature=0)
+    llm = get_llm(model_name)
 
     # Escape EVERYTHING that goes into a template literal
     safe_system = _escape_braces(DATA_SYSTEM)
@@ -88,6 +94,15 @@ def _build_llm_agent(allowed_tools, model_name: str = "gpt-4o-mini") -> AgentExe
         max_iterations=20,  # single tool call for read steps
     )
 
+def _agent_for(allowed_tools, model_name: str = "gpt-4o-mini") -> AgentExecutor:
+    """The executor for this tool set and model, built on first use and shared afterwards."""
+    key = ("data", tuple(t.name for t in allowed_tools), model_name)
+    return get_or_build(key, lambda: _build_llm_agent(allowed_tools, model_name))
+
+def warm_data_agents(model_name: str = "gpt-4o-mini") -> None:
+    for op in list(_OP_CANDIDATES) + [""]:           # "" = unknown operation: every tool
+        _agent_for(_tools_for_operation(op), model_name)
+
 # ---------- main ----------
 async def run_data_step(state: Dict[str, Any]) -> Dict[str, Any]:
     push_trace(state, "data_agent", "start")
@@ -100,7 +115,7 @@ async def run_data_step(state: Dict[str, Any]) -> Dict[str, Any]:
     args = step.get("args") or {}
 
     allowed_tools = _tools_for_operation(operation)
-    agent = _build_llm_agent(allowed_tools)
+    agent = _agent_for(allowed_tools)
 
     user_text = state.get("input", "")
     # NOTE: This string is passed as the value of {input}; braces here are SAFE.
@@ -113,7 +128,8 @@ async def run_data_step(state: Dict[str, Any]) -> Dict[str, Any]:
     )
 
     chat_history = _coerce_history(state.get("messages", []))
-    res = await agent.ainvoke({"input": user_msg, "chat_history": chat_history})
+    with trace_tool_calls() as calls:
+        res = await agent.ainvoke({"input": user_msg, "chat_history": chat_history})
 
     chosen: List[str] = []
     for action, _obs in res.get("intermediate_steps", []):
@@ -127,7 +143,7 @@ async def run_data_step(state: Dict[str, Any]) -> Dict[str, Any]:
         push_trace(state, "data_agent", "warning", {"reason": "no_tool_called_for_operation", "operation": operation})
 
     output = res.get("output", res)
-    print(output)
+    log_event(log, logging.INFO, "data step result", operation=operation, tools=chosen, output=output)
 
     # Update scratch & step
     scratch = dict(state.get("scratch") or {})
@@ -136,5 +152,6 @@ async def run_data_step(state: Dict[str, Any]) -> Dict[str, Any]:
     scratch["last_result"] = output
 
     new_state = {**state, "scratch": scratch, "result": output, "step_idx": step_idx + 1}
-    push_trace(new_state, "data_agent", "ok", {"operation": operation, "chosen_tools": chosen})
+    push_trace(new_state, "data_agent", "ok", {"operation": operation, "chosen_tools": chosen,
+                                               "tool_ms": [c["ms"] for c in calls]})
     return new_state
@@ -1,7 +1,6 @@
 # agent_multi/nodes/execution_agent.py
 from __future__ import annotations
 from typing import Dict, Any, List
-from langchain_openai import ChatOpenAI
 from langchain.agents import create_tool_calling_agent, AgentExecutor
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 
@@ -9,12 +8,14 @@ from agent_multi import state
 from ..prompts import EXEC_SYSTEM
 from ..tools_registry import build_write_tools
 from ..utils.trace import push_trace, push_tool_call
+from agent.llm_registry import get_llm, get_or_build
+from agent.mcp_pool import trace_tool_calls
 
 WRITE_OPS = {"payments.make", "transactions.create", "customers.create"}
 
 def _build_exec_agent(model_name: str = "gpt-4o-mini") -> AgentExecutor:
     tools = build_write_tools()
-    llm = ChatOpenAI(model=model_name, temperature=0)
+    llm = get_llm(model_name)
     prompt = ChatPromptTemplate.from_messages([
         ("system", EXEC_SYSTEM),
         MessagesPlaceholder("chat_history", optional=True),
@@ -50,14 +51,12 @@ def _coerce_output_from_agent(res: Dict[str, Any]):
             pass
     return txt  # give back the text as a last resort
 
-_exec_agent = None
+def exec_agent(model_name: str = "gpt-4o-mini") -> AgentExecutor:
+    """The write-tool executor, built on first use (or by warm_agents) and shared afterwards."""
+    return get_or_build(("execution", model_name), lambda: _build_exec_agent(model_name))
 
 
 async def run_exec_step(state: Dict[str, Any]) -> Dict[str, Any]:
-    global _exec_agent
-    if _exec_agent is None:
-        _exec_agent = _build_exec_agent()
-
     push_trace(state, "execution", "start")
 
     step_idx = state.get("step_idx", 0)
@@ -87,7 +86,8 @@ async def run_exec_step(state: Dict[str, Any]) -> Dict[str, Any]:
         "If you cannot perform the operation, return {}."
     )
 
-    res = await _exec_agent.ainvoke({"input": user_msg, "chat_history": state.get("messages", [])})
+    with trace_tool_calls() as calls:
+        res = await exec_agent().ainvoke({"input": user_msg, "chat_history": state.get("messages", [])})
 
     chosen: List[str] = []
     last_obs = None
@@ -119,5 +119,6 @@ async def run_exec_step(state: Dict[str, Any]) -> Dict[str, Any]:
         data["transaction"] = output if isinstance(output, dict) else {"result": output}
 
     new_state = {**state, "scratch": scratch, "data": data, "result": output, "step_idx": step_idx + 1}
-    push_trace(new_state, "execution", "ok", {"operation": operation, "chosen_tools": chosen, "output_type": type(output).__name__})
+    push_trace(new_state, "execution", "ok", {"operation": operation, "chosen_tools": chosen, "output_type": type(output).__name__,
+                                              "tool_ms": [c["ms"] for c in calls]})
     return new_state
\ No newline at end of file
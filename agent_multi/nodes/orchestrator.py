@@ -3,7 +3,6 @@ from __future__ import annotations
 import json
 from typing import Dict, Any, List
 
-from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 # Optional: import types for isinstance checks (keeps it robust)
 try:
@@ -13,6 +12,7 @@ except Exception:  # if the import isn’t available at runtime
 
 from ..prompts import ORCH_SYSTEM, OUT_OF_SCOPE_HELP
 from ..utils.trace import push_trace
+from agent.llm_registry import get_llm
 
 def _coerce_msg(m) -> tuple[str, str]:
     """
@@ -57,6 +57,12 @@ def _render_history(messages: List[Any], limit: int = 8) -> str:
 
 NOOP_INTENT = "noop"
 
+_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "{sys}"),
+    ("system", "Conversation so far:\n{history}"),
+    ("human", "{query}"),
+])
+
 def orchestrate(state: Dict[str, Any], model_name: str = "gpt-4o-mini") -> Dict[str, Any]:
     push_trace(state, "orchestrator", "start", {"input": state.get("input", "")})
     user_input = (state.get("input") or "").strip()
@@ -69,13 +75,8 @@ def orchestrate(state: Dict[str, Any], model_name: str = "gpt-4o-mini") -> Dict[
         push_trace(out_state, "orchestrator", "ok", {"intent": NOOP_INTENT, "steps": 0})
         return out_state
 
-    llm = ChatOpenAI(model=model_name, temperature=0)
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", "{sys}"),
-        ("system", "Conversation so far:\n{history}"),
-        ("human", "{query}"),
-    ])
-    msg = prompt.format_messages(sys=ORCH_SYSTEM, history=history_txt, query=user_input)
+    llm = get_llm(model_name)
+    msg = _PROMPT.format_messages(sys=ORCH_SYSTEM, history=history_txt, query=user_input)
     raw = llm.invoke(msg).content
 
     intent, plan = NOOP_INTENT, []
@@ -1,10 +1,15 @@
 # agent_multi/nodes/summarizer.py
 from __future__ import annotations
 from typing import Dict, Any
-from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 from ..prompts import SUMMARIZER_SYSTEM, OUT_OF_SCOPE_HELP
 from ..utils.trace import push_trace
+from agent.llm_registry import get_llm
+
+_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", SUMMARIZER_SYSTEM),
+    ("human", "Summarize briefly what happened.\n\nScratch:\n{scratch}"),
+])
 
 def summarize(state: Dict[str, Any], model_name: str = "gpt-4o-mini") -> Dict[str, Any]:
     push_trace(state, "summarize", "start")
@@ -17,13 +22,9 @@ def summarize(state: Dict[str, Any], model_name: str = "gpt-4o-mini") -> Dict[st
         return out
 
     # Otherwise, produce a short LLM summary of what the tools did.
-    llm = ChatOpenAI(model=model_name, temperature=0)
+    llm = get_llm(model_name)
     scratch = state.get("scratch") or {}
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", SUMMARIZER_SYSTEM),
-        ("human", "Summarize briefly what happened.\n\nScratch:\n{scratch}"),
-    ])
-    msg = prompt.format_messages(scratch=str(scratch)[:6000])
+    msg = _PROMPT.format_messages(scratch=str(scratch)[:6000])
     text = llm.invoke(msg).content
     out = {**state, "result": {"summary": text}, "status": state.get("status") or "OK"}
     push_trace(out, "summarize", "ok")
@@ -14,7 +14,7 @@ Each step must specify:
 
 Agents & examples (not exhaustive):
 - data  = read-only retrieval. Examples:
-  customers.get, transactions.list, transactions.get, analytics.spend, analytics.category, payments.get
+  customers.get, transactions.list, transactions.get, analytics.spend, analytics.category, analytics.cohort, payments.get
 - execution = state-changing actions (create/update/side-effects). Examples:
   customers.create, transactions.create, payments.make, payments.retry, payments.fail
 
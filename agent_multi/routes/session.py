@@ -3,6 +3,9 @@ from fastapi import APIRouter, Request, HTTPException, Header
 from typing import Optional
 from pydantic import BaseModel
 from ..runtime.session_store import SessionStore
+from agent.utils.logging import get_logger
+
+log = get_logger("agent_multi.session")
 
 router = APIRouter()
 
@@ -16,7 +19,7 @@ async def start(request: Request):
     ip = request.client.host if request.client else ""
     ua = request.headers.get("user-agent", "")
     sess = SessionStore.start_session(ip, ua)
-    print(f"Started session {sess['sessionId']} from {ip} / {ua}")
+    log.info("started session %s from %s / %s", sess["sessionId"], ip, ua)
     return {"sessionId": sess["sessionId"], "tier": sess["tier"], "limits": sess["limits"]}
 
 # class UpgradeIn(BaseModel):
@@ -3,7 +3,9 @@ from typing import List
 from agent.lc_tools import (
     make_spend_summary_tool,
     make_spend_by_category_tool,
+    make_cohort_analytics_tool,
     make_search_transactions_tool,
+    make_search_transactions_all_tool,
     make_get_customer_tool,
     make_get_transaction_detail_tool,
     make_get_payment_tool,
@@ -11,6 +13,9 @@ from agent.lc_tools import (
     make_create_transaction_tool,
     make_make_payment_tool,
     make_get_payment_by_transaction_tool,
+    make_get_customers_batch_tool,
+    make_get_transactions_batch_tool,
+    make_get_payments_by_transactions_tool,
 )
 
 def build_read_only_tools() -> List:
@@ -18,11 +23,16 @@ def build_read_only_tools() -> List:
     return [
         make_spend_summary_tool(),
         make_spend_by_category_tool(),
+        make_cohort_analytics_tool(),
         make_search_transactions_tool(),
+        make_search_transactions_all_tool(),
         make_get_customer_tool(),
         make_get_transaction_detail_tool(),
         make_get_payment_tool(),
-        make_get_payment_by_transaction_tool() 
+        make_get_payment_by_transaction_tool(),
+        make_get_customers_batch_tool(),
+        make_get_transactions_batch_tool(),
+        make_get_payments_by_transactions_tool(),
     ]
 
 def build_write_tools() -> List:
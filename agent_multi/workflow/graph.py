@@ -4,10 +4,11 @@ from typing import Dict, Any
 from langgraph.graph import StateGraph, END
 from ..state import GraphState
 from ..nodes.orchestrator import orchestrate
-from ..nodes.data_agent import run_data_step
+from ..nodes.data_agent import run_data_step, warm_data_agents
 from ..nodes.compliance import compliance_check
-from ..nodes.execution_agent import run_exec_step
+from ..nodes.execution_agent import run_exec_step, exec_agent
 from ..nodes.summarizer import summarize
+from agent.llm_registry import get_llm
 from ..nodes.notifier import notify
 
 def _has_more_steps(state: Dict[str, Any]) -> bool:
@@ -108,3 +109,10 @@ def build_multi_agent_graph():
     g.add_edge("summarize", END)
 
     return g.compile()
+
+
+def warm_agents(model_name: str = "gpt-4o-mini") -> None:
+    """Build the shared LLM client and every node's executor before the first turn."""
+    get_llm(model_name)                  # orchestrator, summarizer
+    warm_data_agents(model_name)
+    exec_agent(model_name)
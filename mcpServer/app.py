@@ -1,9 +1,42 @@
 
 import os
-from mcpServer.runtime import mcp
+import asyncio
+from contextlib import asynccontextmanager
+from mcpServer.runtime import mcp, http_app, background
+from mcpServer.payments_api.client import close_payments_api
+from mcpServer.config import MCP_WORKERS
+from mcpServer.util.logs import get_logger
+from mcpServer.workers import Supervisor, resolve_workers
+
+log = get_logger("mcpServer.server")
 
 # Simple runner: stdio (for local dev) or http (SSE) depending on env
-import os
+
+def load_components():
+    # FastMCP auto-discovers decorated tools/resources upon import.
+    from mcpServer.tools import customers, transactions, payments, analytics
+    from mcpServer.resources import customers as r_customers, activity as r_activity, stats as r_stats
+
+def inproc_server():
+    """The server with every tool and resource loaded, for clients in the same process (MCP_URL=inproc://)."""
+    load_components()
+    return mcp
+
+@asynccontextmanager
+async def inproc_lifetime():
+    """What the HTTP app's lifespan does, for a server hosted inside another app (the agent)."""
+    try:
+        async with background():
+            yield
+    finally:
+        await close_payments_api()
+
+async def _run_stdio():
+    try:
+        async with background():
+            await mcp.run_async(transport="stdio")
+    finally:
+        await close_payments_api()   # shutdown hook: drain the upstream keep-alive pool
 
 def main():
 
@@ -11,17 +44,21 @@ def main():
     host = os.getenv("MCP_HOST", "0.0.0.0")
     port = int(os.getenv("MCP_PORT", "8765"))
 
-    # FastMCP auto-discovers decorated tools/resources upon import.
-    from mcpServer.tools import customers, transactions, payments, analytics   
-    from mcpServer.resources import customers as r_customers, activity as r_activity
-
+    workers = resolve_workers(MCP_WORKERS)
 
-    if transport == "http":
-        print(f"[myPayments-mcp] HTTP/SSE on {host}:{port}")
-        mcp.run(transport="http", host=host, port=port)   # <-- no await / no asyncio.run
+    if transport == "http" and workers > 1:
+        # Supervisor + N worker processes; each worker loads the tools itself
+        Supervisor(workers, host, port).run()
+    elif transport == "http":
+        load_components()
+        import uvicorn
+        log.info("myPayments-mcp HTTP/SSE on %s:%s", host, port)
+        # Same app mcp.run(transport="http") would serve, plus the upstream pool shutdown hook
+        uvicorn.run(http_app(), host=host, port=port, lifespan="on", timeout_graceful_shutdown=0)
     else:
-        print("[myPayments-mcp] stdio mode")
-        mcp.run(transport="stdio")
+        load_components()
+        log.info("myPayments-mcp stdio mode")
+        asyncio.run(_run_stdio())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,93 @@
+"""Result size per output format: rows (list of dicts) vs columnar, in bytes and LLM tokens.
+
+    python -m mcpServer.bench.bench_columnar [--sizes 10,50,200] [--data synthetic|sql]
+
+Calls the tools in-process against the stand-in upstream and measures the text content the model reads:
+  search_transactions   one page per size, all fields and with fields=amount,category,status,createdAt
+  spend_by_category     one customer over the whole data range
+  time_series           one customer, day and month buckets
+Tokens are counted with tiktoken (o200k_base) when it is installed, otherwise estimated from the
+word / number / punctuation runs of the text ("~" in the header), which tracks BPE counts on JSON
+closely enough to compare formats.
+"""
+import argparse
+import asyncio
+import logging
+import re
+from typing import Any, Dict, List, Tuple
+
+import httpx
+from fastmcp import Client
+
+from mcpServer.bench.standin import StandInData, build_app
+from mcpServer.payments_api import client as client_mod
+from mcpServer.payments_api.client import PaymentsApiClient
+from mcpServer.runtime import mcp
+from mcpServer.tools import analytics, transactions  # noqa: F401  (registers tools)
+
+HEADERS = {"x-mcp-api-key": "lovethisapp"}
+_RUNS = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]")
+
+try:
+    import tiktoken
+    _enc = tiktoken.get_encoding("o200k_base")
+
+    def tokens(text: str) -> int:
+        return len(_enc.encode(text))
+    EXACT = True
+except Exception:                                    # not installed, or no encoding files offline
+    def tokens(text: str) -> int:
+        return len(_RUNS.findall(text))
+    EXACT = False
+
+
+def cases(data: StandInData, sizes: List[int]) -> List[Tuple[str, str, Dict[str, Any]]]:
+    busiest = max(data.customers, key=lambda c: sum(t["customerId"] == c for t in data.transactions.values()))
+    window = {"from": "2000-01-01T00:00:00", "to": "2100-01-01T00:00:00"}
+    out = []
+    for size in sizes:
+        out.append((f"search size={size}", "search_transactions", {"size": size}))
+        out.append((f"search size={size} fields", "search_transactions",
+                    {"size": size, "fields": ["amount", "category", "status", "createdAt"]}))
+    out.append((f"spend_by_category c{busiest}", "spend_by_category", {"customerId": busiest, **window}))
+    for bucket in ("day", "month"):
+        out.append((f"time_series {bucket} c{busiest}", "time_series",
+                    {"customerId": busiest, "bucket": bucket, **window}))
+    return out
+
+
+async def measure(data: StandInData, sizes: List[int]) -> List[Dict[str, Any]]:
+    app = build_app(data)
+    client_mod._shared = PaymentsApiClient(base_url="http://standin/api/v1/service",
+                                           transport=httpx.ASGITransport(app=app))
+    report = []
+    async with Client(mcp) as c:
+        for label, tool, args in cases(data, sizes):
+            row = {"case": label}
+            for fmt in ("rows", "columnar"):
+                res = await c.call_tool(tool, {"input": {**args, "format": fmt}, "headers": HEADERS})
+                text = res.content[0].text
+                row[fmt] = (len(text.encode()), tokens(text))
+            report.append(row)
+    await client_mod._shared.close()
+    return report
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", default="10,50,200")
+    ap.add_argument("--data", choices=("synthetic", "sql"), default="synthetic",
+                    help="synthetic: 50 customers x 40 transactions; sql: myPayments/data.sql")
+    args = ap.parse_args()
+    logging.getLogger("mcpServer").setLevel(logging.WARNING)          # per-call tool-input lines
+    data = StandInData.from_sql() if args.data == "sql" else StandInData()
+    report = asyncio.run(measure(data, [int(s) for s in args.sizes.split(",")]))
+    tok = "tokens" if EXACT else "~tokens"
+    print(f"{'case':<32} {'rows B':>8} {'col B':>8} {'rows ' + tok:>13} {'col ' + tok:>12} {'saved':>6}")
+    for r in report:
+        (rb, rt), (cb, ct) = r["rows"], r["columnar"]
+        print(f"{r['case']:<32} {rb:>8} {cb:>8} {rt:>13} {ct:>12} {1 - ct / rt:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
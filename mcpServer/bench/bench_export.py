@@ -0,0 +1,113 @@
+"""export_transactions at scale: time, throughput and memory for a 1M-row export per format.
+
+    python -m mcpServer.bench.bench_export [--rows 1000000] [--formats ndjson,csv,parquet] [--page-size 1000]
+                                           [--latency-ms 0]
+
+The upstream is a synthetic /transactions listing that builds each page on request (the stand-in
+would need the million rows in memory), with --latency-ms per page. The tool runs in-process through
+an MCP client, the way the HTTP transport would call it. "rss +MiB" is the peak growth of the process
+resident set over the run, sampled every 10 ms: with page-at-a-time writes it stays flat as rows grow.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import resource
+import tempfile
+import time
+from typing import Any, Dict
+
+import httpx
+from fastmcp import Client
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from mcpServer.payments_api import client as client_mod
+from mcpServer.payments_api.client import PaymentsApiClient
+from mcpServer.payments_api.codec import dumps
+from mcpServer.runtime import mcp
+from mcpServer.tools import transactions
+from mcpServer.util import export as export_mod
+
+HEADERS = {"x-mcp-api-key": "lovethisapp"}
+CATEGORIES = ("Groceries", "Travel", "Utilities", "Dining", "Electronics", "Health")
+
+
+def synthetic_upstream(total: int, latency_ms: float) -> Starlette:
+    async def search(req: Request) -> Response:
+        page, size = int(req.query_params.get("page", 0)), int(req.query_params.get("size", 20))
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        start, end = page * size, min(total, (page + 1) * size)
+        rows = [{
+            "id": i + 1, "customerId": i % 5000 + 1, "amount": round(5 + (i * 37 % 100000) / 100, 2),
+            "currency": "USD", "category": CATEGORIES[i % len(CATEGORIES)],
+            "status": "COMPLETED" if i % 7 else "PENDING",
+            "createdAt": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}T{i % 24:02d}:{i % 60:02d}:00",
+            "description": f"Order {i + 1}",
+        } for i in range(start, end)]
+        body = {"content": rows, "number": page, "size": size, "totalElements": total,
+                "totalPages": -(-total // size), "last": end >= total}
+        return Response(dumps(body), media_type="application/json")
+    return Starlette(routes=[Route("/api/v1/service/transactions", search)])
+
+
+def _rss() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+async def run(fmt: str, rows: int, latency_ms: float) -> Dict[str, Any]:
+    client_mod._shared = PaymentsApiClient(base_url="http://upstream/api/v1/service",
+                                           transport=httpx.ASGITransport(app=synthetic_upstream(rows, latency_ms)))
+    base = peak = _rss()
+    done = asyncio.Event()
+
+    async def sample():
+        nonlocal peak
+        while not done.is_set():
+            peak = max(peak, _rss())
+            await asyncio.sleep(0.01)
+
+    sampler = asyncio.create_task(sample())
+    cpu0, t0 = time.process_time(), time.perf_counter()
+    async with Client(mcp) as c:
+        res = await c.call_tool("export_transactions", {"input": {"format": fmt, "maxRows": rows}, "headers": HEADERS},
+                                timeout=3600)
+    secs, cpu = time.perf_counter() - t0, time.process_time() - cpu0
+    done.set()
+    await sampler
+    await client_mod._shared.close()
+    out = res.structured_content
+    os.remove(export_mod.export_path(out["exportId"]))
+    return {"format": fmt, "rows": out["rows"], "secs": secs, "cpu": cpu, "mib": out["bytes"] / 2**20,
+            "rss": (peak - base) / 2**20, "pages": out["pages"]}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--formats", default="ndjson,csv,parquet")
+    ap.add_argument("--page-size", type=int, default=1000)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    args = ap.parse_args()
+    logging.getLogger("mcpServer").setLevel(logging.WARNING)
+    transactions.EXPORT_PAGE_SIZE = args.page_size
+    export_mod.EXPORT_DIR = tempfile.mkdtemp(prefix="bench-export-")
+    print(f"{args.rows} rows, pages of {args.page_size}, {args.latency_ms} ms upstream latency per page")
+    print(f"{'format':<8} {'rows':>8} {'secs':>7} {'rows/s':>9} {'cpu s':>7} {'file MiB':>9} {'rss +MiB':>9}")
+    for fmt in args.formats.split(","):
+        if fmt == "parquet" and export_mod.pyarrow is None:
+            print(f"{fmt:<8} skipped (pyarrow not installed)")
+            continue
+        r = asyncio.run(run(fmt, args.rows, args.latency_ms))
+        print(f"{r['format']:<8} {r['rows']:>8} {r['secs']:>7.1f} {r['rows'] / r['secs']:>9.0f} {r['cpu']:>7.1f} "
+              f"{r['mib']:>9.1f} {r['rss']:>9.1f}")
+    os.rmdir(export_mod.EXPORT_DIR)
+    print(f"max rss of the process: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
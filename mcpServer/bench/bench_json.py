@@ -0,0 +1,110 @@
+"""Decode + tool-result cost of a transaction page: json + FastMCP conversion vs orjson pass-through vs slotted rows.
+
+    python -m mcpServer.bench.bench_json [--sizes 10,50,200,1000] [--iters 200]
+
+For each page size the upstream body (Spring Page<TransactionResponse> bytes) goes through:
+  baseline   json.loads(text) and FastMCP's default dict handling (to_json + to_jsonable_python)
+  orjson     codec.loads(bytes) and util.results.tool_result (one orjson encode, body passed through)
+  slotted    codec.loads, rows converted to models.wire.Transaction, tool_result(typed=True)
+CPU is microseconds per page on this thread; allocations are tracemalloc peak bytes for one page.
+"retained" is what the rows cost when kept (e.g. cached) after the decode buffers are gone.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict
+
+from fastmcp.tools.tool import Tool
+
+from mcpServer.models.wire import Transaction
+from mcpServer.payments_api import codec
+from mcpServer.util.results import tool_result
+
+
+def typed_page(body: Dict[str, Any]) -> Dict[str, Any]:
+    """A Spring Page<TransactionResponse> body with its `content` rows as Transaction instances."""
+    return {**body, "content": Transaction.many(body.get("content"))}
+
+
+def _body(size: int) -> bytes:
+    rows = [{
+        "id": i, "customerId": 7, "amount": round(12.5 + i * 1.01, 2), "currency": "USD", "category": "Groceries",
+        "status": "COMPLETED", "createdAt": "2025-03-24T01:06:36", "description": f"Order {i} at the corner store",
+    } for i in range(size)]
+    return json.dumps({"content": rows, "totalElements": size * 10, "totalPages": 10, "number": 0,
+                       "size": size, "last": False}).encode()
+
+
+def _cpu(fn: Callable[[], Any], iters: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(iters):
+        fn()
+    return (time.perf_counter() - t0) / iters * 1e6
+
+
+def _peak(fn: Callable[[], Any]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def _retained(build: Callable[[], Any]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", default="10,50,200,1000")
+    ap.add_argument("--iters", type=int, default=200)
+    args = ap.parse_args()
+
+    holder: Dict[str, Any] = {}
+
+    async def returns_body() -> dict:
+        return holder["body"]
+
+    default_tool = Tool.from_function(returns_body, name="page")       # FastMCP's default conversion
+    loop = asyncio.new_event_loop()
+    paths: Dict[str, Callable[[bytes], Any]] = {}
+
+    def baseline(raw: bytes):
+        holder["body"] = json.loads(raw.decode())
+        return loop.run_until_complete(default_tool.run({}))
+
+    def fast(raw: bytes):
+        return tool_result(codec.loads(raw))
+
+    def slotted(raw: bytes):
+        return tool_result(typed_page(codec.loads(raw)), typed=True)
+
+    paths.update({"baseline": baseline, "orjson": fast, "slotted": slotted})
+    print(f"orjson installed: {codec.FAST}; {args.iters} iterations per cell")
+    print(f"{'size':>5} {'path':<9} {'cpu us':>9} {'peak KiB':>9} {'retained KiB':>13}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        raw = _body(size)
+        retained = {
+            "baseline": lambda: json.loads(raw.decode())["content"],
+            "orjson": lambda: codec.loads(raw)["content"],
+            "slotted": lambda: Transaction.many(codec.loads(raw)["content"]),
+        }
+        for name, path in paths.items():
+            cpu = _cpu(lambda: path(raw), max(5, args.iters * 10 // max(size, 10)))
+            print(f"{size:>5} {name:<9} {cpu:>9.1f} {_peak(lambda: path(raw)) / 1024:>9.1f} "
+                  f"{_retained(retained[name]) / 1024:>13.1f}")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
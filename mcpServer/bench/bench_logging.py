@@ -0,0 +1,88 @@
+"""Event-loop time spent logging tool payloads: print() vs JSON logging inline vs the queued JSON logger.
+
+    python -m mcpServer.bench.bench_logging [--calls 2000] [--rows 50,200]
+
+Each simulated tool call logs its input and a search_transactions-shaped result of `--rows` rows,
+as the tools did with print(). Only time on the calling (event loop) thread is counted; the queued
+logger's writer thread is drained after the timed loop. All output goes to /dev/null, so a real
+terminal or container log pipe makes the inline modes slower still.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, Dict, List
+
+from mcpServer.util import logs
+from mcpServer.util.logs import JsonFormatter, log_event
+
+
+def _pct(samples: List[float], p: float) -> float:
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(round(p / 100.0 * (len(s) - 1))))]
+
+
+def _result(rows: int) -> Dict:
+    return {"content": [{
+        "id": i, "customerId": 7, "amount": 12.5 + i, "currency": "USD", "category": "Groceries",
+        "status": "COMPLETED", "createdAt": "2025-03-24T01:06:36", "description": f"order {i} for mark37@gmail.com",
+    } for i in range(rows)], "totalElements": rows, "page": 0, "size": rows}
+
+
+async def _run(calls: int, rows: int, emit: Callable[[Dict, Dict], None]) -> List[float]:
+    payload, result = {"customerId": 7, "size": rows}, _result(rows)
+    samples = []
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        emit(payload, result)
+        samples.append((time.perf_counter() - t0) * 1e6)
+        await asyncio.sleep(0)
+    return samples
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--calls", type=int, default=2000)
+    ap.add_argument("--rows", default="50,200")
+    args = ap.parse_args()
+
+    devnull = open(os.devnull, "w")
+    inline = logging.getLogger("bench.inline")
+    inline.propagate = False
+    sink = logging.StreamHandler(devnull)
+    sink.setFormatter(JsonFormatter())
+    inline.addHandler(sink)
+    inline.setLevel(logging.INFO)
+
+    logs.setup_logging(stream=devnull, level="INFO", sample_rates="mcpServer.bench.sampled=0.1")
+    queued, sampled = logs.get_logger("mcpServer.bench.queued"), logs.get_logger("mcpServer.bench.sampled")
+
+    def printed(p, r):
+        print("Request received with parameters: ", p, file=devnull)
+        print("Result: ", r, file=devnull)
+
+    def structured(logger):
+        def emit(p, r):
+            log_event(logger, logging.INFO, "tool input", tool="search_transactions", input=p)
+            log_event(logger, logging.INFO, "tool result", tool="search_transactions", result=r)
+        return emit
+
+    modes = {"print()": printed, "json inline": structured(inline),
+             "json queued": structured(queued), "queued 10% sample": structured(sampled)}
+    print(f"{args.calls} tool calls per cell, time on the event loop thread per call (microseconds)")
+    print(f"{'rows':>5} {'mode':<18} {'p50 us':>9} {'p99 us':>9} {'total ms':>9}")
+    for rows in (int(r) for r in args.rows.split(",")):
+        for name, emit in modes.items():
+            samples = asyncio.run(_run(args.calls, rows, emit))
+            print(f"{rows:>5} {name:<18} {_pct(samples, 50):>9.1f} {_pct(samples, 99):>9.1f} {sum(samples) / 1000:>9.1f}")
+        t0 = time.perf_counter()
+        logs.shutdown_logging()                  # writer thread catches up (off the loop)
+        drain = (time.perf_counter() - t0) * 1000
+        print(f"{'':>5} {'(writer drain)':<18} {'':>9} {'':>9} {drain:>9.1f}")
+        logs.setup_logging(stream=devnull, level="INFO", sample_rates="mcpServer.bench.sampled=0.1")
+    logs.shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
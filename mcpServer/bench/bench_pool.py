@@ -0,0 +1,76 @@
+"""Per-call latency of fresh-client-per-call vs the shared keep-alive pool.
+
+    python -m mcpServer.bench.bench_pool [--calls 500] [--concurrency 8] [--latency-ms 1]
+
+Runs against the local stand-in upstream on a real socket, so every "fresh" call pays the
+TCP connect the tools used to pay (plain HTTP here; a TLS upstream widens the gap).
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+from mcpServer.bench.standin import ServedStandIn, build_app
+from mcpServer.payments_api.client import PaymentsApiClient
+
+
+def _pct(samples: List[float], p: float) -> float:
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(round(p / 100.0 * (len(s) - 1))))]
+
+
+async def _drive(call: Callable[[int], Awaitable[None]], calls: int, concurrency: int) -> List[float]:
+    samples: List[float] = []
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with sem:
+            t0 = time.perf_counter()
+            await call(i)
+            samples.append((time.perf_counter() - t0) * 1000)
+
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    return samples
+
+
+async def run(base_url: str, calls: int, concurrency: int) -> None:
+    ops = {
+        "get_customer": lambda api, i: api.get_customer(1 + i % 50),
+        "get_payment": lambda api, i: api.get_payment(1 + i % 50),
+    }
+    print(f"{'tool':<14} {'mode':<12} {'p50 ms':>8} {'p99 ms':>8} {'mean ms':>8}")
+    for name, op in ops.items():
+        async def fresh(i: int):
+            api = PaymentsApiClient(base_url=base_url)   # old tool pattern: client per call
+            try:
+                await op(api, i)
+            finally:
+                await api.close()
+
+        shared = PaymentsApiClient(base_url=base_url)
+
+        async def pooled(i: int):
+            await op(shared, i)
+
+        try:
+            for mode, call in (("per-call", fresh), ("shared-pool", pooled)):
+                await _drive(call, min(50, calls), concurrency)  # warm-up
+                s = await _drive(call, calls, concurrency)
+                print(f"{name:<14} {mode:<12} {_pct(s, 50):>8.3f} {_pct(s, 99):>8.3f} {statistics.mean(s):>8.3f}")
+        finally:
+            await shared.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--calls", type=int, default=500)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--latency-ms", type=float, default=1.0, help="stand-in server-side latency per request")
+    args = ap.parse_args()
+    with ServedStandIn(build_app(latency_ms=args.latency_ms)) as upstream:
+        asyncio.run(run(upstream.base_url, args.calls, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Window-query latency of the local analytics engine: raw column scan vs daily prefix-sum rollups.
+
+    python -m mcpServer.bench.bench_rollups [--rows 200000] [--queries 2000]
+
+One customer with `--rows` transactions spread over five years; random windows of 1 day, 90 days
+and 5 years (arbitrary start times, so the partial-day corrections are exercised too).
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from mcpServer.payments_api.columnar import ColumnarStore
+
+SPAN_DAYS = 5 * 365
+WINDOWS = {"1 day": 1, "90 days": 90, "5 years": SPAN_DAYS}
+
+
+def _pct(samples: List[float], p: float) -> float:
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(round(p / 100.0 * (len(s) - 1))))]
+
+
+def _rows(n: int, start: datetime) -> List[Dict]:
+    rnd = random.Random(1)
+    cats = ["Groceries", "Retail", "Subscription", "Travel", "Dining", "Utilities"]
+    return [{
+        "id": i, "customerId": 1, "amount": round(rnd.uniform(2, 900), 2), "currency": "USD",
+        "category": rnd.choice(cats), "status": rnd.choice(["COMPLETED", "COMPLETED", "COMPLETED", "PENDING", "FAILED"]),
+        "createdAt": (start + timedelta(seconds=rnd.randint(0, SPAN_DAYS * 86400))).isoformat(),
+    } for i in range(1, n + 1)]
+
+
+def _time(fn: Callable[[], object], n: int) -> List[float]:
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1e6)
+    return samples
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=200_000)
+    ap.add_argument("--queries", type=int, default=2000)
+    args = ap.parse_args()
+
+    start = datetime(2020, 1, 1)
+    rows = _rows(args.rows, start)
+    stores = {"raw scan": ColumnarStore(rollups=False), "rollups": ColumnarStore(rollups=True)}
+    for store in stores.values():
+        store.load(1, rows)
+        store.spend_summary({"customerId": 1})          # builds the rollup once, outside the timings
+
+    rnd = random.Random(2)
+    print(f"{args.rows} rows over {SPAN_DAYS} days, {args.queries} queries per cell (microseconds)")
+    print(f"{'window':<9} {'query':<18} {'engine':<9} {'p50 us':>9} {'p99 us':>9} {'mean us':>9}")
+    for label, days in WINDOWS.items():
+        windows = []
+        for _ in range(args.queries):
+            a = start + timedelta(seconds=rnd.randint(0, max(1, (SPAN_DAYS - days) * 86400)))
+            windows.append({"customerId": 1, "from": a.isoformat(), "to": (a + timedelta(days=days)).isoformat(),
+                            "fxBase": "USD"})
+        for query in ("spend_summary", "spend_by_category"):
+            for engine, store in stores.items():
+                it = iter(windows * 2)
+                s = _time(lambda: getattr(store, query)(next(it)), args.queries)
+                print(f"{label:<9} {query:<18} {engine:<9} {_pct(s, 50):>9.1f} {_pct(s, 99):>9.1f} {statistics.mean(s):>9.1f}")
+
+    # incremental maintenance: one completed transaction landing today
+    store = stores["rollups"]
+    now = (start + timedelta(days=SPAN_DAYS)).isoformat()
+    ids = iter(range(args.rows + 1, args.rows + 1 + args.queries))
+    s = _time(lambda: store.upsert({"id": next(ids), "customerId": 1, "amount": 10.0, "currency": "USD",
+                                    "category": "Dining", "status": "COMPLETED", "createdAt": now}), args.queries)
+    print(f"upsert (rollup kept incrementally): p50 {_pct(s, 50):.1f} us, p99 {_pct(s, 99):.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""Load test of the MCP server over its real streamable-HTTP transport, against the Spring stand-in.
+
+    python -m mcpServer.bench.loadtest [--duration 20] [--warmup 3] [--concurrency 16] [--mix get_customer=4,...]
+        [--latency-ms 5] [--latency-p99-ms 40] [--error-rate 0.01] [--workers 1] [--url URL]
+        [--json out.json] [--baseline previous.json]
+
+By default the stand-in upstream (seeded from myPayments/data.sql, log-normal latency per request,
+optional injected 503/500s) runs on a local port in this process, and the server runs as
+`python -m mcpServer.app` in a subprocess pointed at it: `--workers` sets MCP_WORKERS, every other
+server setting comes from the environment (e.g. CACHE_TTL_SECS=0, ANALYTICS_MODE=local).
+`--url http://host:8765` drives a server that is already running instead (against its own upstream;
+the tool arguments use the data.sql ids, which the seeded Spring database has too).
+
+Each of `--concurrency` virtual users keeps one MCP session and calls tools back to back, drawn from
+`--mix` by weight; calls finishing in the warm-up are not counted. Latency is what the client saw.
+Upstream calls per tool call come from the server's own counters (mcp_tool_upstream_requests_total
+over mcp_tool_calls_total, scraped from /metrics before and after), so they include retries and
+exclude cache hits. The load generator is one Python process; watch its CPU when pushing a
+multi-worker server, it can be the bottleneck.
+
+Prints a table, writes the JSON report with --json (commit, settings and the numbers), and with
+--baseline shows the change against an earlier report.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from fastmcp import Client
+
+from mcpServer.bench.standin import Faults, Latency, ServedStandIn, StandInData, _free_port, build_app
+from mcpServer.config import MCP_SERVER_API_KEY
+
+HEADERS = {"x-mcp-api-key": MCP_SERVER_API_KEY}
+DEFAULT_MIX = ("get_customer=4,get_transaction=3,get_payment=2,get_payment_by_transaction=1,"
+               "list_customer_transactions=3,search_transactions=2,spend_summary=2,spend_by_category=2,time_series=1")
+_SAMPLE = re.compile(r'^(mcp_tool_calls_total|mcp_tool_upstream_requests_total)\{tool="([^"]+)"\} (\S+)$')
+
+
+def _pct(samples: List[float], p: float) -> float:
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(round(p / 100.0 * (len(s) - 1))))]
+
+
+def _window(rng: random.Random) -> Dict[str, str]:
+    # data.sql spans mid-2024 to mid-2025; windows of one to six months
+    year, first = rng.choice([2024, 2025]), rng.randint(1, 7)
+    return {"from": f"{year}-{first:02d}-01T00:00:00", "to": f"{year}-{first + rng.randint(0, 5):02d}-28T23:59:59"}
+
+
+def tool_args(data: StandInData) -> Dict[str, Callable[[random.Random], Dict[str, Any]]]:
+    """Argument generators per tool, drawing ids from the seeded dataset."""
+    customers, txs, pays = sorted(data.customers), sorted(data.transactions), sorted(data.payments)
+    categories = sorted({t["category"] for t in data.transactions.values()})
+    return {
+        "get_customer": lambda r: {"id": r.choice(customers)},
+        "get_transaction": lambda r: {"id": r.choice(txs)},
+        "get_payment": lambda r: {"id": r.choice(pays)},
+        "get_payment_by_transaction": lambda r: {"transactionId": r.choice(sorted(data.payment_by_tx))},
+        "get_customers_batch": lambda r: {"ids": r.sample(customers, 5)},
+        "list_customer_transactions": lambda r: {"id": r.choice(customers), "size": r.choice([10, 20])},
+        "search_transactions": lambda r: {"customerId": r.choice(customers), "status": r.choice([None, "COMPLETED"]),
+                                          "size": 20},
+        "spend_summary": lambda r: {"customerId": r.choice(customers), **_window(r)},
+        "spend_by_category": lambda r: {"customerId": r.choice(customers), **_window(r)},
+        "time_series": lambda r: {"customerId": r.choice(customers), "bucket": r.choice(["day", "week", "month"]),
+                                  "category": r.choice([None] + categories), **_window(r)},
+        "create_transaction": lambda r: {"customerId": r.choice(customers), "amount": round(r.uniform(5, 500), 2),
+                                         "currency": "USD", "category": r.choice(categories)},
+    }
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition("=")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def scrape(url: str) -> Optional[Dict[Tuple[str, str], float]]:
+    """Per-tool call and upstream-request counters from /metrics (None when the route is off)."""
+    try:
+        r = httpx.get(f"{url}/metrics", timeout=10)
+    except httpx.TransportError:
+        return None
+    if r.status_code != 200:
+        return None
+    out: Dict[Tuple[str, str], float] = {}
+    for line in r.text.splitlines():
+        m = _SAMPLE.match(line)
+        if m:
+            out[(m.group(1), m.group(2))] = float(m.group(3))
+    return out
+
+
+async def run_load(url: str, data: StandInData, mix: Dict[str, float], concurrency: int, duration: float,
+                   warmup: float, seed: int = 1, on_measure_start: Callable[[], None] = lambda: None):
+    """-> ({tool: [latency ms]}, {tool: Counter of error kinds}, measured seconds)."""
+    gens = tool_args(data)
+    unknown = set(mix) - set(gens)
+    if unknown:
+        raise SystemExit(f"no argument generator for {sorted(unknown)}; known: {sorted(gens)}")
+    names, weights = list(mix), list(mix.values())
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    t_start = time.perf_counter()
+    measure_from, until = t_start + warmup, t_start + warmup + duration
+
+    async def user(i: int):
+        rng = random.Random(seed * 1000 + i)
+        async with Client(f"{url}/mcp") as c:
+            while time.perf_counter() < until:
+                tool = rng.choices(names, weights)[0]
+                args = {k: v for k, v in gens[tool](rng).items() if v is not None}
+                t0 = time.perf_counter()
+                kind = None
+                try:
+                    res = await c.call_tool(tool, {"input": args, "headers": HEADERS}, raise_on_error=False)
+                    kind = "tool_error" if res.is_error else None
+                except Exception as e:
+                    kind = type(e).__name__
+                t1 = time.perf_counter()
+                if t0 >= measure_from and t1 <= until:
+                    latencies[tool].append((t1 - t0) * 1000)
+                    if kind:
+                        errors[tool][kind] += 1
+
+    async def mark():
+        await asyncio.sleep(warmup)
+        on_measure_start()
+
+    await asyncio.gather(mark(), *(user(i) for i in range(concurrency)))
+    return latencies, errors, duration
+
+
+def build_report(latencies, errors, secs: float, before, after, upstream_hits: Optional[float],
+                 settings: Dict[str, Any]) -> Dict[str, Any]:
+    tools = {}
+    for tool in sorted(latencies):
+        s = latencies[tool]
+        per_call = None
+        if before is not None and after is not None:
+            calls = after.get(("mcp_tool_calls_total", tool), 0) - before.get(("mcp_tool_calls_total", tool), 0)
+            ups = (after.get(("mcp_tool_upstream_requests_total", tool), 0)
+                   - before.get(("mcp_tool_upstream_requests_total", tool), 0))
+            per_call = round(ups / calls, 3) if calls else None
+        tools[tool] = {
+            "calls": len(s), "errors": dict(errors.get(tool, {})), "throughputRps": round(len(s) / secs, 2),
+            "p50Ms": round(_pct(s, 50), 2), "p95Ms": round(_pct(s, 95), 2), "p99Ms": round(_pct(s, 99), 2),
+            "meanMs": round(sum(s) / len(s), 2), "upstreamPerCall": per_call,
+        }
+    calls = sum(t["calls"] for t in tools.values())
+    # upstream hits span the same scrape window as the server counters, which also count the calls
+    # still in flight at the window edges (excluded from the latency samples)
+    served = calls
+    if before is not None and after is not None:
+        served = sum(v - before.get(k, 0) for k, v in after.items() if k[0] == "mcp_tool_calls_total") or calls
+    return {
+        "commit": _commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "settings": settings,
+        "durationSecs": secs,
+        "calls": calls,
+        "errors": sum(sum(t["errors"].values()) for t in tools.values()),
+        "throughputRps": round(calls / secs, 2),
+        "upstreamPerCall": round(upstream_hits / served, 3) if upstream_hits is not None and served else None,
+        "tools": tools,
+    }
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _delta(now: float, then: Optional[float]) -> str:
+    if not then:
+        return ""
+    return f"{(now - then) / then * 100:+.0f}%"
+
+
+def print_table(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    base = (baseline or {}).get("tools", {})
+    print(f"commit {report['commit']}  {report['durationSecs']:.0f}s  {report['calls']} calls  "
+          f"{report['throughputRps']} calls/s  {report['errors']} errors  "
+          f"upstream/call {report['upstreamPerCall']}"
+          + (f"  (baseline {baseline.get('commit')}: {baseline.get('throughputRps')} calls/s "
+             f"{_delta(report['throughputRps'], baseline.get('throughputRps'))})" if baseline else ""))
+    print(f"{'tool':<28} {'calls':>7} {'err':>5} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'up/call':>8}"
+          + (f" {'d rps':>6} {'d p95':>6} {'d p99':>6}" if baseline else ""))
+    for tool, t in report["tools"].items():
+        up = "-" if t["upstreamPerCall"] is None else f"{t['upstreamPerCall']:.2f}"
+        line = (f"{tool:<28} {t['calls']:>7} {sum(t['errors'].values()):>5} {t['throughputRps']:>8.1f} "
+                f"{t['p50Ms']:>8.2f} {t['p95Ms']:>8.2f} {t['p99Ms']:>8.2f} {up:>8}")
+        if baseline:
+            b = base.get(tool, {})
+            line += (f" {_delta(t['throughputRps'], b.get('throughputRps')):>6} {_delta(t['p95Ms'], b.get('p95Ms')):>6}"
+                     f" {_delta(t['p99Ms'], b.get('p99Ms')):>6}")
+        print(line)
+
+
+def _start_server(upstream_url: str, workers: str, log) -> Tuple[subprocess.Popen, str]:
+    port = _free_port("127.0.0.1")
+    env = {**os.environ, "MY_PAYMENTS_BASE_URL": upstream_url, "MCP_TRANSPORT": "http", "MCP_HOST": "127.0.0.1",
+           "MCP_PORT": str(port), "MCP_WORKERS": workers, "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING")}
+    proc = subprocess.Popen([sys.executable, "-m", "mcpServer.app"], env=env, stdout=subprocess.DEVNULL, stderr=log)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while True:
+        try:
+            httpx.get(f"{url}/metrics", timeout=2)        # any answer (404 with METRICS_ENABLED=0) means it serves
+            return proc, url
+        except httpx.TransportError:
+            if proc.poll() is not None or time.monotonic() > deadline:
+                proc.kill()
+                log.seek(0)
+                raise SystemExit(f"MCP server did not start:\n{log.read()[-4000:]}")
+            time.sleep(0.2)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--duration", type=float, default=20.0, help="measured seconds")
+    ap.add_argument("--warmup", type=float, default=3.0)
+    ap.add_argument("--concurrency", type=int, default=16, help="virtual users, one MCP session each")
+    ap.add_argument("--mix", default=DEFAULT_MIX, help="tool=weight,...")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--latency-ms", type=float, default=5.0, help="stand-in median latency per request")
+    ap.add_argument("--latency-p99-ms", type=float, default=None, help="stand-in p99 (log-normal); default: fixed")
+    ap.add_argument("--analytics-latency-ms", type=float, default=None, help="median for the analytics endpoints")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="share of upstream requests answered 503/500")
+    ap.add_argument("--workers", default="1", help="MCP_WORKERS for the spawned server")
+    ap.add_argument("--url", default=None, help="drive an already running server instead")
+    ap.add_argument("--json", default=None, help="write the report here")
+    ap.add_argument("--baseline", default=None, help="earlier --json report to compare against")
+    args = ap.parse_args()
+
+    data = StandInData.from_sql()
+    mix = parse_mix(args.mix)
+    settings = {k: v for k, v in vars(args).items() if k not in ("json", "baseline")}
+    baseline = json.load(open(args.baseline)) if args.baseline else None
+
+    def measure(url: str, upstream_app=None) -> Dict[str, Any]:
+        hits_at = {}
+
+        def mark():
+            hits_at["start"] = scrape(url), sum(upstream_app.state.hits.values()) if upstream_app else None
+
+        lat, err, secs = asyncio.run(run_load(url, data, mix, args.concurrency, args.duration, args.warmup,
+                                              args.seed, mark))
+        after = scrape(url)
+        before, hits0 = hits_at["start"]
+        hits = sum(upstream_app.state.hits.values()) - hits0 if upstream_app else None
+        return build_report(lat, err, secs, before, after, hits, settings)
+
+    if args.url:
+        report = measure(args.url.rstrip("/"))
+    else:
+        routes = {}
+        if args.analytics_latency_ms is not None:
+            spread = args.latency_p99_ms / args.latency_ms if args.latency_p99_ms and args.latency_ms else 1.0
+            slow = Latency(args.analytics_latency_ms, args.analytics_latency_ms * spread)
+            routes = {("GET", p): slow for p in ("/analytics/spend-summary", "/analytics/spend-by-category",
+                                                 "/analytics/time-series")}
+        latency = Latency(args.latency_ms, args.latency_p99_ms, routes=routes)
+        faults = Faults(error_rate=args.error_rate, statuses={503: 3, 500: 1}) if args.error_rate else None
+        app = build_app(data, latency_ms=latency, faults=faults)
+        with ServedStandIn(app) as upstream, tempfile.TemporaryFile("w+") as log:
+            proc, url = _start_server(upstream.base_url, args.workers, log)
+            try:
+                report = measure(url, app)
+            finally:
+                proc.terminate()
+                proc.wait(30)
+    print_table(report, baseline)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,499 @@
+"""Local stand-in for the myPayments Spring API.
+
+Only used by the benchmarks and tests: it serves the same routes PaymentsApiClient calls,
+from an in-memory dataset (generated, or `StandInData.from_sql()` for the rows in myPayments/data.sql),
+with an optional latency per request (fixed ms or a `Latency` distribution) and a hit counter
+so callers can assert how many requests actually reached "upstream". A `Faults` object
+injects error statuses and slow responses for the resilience tests and the load test. `validators="etag"` or
+"last-modified" makes GETs carry validators and answer matching conditional requests with 304
+(Spring's ShallowEtagHeaderFilter behaves like "etag").
+"""
+import asyncio
+import hashlib
+import math
+import os
+import random
+import re
+import socket
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from email.utils import formatdate
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+API_PREFIX = "/api/v1/service"
+
+CATEGORIES = ["Groceries", "Retail", "Subscription", "Travel", "Dining", "Utilities"]
+CURRENCIES = ["USD", "EUR", "INR"]
+METHODS = ["CreditCard", "UPI", "DebitCard", "NetBanking"]
+
+DATA_SQL = os.path.join(os.path.dirname(__file__), "..", "..", "myPayments", "data.sql")
+_INSERT = re.compile(r"INSERT INTO (\w+) \(([^)]*)\) VALUES")
+_SQL_VALUE = re.compile(r"'((?:[^']|'')*)'|(NULL)|(-?\d+(?:\.\d+)?)")
+
+
+def _sql_rows(path: str):
+    """(table, {column: value}) for every row of the multi-row INSERTs in a MySQL dump like data.sql."""
+    table, columns = None, []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            m = _INSERT.match(line)
+            if m:
+                table, columns = m.group(1), [c.strip() for c in m.group(2).split(",")]
+            elif table and line.startswith("("):
+                values = []
+                for s, null, num in _SQL_VALUE.findall(line[1:line.rindex(")")]):
+                    values.append(None if null else (s.replace("''", "'") if num == "" else
+                                                     (float(num) if "." in num else int(num))))
+                yield table, dict(zip(columns, values))
+                if line.endswith(";"):
+                    table = None
+
+
+def _iso(sql_datetime: Optional[str]) -> Optional[str]:
+    return sql_datetime.replace(" ", "T") if sql_datetime else None     # Jackson's LocalDateTime format
+
+
+class StandInData:
+    """Deterministic in-memory customers / transactions / payments."""
+
+    def __init__(self, customers: int = 50, tx_per_customer: int = 40, seed: int = 7):
+        rnd = random.Random(seed)
+        now = datetime.utcnow().replace(microsecond=0)
+        self.customers: Dict[int, Dict[str, Any]] = {}
+        self.transactions: Dict[int, Dict[str, Any]] = {}
+        self.payments: Dict[int, Dict[str, Any]] = {}
+        self.payment_by_tx: Dict[int, int] = {}
+        tx_id = pay_id = 0
+        for cid in range(1, customers + 1):
+            self.customers[cid] = {
+                "id": cid,
+                "fullName": f"Customer {cid}",
+                "email": f"customer{cid}@example.com",
+                "phoneNumber": f"555-01{cid:02d}",
+            }
+            for _ in range(tx_per_customer):
+                tx_id += 1
+                status = rnd.choice(["COMPLETED", "COMPLETED", "COMPLETED", "PENDING", "FAILED"])
+                self.transactions[tx_id] = {
+                    "id": tx_id,
+                    "customerId": cid,
+                    "amount": round(rnd.uniform(2, 900), 2),
+                    "currency": rnd.choice(CURRENCIES),
+                    "category": rnd.choice(CATEGORIES),
+                    "status": status,
+                    "createdAt": (now - timedelta(minutes=rnd.randint(0, 400 * 24 * 60))).isoformat(),
+                    "description": None,
+                }
+                if status != "PENDING":
+                    pay_id += 1
+                    self._add_payment(pay_id, tx_id, rnd.choice(METHODS),
+                                      "SUCCESS" if status == "COMPLETED" else "FAILED")
+        self._next_tx = tx_id + 1
+        self._next_pay = pay_id + 1
+        self._next_customer = customers + 1
+
+    @classmethod
+    def from_sql(cls, path: str = DATA_SQL) -> "StandInData":
+        """The customers, transactions and payments the Spring app is seeded with, as its DTOs render them."""
+        data = cls(customers=0)
+        for table, r in _sql_rows(path):
+            if table == "customer":
+                data.customers[r["id"]] = {"id": r["id"], "fullName": r["full_name"], "email": r["email"],
+                                           "phoneNumber": r["phone_number"]}
+            elif table == "transaction":
+                data.transactions[r["id"]] = {
+                    "id": r["id"], "customerId": r["customer_id"], "amount": r["amount"], "currency": r["currency"],
+                    "category": r["category"], "status": r["status"], "createdAt": _iso(r["created_at"]),
+                    "description": r["description"],
+                }
+            elif table == "payment":
+                data.payments[r["id"]] = {
+                    "id": r["id"], "transactionId": r["transaction_id"], "method": r["method"], "status": r["status"],
+                    "referenceId": r["reference_id"], "processedAt": _iso(r["processed_at"]), "failureReason": None,
+                }
+                data.payment_by_tx[r["transaction_id"]] = r["id"]
+        data._next_customer = max(data.customers, default=0) + 1
+        data._next_tx = max(data.transactions, default=0) + 1
+        data._next_pay = max(data.payments, default=0) + 1
+        return data
+
+    def _add_payment(self, pay_id: int, tx_id: int, method: str, status: str) -> Dict[str, Any]:
+        p = {
+            "id": pay_id,
+            "transactionId": tx_id,
+            "method": method,
+            "status": status,
+            "referenceId": f"ref-{pay_id}",
+            "processedAt": self.transactions[tx_id]["createdAt"],
+            "failureReason": None,
+        }
+        self.payments[pay_id] = p
+        self.payment_by_tx[tx_id] = pay_id
+        return p
+
+    # --- filtering helpers shared by the listing and analytics routes ---
+    def filter_transactions(self, q: Dict[str, str], customer_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        cid = customer_id if customer_id is not None else (int(q["customerId"]) if q.get("customerId") else None)
+        rows = []
+        for t in self.transactions.values():
+            if cid is not None and t["customerId"] != cid:
+                continue
+            if q.get("status") and t["status"] != q["status"]:
+                continue
+            if q.get("category") and t["category"] != q["category"]:
+                continue
+            if q.get("currency") and t["currency"] != q["currency"]:
+                continue
+            if q.get("from") and t["createdAt"] < q["from"]:
+                continue
+            if q.get("to") and t["createdAt"] > q["to"]:
+                continue
+            rows.append(t)
+        return rows
+
+
+def _page(rows: List[Dict[str, Any]], q: Dict[str, str]) -> Dict[str, Any]:
+    """Spring Data `Page<T>` JSON shape."""
+    page = int(q.get("page", 0))
+    size = max(1, int(q.get("size", 20)))
+    field, _, direction = (q.get("sort") or "createdAt,desc").partition(",")
+    rows = sorted(rows, key=lambda r: (r.get(field) is None, r.get(field)), reverse=direction.lower() == "desc")
+    chunk = rows[page * size:(page + 1) * size]
+    total_pages = (len(rows) + size - 1) // size
+    return {
+        "content": chunk,
+        "totalElements": len(rows),
+        "totalPages": total_pages,
+        "number": page,
+        "size": size,
+        "numberOfElements": len(chunk),
+        "first": page == 0,
+        "last": page >= total_pages - 1,
+        "empty": not chunk,
+    }
+
+
+class Latency:
+    """Server-side delay per request: log-normal with median `p50_ms` and 99th percentile `p99_ms`
+    (equal, or p99 omitted, gives a fixed delay). `routes` overrides it per (method, path) key,
+    e.g. slower analytics endpoints."""
+
+    def __init__(self, p50_ms: float, p99_ms: Optional[float] = None,
+                 routes: Optional[Dict[Tuple[str, str], "Latency"]] = None, seed: int = 3):
+        self.p50_ms = p50_ms
+        self.p99_ms = p50_ms if p99_ms is None else p99_ms
+        # z(0.99) = 2.3263: the sigma that puts p99 where asked
+        self.sigma = math.log(self.p99_ms / p50_ms) / 2.3263 if 0 < p50_ms < self.p99_ms else 0.0
+        self.routes = routes or {}
+        self._rnd = random.Random(seed)
+
+    def sample(self, key: Tuple[str, str]) -> float:
+        override = self.routes.get(key)
+        if override is not None:
+            return override.sample(key)
+        if self.sigma:
+            return self.p50_ms * math.exp(self.sigma * self._rnd.gauss(0.0, 1.0))
+        return self.p50_ms
+
+
+class Faults:
+    """Injected failures. Mutable, so a test can make upstream flap and then recover.
+
+    fail_next / slow_next: the next N matching requests answer `status` / take an extra `slow_ms`;
+    error_rate / slow_rate: random share of matching requests that do. `statuses` ({503: 3, 500: 1})
+    draws the status of each injected error by weight instead. `routes` limits it to (method, path) keys.
+    """
+
+    def __init__(self, error_rate: float = 0.0, status: int = 503, slow_rate: float = 0.0, slow_ms: float = 0.0,
+                 fail_next: int = 0, slow_next: int = 0, routes: Optional[set] = None, seed: int = 1,
+                 statuses: Optional[Dict[int, float]] = None):
+        self.error_rate, self.status = error_rate, status
+        self.statuses = statuses
+        self.slow_rate, self.slow_ms = slow_rate, slow_ms
+        self.fail_next, self.slow_next = fail_next, slow_next
+        self.routes = routes
+        self.injected: Counter = Counter()
+        self._rnd = random.Random(seed)
+
+    def pick(self, key: Tuple[str, str]) -> Tuple[Optional[int], float]:
+        """-> (status to fail with or None, extra delay in ms)."""
+        if self.routes is not None and key not in self.routes:
+            return None, 0.0
+        if self.fail_next > 0:
+            self.fail_next -= 1
+            self.injected["error"] += 1
+            return self._status(), 0.0
+        if self.error_rate and self._rnd.random() < self.error_rate:
+            self.injected["error"] += 1
+            return self._status(), 0.0
+        if self.slow_next > 0:
+            self.slow_next -= 1
+            self.injected["slow"] += 1
+            return None, self.slow_ms
+        if self.slow_rate and self._rnd.random() < self.slow_rate:
+            self.injected["slow"] += 1
+            return None, self.slow_ms
+        return None, 0.0
+
+    def _status(self) -> int:
+        if not self.statuses:
+            return self.status
+        return self._rnd.choices(list(self.statuses), weights=list(self.statuses.values()))[0]
+
+
+def build_app(data: Optional[StandInData] = None, latency_ms: Union[float, Latency] = 0.0,
+              faults: Optional[Faults] = None, validators: Optional[str] = None) -> Starlette:
+    """Starlette app serving the Spring routes under /api/v1/service."""
+    data = data or StandInData()
+    hits: Counter = Counter()
+    not_modified: Counter = Counter()
+    modified: Dict[str, Tuple[str, float]] = {}        # url path -> (body hash, Last-Modified epoch secs)
+
+    def _conditional(req: Request, path: str, resp: Response) -> Response:
+        tag = hashlib.md5(resp.body).hexdigest()
+        if validators == "etag":
+            etag = f'"0{tag}"'
+            if req.headers.get("if-none-match") == etag:
+                not_modified[("GET", path)] += 1
+                return Response(status_code=304, headers={"ETag": etag})
+            resp.headers["ETag"] = etag
+            return resp
+        prev = modified.get(req.url.path)
+        if prev is None or prev[0] != tag:
+            # whole seconds, strictly increasing, so a change is never hidden by the 1 s resolution
+            secs = max(float(int(time.time())), prev[1] + 1 if prev else 0.0)
+            prev = modified[req.url.path] = (tag, secs)
+        last_modified = formatdate(prev[1], usegmt=True)
+        if req.headers.get("if-modified-since") == last_modified:
+            not_modified[("GET", path)] += 1
+            return Response(status_code=304, headers={"Last-Modified": last_modified})
+        resp.headers["Last-Modified"] = last_modified
+        return resp
+
+    latency = latency_ms if isinstance(latency_ms, Latency) else Latency(latency_ms)
+
+    async def _delay(key: Tuple[str, str]):
+        ms = latency.sample(key)
+        if ms:
+            await asyncio.sleep(ms / 1000.0)
+
+    def _not_found() -> Response:
+        return JSONResponse({"error": "not found"}, status_code=404)
+
+    async def customer_create(req: Request):
+        body = await req.json()
+        for c in data.customers.values():
+            if c["email"] == body.get("email"):
+                return JSONResponse(c, status_code=201)
+        cid = data._next_customer
+        data._next_customer += 1
+        data.customers[cid] = {"id": cid, "fullName": body.get("fullName"),
+                               "email": body.get("email"), "phoneNumber": body.get("phoneNumber")}
+        return JSONResponse(data.customers[cid], status_code=201)
+
+    async def customer_get(req: Request):
+        c = data.customers.get(int(req.path_params["id"]))
+        return JSONResponse(c) if c else _not_found()
+
+    async def customer_transactions(req: Request):
+        rows = data.filter_transactions(dict(req.query_params), customer_id=int(req.path_params["id"]))
+        return JSONResponse(_page(rows, dict(req.query_params)))
+
+    async def tx_create(req: Request):
+        body = await req.json()
+        tx_id = data._next_tx
+        data._next_tx += 1
+        data.transactions[tx_id] = {
+            "id": tx_id,
+            "customerId": body["customerId"],
+            "amount": body["amount"],
+            "currency": body["currency"],
+            "category": body["category"],
+            "status": "PENDING",
+            "createdAt": datetime.utcnow().replace(microsecond=0).isoformat(),
+            "description": body.get("description"),
+        }
+        return JSONResponse(data.transactions[tx_id], status_code=201)
+
+    async def tx_get(req: Request):
+        t = data.transactions.get(int(req.path_params["id"]))
+        return JSONResponse(t) if t else _not_found()
+
+    async def tx_search(req: Request):
+        rows = data.filter_transactions(dict(req.query_params))
+        return JSONResponse(_page(rows, dict(req.query_params)))
+
+    async def tx_cancel(req: Request):
+        t = data.transactions.get(int(req.path_params["id"]))
+        if not t:
+            return _not_found()
+        if t["status"] == "PENDING":
+            t["status"] = "FAILED"
+        return JSONResponse(t)
+
+    async def tx_payment(req: Request):
+        pid = data.payment_by_tx.get(int(req.path_params["id"]))
+        return JSONResponse(data.payments[pid]) if pid else _not_found()
+
+    async def pay_make(req: Request):
+        body = await req.json()
+        tx_id = int(body["transactionId"])
+        if tx_id not in data.transactions:
+            return _not_found()
+        if tx_id in data.payment_by_tx:
+            return JSONResponse(data.payments[data.payment_by_tx[tx_id]], status_code=201)
+        pid = data._next_pay
+        data._next_pay += 1
+        data.transactions[tx_id]["status"] = "COMPLETED"
+        return JSONResponse(data._add_payment(pid, tx_id, body.get("method", "CreditCard"), "SUCCESS"), status_code=201)
+
+    async def pay_get(req: Request):
+        p = data.payments.get(int(req.path_params["id"]))
+        return JSONResponse(p) if p else _not_found()
+
+    async def pay_retry(req: Request):
+        p = data.payments.get(int(req.path_params["id"]))
+        if not p:
+            return _not_found()
+        p["status"] = "SUCCESS"
+        data.transactions[p["transactionId"]]["status"] = "COMPLETED"
+        return JSONResponse(p)
+
+    async def pay_fail(req: Request):
+        p = data.payments.get(int(req.path_params["id"]))
+        if not p:
+            return _not_found()
+        p["status"] = "FAILED"
+        data.transactions[p["transactionId"]]["status"] = "FAILED"
+        return JSONResponse({**p, "failureReason": req.query_params.get("reasonCode")})
+
+    def _completed(q: Dict[str, str]) -> List[Dict[str, Any]]:
+        return data.filter_transactions({**q, "status": "COMPLETED"})
+
+    async def an_summary(req: Request):
+        q = dict(req.query_params)
+        rows = _completed({k: q[k] for k in ("customerId", "from", "to") if k in q})
+        total = round(sum(r["amount"] for r in rows), 2)
+        return JSONResponse({
+            "customerId": int(q["customerId"]),
+            "baseCurrency": q.get("fxBase", "USD"),
+            "totalAmount": total,
+            "transactionCount": len(rows),
+            "averageTicket": round(total / len(rows), 2) if rows else 0,
+            "periodFrom": q.get("from"),
+            "periodTo": q.get("to"),
+        })
+
+    async def an_by_category(req: Request):
+        q = dict(req.query_params)
+        acc: Dict[str, Tuple[float, int]] = {}
+        for r in _completed({k: q[k] for k in ("customerId", "from", "to") if k in q}):
+            amt, cnt = acc.get(r["category"], (0.0, 0))
+            acc[r["category"]] = (amt + r["amount"], cnt + 1)
+        return JSONResponse([
+            {"customerId": int(q["customerId"]), "category": c, "totalAmount": round(a, 2), "transactionCount": n}
+            for c, (a, n) in acc.items()
+        ])
+
+    async def an_time_series(req: Request):
+        q = dict(req.query_params)
+        bucket = q.get("bucket", "day").lower()
+        buckets: Dict[str, float] = {}
+        for r in _completed({k: q[k] for k in ("customerId", "from", "to", "category") if k in q}):
+            ts = datetime.fromisoformat(r["createdAt"]).replace(hour=0, minute=0, second=0)
+            if bucket == "week":
+                ts -= timedelta(days=ts.weekday())
+            elif bucket == "month":
+                ts = ts.replace(day=1)
+            key = ts.isoformat()
+            buckets[key] = buckets.get(key, 0.0) + r["amount"]
+        return JSONResponse({
+            "customerId": int(q["customerId"]),
+            "bucket": bucket,
+            "category": q.get("category"),
+            "series": [{"timestampStart": k, "amount": round(v, 2)} for k, v in sorted(buckets.items())],
+        })
+
+    def _route(path, endpoint, method):
+        async def handler(req: Request):
+            hits[(method, path)] += 1
+            await _delay((method, path))
+            if faults is not None:
+                status, slow_ms = faults.pick((method, path))
+                if slow_ms:
+                    await asyncio.sleep(slow_ms / 1000.0)
+                if status is not None:
+                    return JSONResponse({"error": "injected fault"}, status_code=status)
+            resp = await endpoint(req)
+            if validators and method == "GET" and resp.status_code == 200:
+                resp = _conditional(req, path, resp)
+            return resp
+        return Route(API_PREFIX + path, handler, methods=[method])
+
+    routes = [
+        _route("/customers", customer_create, "POST"),
+        _route("/customers/{id:int}", customer_get, "GET"),
+        _route("/customers/{id:int}/transactions", customer_transactions, "GET"),
+        _route("/transactions", tx_create, "POST"),
+        _route("/transactions", tx_search, "GET"),
+        _route("/transactions/{id:int}", tx_get, "GET"),
+        _route("/transactions/{id:int}/cancel", tx_cancel, "POST"),
+        _route("/transactions/{id:int}/payment", tx_payment, "GET"),
+        _route("/payments", pay_make, "POST"),
+        _route("/payments/{id:int}", pay_get, "GET"),
+        _route("/payments/{id:int}/retry", pay_retry, "POST"),
+        _route("/payments/{id:int}/fail", pay_fail, "POST"),
+        _route("/analytics/spend-summary", an_summary, "GET"),
+        _route("/analytics/spend-by-category", an_by_category, "GET"),
+        _route("/analytics/time-series", an_time_series, "GET"),
+    ]
+    app = Starlette(routes=routes)
+    app.state.data = data
+    app.state.hits = hits
+    app.state.faults = faults
+    app.state.not_modified = not_modified
+    return app
+
+
+def _free_port(host: str) -> int:
+    with socket.socket() as s:
+        s.bind((host, 0))
+        return s.getsockname()[1]
+
+
+class ServedStandIn:
+    """Runs a stand-in app on a real socket in a background thread (for handshake-sensitive benchmarks)."""
+
+    def __init__(self, app: Starlette, host: str = "127.0.0.1", port: Optional[int] = None):
+        import uvicorn
+
+        self.app = app
+        self.host = host
+        self.port = port or _free_port(host)
+        self._server = uvicorn.Server(uvicorn.Config(app, host=host, port=self.port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}{API_PREFIX}"
+
+    def __enter__(self) -> "ServedStandIn":
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("stand-in upstream did not start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
@@ -7,5 +7,135 @@ MCP_SERVER_API_KEY   = os.getenv("MCP_SERVER_API_KEY", "lovethisapp")
 # HTTP
 REQUEST_TIMEOUT_SECS = float(os.getenv("REQUEST_TIMEOUT_SECS", "20"))
 
+# Upstream connection pool (one process-wide client, see payments_api/client.py)
+UPSTREAM_MAX_CONNECTIONS   = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "100"))   # per upstream host
+UPSTREAM_MAX_KEEPALIVE     = int(os.getenv("UPSTREAM_MAX_KEEPALIVE", "20"))      # idle connections kept open
+UPSTREAM_KEEPALIVE_EXPIRY  = float(os.getenv("UPSTREAM_KEEPALIVE_EXPIRY", "30")) # seconds an idle connection lives
+UPSTREAM_HTTP2             = bool(int(os.getenv("UPSTREAM_HTTP2", "0")))        # needs the `h2` package
+
+# Several upstream replicas: MY_PAYMENTS_BASE_URL="http://a:12136/api/v1/service,http://b:12136/api/v1/service"
+# is balanced client-side (payments_api/balancer.py), one keep-alive pool per replica
+UPSTREAM_LB_POLICY           = os.getenv("UPSTREAM_LB_POLICY", "ewma")           # ewma | least_outstanding
+UPSTREAM_HEALTH_PATH         = os.getenv("UPSTREAM_HEALTH_PATH", "/customers/1")  # active check; any answer < 500 is alive
+UPSTREAM_HEALTH_INTERVAL_SECS = float(os.getenv("UPSTREAM_HEALTH_INTERVAL_SECS", "5"))  # 0 = passive checks only
+UPSTREAM_HEALTH_TIMEOUT_SECS = float(os.getenv("UPSTREAM_HEALTH_TIMEOUT_SECS", "2"))
+UPSTREAM_HEALTH_FAILURES     = int(os.getenv("UPSTREAM_HEALTH_FAILURES", "2"))    # failed probes in a row = down
+UPSTREAM_EJECT_FAILURES      = int(os.getenv("UPSTREAM_EJECT_FAILURES", "3"))     # failed requests in a row = ejected
+UPSTREAM_EJECT_SECS          = float(os.getenv("UPSTREAM_EJECT_SECS", "10"))      # doubled per repeated ejection
+UPSTREAM_EJECT_MAX_SECS      = float(os.getenv("UPSTREAM_EJECT_MAX_SECS", "300"))
+
+# Upstream resilience (payments_api/resilience.py). Retries cover GETs and writes with an Idempotency-Key.
+RESILIENCE_ENABLED          = bool(int(os.getenv("RESILIENCE_ENABLED", "1")))
+RETRY_ATTEMPTS              = int(os.getenv("RETRY_ATTEMPTS", "3"))              # total tries per request
+RETRY_BASE_DELAY_SECS       = float(os.getenv("RETRY_BASE_DELAY_SECS", "0.1"))   # backoff base, doubled per retry, full jitter
+RETRY_MAX_DELAY_SECS        = float(os.getenv("RETRY_MAX_DELAY_SECS", "2"))
+ATTEMPT_TIMEOUT_SECS        = float(os.getenv("ATTEMPT_TIMEOUT_SECS", "5"))      # per try of an entity GET by id (others: REQUEST_TIMEOUT_SECS)
+BREAKER_FAILURE_THRESHOLD   = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))   # consecutive failures per endpoint
+BREAKER_RESET_SECS          = float(os.getenv("BREAKER_RESET_SECS", "10"))       # open -> one probe request
+HEDGE_ENABLED               = bool(int(os.getenv("HEDGE_ENABLED", "0")))        # second GET after the endpoint's p95
+HEDGE_MIN_DELAY_SECS        = float(os.getenv("HEDGE_MIN_DELAY_SECS", "0.05"))
+HEDGE_MIN_SAMPLES           = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))          # latencies needed before hedging
+
+# Admission control (payments_api/admission.py): an adaptive cap on concurrent upstream requests
+# with priority lanes (write > entity getter > bulk listing/analytics) and bounded queueing
+ADMISSION_ENABLED           = bool(int(os.getenv("ADMISSION_ENABLED", "1")))
+ADMISSION_INITIAL_LIMIT     = float(os.getenv("ADMISSION_INITIAL_LIMIT", "20"))
+ADMISSION_MIN_LIMIT         = float(os.getenv("ADMISSION_MIN_LIMIT", "2"))
+ADMISSION_MAX_LIMIT         = float(os.getenv("ADMISSION_MAX_LIMIT", str(UPSTREAM_MAX_CONNECTIONS)))
+ADMISSION_LATENCY_TOLERANCE = float(os.getenv("ADMISSION_LATENCY_TOLERANCE", "2.0"))  # x endpoint baseline = congested
+ADMISSION_BASELINE_WINDOW_SECS = float(os.getenv("ADMISSION_BASELINE_WINDOW_SECS", "60"))  # baseline = fastest of 1-2 windows
+ADMISSION_BACKOFF           = float(os.getenv("ADMISSION_BACKOFF", "0.8"))            # limit multiplier on congestion
+ADMISSION_BULK_SHARE        = float(os.getenv("ADMISSION_BULK_SHARE", "0.75"))        # of the limit, for listings/analytics
+ADMISSION_MAX_QUEUE         = int(os.getenv("ADMISSION_MAX_QUEUE", "200"))            # waiters per lane; more are rejected
+ADMISSION_MAX_WAIT_SECS     = os.getenv("ADMISSION_MAX_WAIT_SECS", "write=5,entity=2,bulk=1")
+
+# orjson for upstream bodies and tool results when installed (json module otherwise)
+FAST_JSON = bool(int(os.getenv("FAST_JSON", "1")))
+
+# Coalesce identical concurrent GETs / same-Idempotency-Key writes into one upstream request
+SINGLEFLIGHT_ENABLED = bool(int(os.getenv("SINGLEFLIGHT_ENABLED", "1")))
+
+# Idempotency-Key result store for write tools (payments_api/idempotency.py)
+IDEMPOTENCY_ENABLED     = bool(int(os.getenv("IDEMPOTENCY_ENABLED", "1")))
+IDEMPOTENCY_TTL_SECS    = float(os.getenv("IDEMPOTENCY_TTL_SECS", "86400"))
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))     # in-memory backend
+IDEMPOTENCY_SQLITE_PATH = os.getenv("IDEMPOTENCY_SQLITE_PATH", "")                # set to persist records in SQLite
+IDEMPOTENCY_SQLITE_BUSY_SECS = float(os.getenv("IDEMPOTENCY_SQLITE_BUSY_SECS", "0.5"))  # wait for a locked file
+
+# Read-through cache for customer / transaction / payment getters (payments_api/cache.py)
+CACHE_ENABLED     = bool(int(os.getenv("CACHE_ENABLED", "1")))
+CACHE_TTL_SECS    = float(os.getenv("CACHE_TTL_SECS", "15"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "5000"))
+CACHE_MAX_BYTES   = int(os.getenv("CACHE_MAX_BYTES", str(16 * 1024 * 1024)))  # upstream body bytes
+
+# Cache tier shared by worker processes (payments_api/shared_cache.py): SQLite file path, empty = off
+SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", "")
+SHARED_CACHE_READ_TIMEOUT_SECS = float(os.getenv("SHARED_CACHE_READ_TIMEOUT_SECS", "0.05"))  # locked longer = miss
+
+# Conditional revalidation of those getters on every read (payments_api/revalidate.py), in place of
+# the TTL cache above: If-None-Match / If-Modified-Since when upstream sent validators, a body hash otherwise
+REVALIDATE_ENABLED     = bool(int(os.getenv("REVALIDATE_ENABLED", "1")))
+REVALIDATE_MAX_ENTRIES = int(os.getenv("REVALIDATE_MAX_ENTRIES", "10000"))
+
+# Analytics result cache. Windows ending more than SETTLE secs ago are "past" and kept long;
+# windows touching now get the short TTL and are evicted by writes for that customer.
+ANALYTICS_CACHE_ENABLED       = bool(int(os.getenv("ANALYTICS_CACHE_ENABLED", "1")))
+ANALYTICS_CACHE_LIVE_TTL_SECS = float(os.getenv("ANALYTICS_CACHE_LIVE_TTL_SECS", "30"))
+ANALYTICS_CACHE_PAST_TTL_SECS = float(os.getenv("ANALYTICS_CACHE_PAST_TTL_SECS", str(6 * 3600)))
+ANALYTICS_CACHE_SETTLE_SECS   = float(os.getenv("ANALYTICS_CACHE_SETTLE_SECS", "86400"))  # covers upstream/local TZ skew
+ANALYTICS_CACHE_MAX_ENTRIES   = int(os.getenv("ANALYTICS_CACHE_MAX_ENTRIES", "2000"))
+ANALYTICS_CACHE_MAX_BYTES     = int(os.getenv("ANALYTICS_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Batch getter tools (get_customers_batch, ...)
+BATCH_MAX_IDS     = int(os.getenv("BATCH_MAX_IDS", "100"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))   # upstream calls in flight per batch
+
+# Auto-pagination tools (search_transactions_all, ...): upstream pages of PAGE_SIZE rows,
+# at most MAX_ROWS rows returned per tool call
+PAGINATE_PAGE_SIZE = int(os.getenv("PAGINATE_PAGE_SIZE", "200"))
+PAGINATE_MAX_ROWS  = int(os.getenv("PAGINATE_MAX_ROWS", "1000"))
+
+# Bulk export tool (export_transactions): every matching row streamed to a file under EXPORT_DIR
+# (default: <tmp>/mcp-exports), served by GET /exports/{id} until EXPORT_TTL_SECS after it was written
+EXPORT_DIR          = os.getenv("EXPORT_DIR", "")
+EXPORT_PAGE_SIZE    = int(os.getenv("EXPORT_PAGE_SIZE", "1000"))       # upstream page size while exporting
+EXPORT_MAX_ROWS     = int(os.getenv("EXPORT_MAX_ROWS", "5000000"))
+EXPORT_TTL_SECS     = float(os.getenv("EXPORT_TTL_SECS", "86400"))
+EXPORT_ROW_GROUP    = int(os.getenv("EXPORT_ROW_GROUP", "65536"))      # parquet rows buffered per row group
+
+# Cohort analytics tool (many customers, one window)
+COHORT_MAX_CUSTOMERS = int(os.getenv("COHORT_MAX_CUSTOMERS", "1000"))
+COHORT_CONCURRENCY   = int(os.getenv("COHORT_CONCURRENCY", "16"))       # per-customer upstream calls in flight
+COHORT_MAX_ROWS      = int(os.getenv("COHORT_MAX_ROWS", "200000"))      # listing rows walked for filter cohorts
+
+# Analytics engine: "upstream" asks Spring; "local" answers from an in-process NumPy column store
+# (payments_api/columnar.py) filled from transaction listings and updated by this server's writes
+ANALYTICS_MODE               = os.getenv("ANALYTICS_MODE", "upstream").lower()
+LOCAL_ANALYTICS_REFRESH_SECS = float(os.getenv("LOCAL_ANALYTICS_REFRESH_SECS", "300"))  # full reload per customer
+LOCAL_ANALYTICS_RECONCILE_SECS = float(os.getenv("LOCAL_ANALYTICS_RECONCILE_SECS", "600"))  # background reload of loaded customers, 0 = off
+ROLLUPS_ENABLED              = bool(int(os.getenv("ROLLUPS_ENABLED", "1")))   # daily prefix-sum rollups for window queries
+
+# Multi-process HTTP serving (mcpServer/workers.py). MCP_WORKERS: "1" = single process,
+# "auto" / "0" = one worker per CPU. Workers share the listening socket (pre-fork) or bind their own
+# with SO_REUSEPORT; SIGHUP to the supervisor restarts workers one by one, draining each.
+MCP_WORKERS               = os.getenv("MCP_WORKERS", "1")
+WORKER_REUSEPORT          = bool(int(os.getenv("WORKER_REUSEPORT", "0")))
+WORKER_DRAIN_SECS         = float(os.getenv("WORKER_DRAIN_SECS", "10"))     # in-flight requests finish within this
+WORKER_METRICS_DIR        = os.getenv("WORKER_METRICS_DIR", "")             # per-worker snapshots; set by the supervisor
+WORKER_METRICS_FLUSH_SECS = float(os.getenv("WORKER_METRICS_FLUSH_SECS", "5"))
+WORKER_RESTART_BACKOFF_SECS = float(os.getenv("WORKER_RESTART_BACKOFF_SECS", "0.5"))  # doubles per quick crash
+WORKER_MAX_QUICK_EXITS    = int(os.getenv("WORKER_MAX_QUICK_EXITS", "5"))   # in a row per slot, then give up
+MCP_WORKER_ID             = os.getenv("MCP_WORKER_ID", "")                  # set per worker by the supervisor
+
+# Prometheus text metrics on GET /metrics of the HTTP transport (util/metrics.py)
+METRICS_ENABLED = bool(int(os.getenv("METRICS_ENABLED", "1")))
+
+# Structured JSON logs (util/logs.py): formatted and written by a background thread, never on the event loop
+LOG_LEVEL           = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_SAMPLE_RATES    = os.getenv("LOG_SAMPLE_RATES", "")          # "mcpServer.tools=0.1,agent=0.5": keep that share of records below WARNING
+LOG_MAX_FIELD_CHARS = int(os.getenv("LOG_MAX_FIELD_CHARS", "2000"))  # per field, after JSON encoding
+LOG_REDACT_PII      = bool(int(os.getenv("LOG_REDACT_PII", "1")))   # mask emails and phone numbers
+LOG_QUEUE_SIZE      = int(os.getenv("LOG_QUEUE_SIZE", "10000"))      # records waiting for the writer; extra ones are dropped
+
 # Defaults for analytics
-DEFAULT_FX_BASE = os.getenv("DEFAULT_FX_BASE", "USD")
\ No newline at end of file
+DEFAULT_FX_BASE = os.getenv("DEFAULT_FX_BASE", "USD")
@@ -1,5 +1,7 @@
 from pydantic import BaseModel, Field, EmailStr
-from typing import Optional
+from typing import Literal, Optional, Union
+
+from mcpServer.config import BATCH_MAX_IDS, EXPORT_MAX_ROWS, PAGINATE_MAX_ROWS, PAGINATE_PAGE_SIZE, COHORT_MAX_CUSTOMERS
 
 # Customers
 class CreateCustomerIn(BaseModel):
@@ -9,6 +11,10 @@ class CreateCustomerIn(BaseModel):
 
 class GetCustomerIn(BaseModel):
     id: int = Field(..., ge=1)
+    fields: Optional[list[str]] = Field(default=None, min_length=1)   # return only these keys (id is always kept)
+
+class GetCustomersBatchIn(BaseModel):
+    ids: list[int] = Field(..., min_length=1, max_length=BATCH_MAX_IDS)
 
 class ListCustomerTxIn(BaseModel):
     id: int = Field(..., ge=1)  # customer id , three dots mean that the field is required
@@ -20,6 +26,18 @@ class ListCustomerTxIn(BaseModel):
     page: int = 0
     size: int = 10
     sort: str = "createdAt,desc"
+    fields: Optional[list[str]] = Field(default=None, min_length=1)   # return only these keys (id is always kept)
+    limit: Optional[int] = Field(default=None, ge=1, le=PAGINATE_PAGE_SIZE)  # first N rows; upstream page shrinks to fit
+
+class ListCustomerTxAllIn(BaseModel):
+    id: int = Field(..., ge=1)
+    status: Optional[str] = None
+    category: Optional[str] = None
+    currency: Optional[str] = None
+    from_: Optional[str] = Field(default=None, alias="from")
+    to: Optional[str] = None
+    sort: str = "createdAt,desc"
+    maxRows: int = Field(default=PAGINATE_MAX_ROWS, ge=1, le=PAGINATE_MAX_ROWS)  # stop walking pages here
 
 # Transactions
 class CreateTransactionIn(BaseModel):
@@ -32,6 +50,10 @@ class CreateTransactionIn(BaseModel):
 
 class GetTransactionIn(BaseModel):
     id: int = Field(..., ge=1)
+    fields: Optional[list[str]] = Field(default=None, min_length=1)   # return only these keys (id is always kept)
+
+class GetTransactionsBatchIn(BaseModel):
+    ids: list[int] = Field(..., min_length=1, max_length=BATCH_MAX_IDS)
 
 class SearchTransactionsIn(BaseModel):
     customerId: Optional[int] = None
@@ -43,6 +65,30 @@ class SearchTransactionsIn(BaseModel):
     page: int = 0
     size: int = 10
     sort: str = "createdAt,desc"
+    fields: Optional[list[str]] = Field(default=None, min_length=1)   # return only these keys (id is always kept)
+    limit: Optional[int] = Field(default=None, ge=1, le=PAGINATE_PAGE_SIZE)  # first N rows; upstream page shrinks to fit
+    format: Literal["rows", "columnar"] = "rows"      # columnar: `content` as {columns, rows, dictionaries}
+
+class SearchTransactionsAllIn(BaseModel):
+    customerId: Optional[int] = None
+    status: Optional[str] = None
+    category: Optional[str] = None
+    currency: Optional[str] = None
+    from_: Optional[str] = Field(default=None, alias="from")
+    to: Optional[str] = None
+    sort: str = "createdAt,desc"
+    maxRows: int = Field(default=PAGINATE_MAX_ROWS, ge=1, le=PAGINATE_MAX_ROWS)
+
+class ExportTransactionsIn(BaseModel):
+    customerId: Optional[int] = None
+    status: Optional[str] = None
+    category: Optional[str] = None
+    currency: Optional[str] = None
+    from_: Optional[str] = Field(default=None, alias="from")
+    to: Optional[str] = None
+    sort: str = "id,asc"                  # stable under concurrent inserts while the pages are walked
+    format: Literal["ndjson", "csv", "parquet"] = "ndjson"
+    maxRows: int = Field(default=EXPORT_MAX_ROWS, ge=1, le=EXPORT_MAX_ROWS)
 
 class CancelTransactionIn(BaseModel):
     id: int = Field(..., ge=1)
@@ -56,9 +102,15 @@ class MakePaymentIn(BaseModel):
 
 class GetPaymentIn(BaseModel):
     id: int = Field(..., ge=1)
+    fields: Optional[list[str]] = Field(default=None, min_length=1)   # return only these keys (id is always kept)
 
 class GetPaymentByTxIn(BaseModel):
     transactionId: int = Field(..., ge=1)
+    fields: Optional[list[str]] = Field(default=None, min_length=1)   # return only these keys (id is always kept)
+
+class GetPaymentsByTransactionsIn(BaseModel):
+    transactionIds: list[int] = Field(..., min_length=1, max_length=BATCH_MAX_IDS)
+    fields: Optional[list[str]] = Field(default=None, min_length=1)   # return only these keys (id is always kept)
 
 class RetryPaymentIn(BaseModel):
     id: int = Field(..., ge=1)
@@ -80,6 +132,7 @@ class SpendByCategoryIn(BaseModel):
     customerId: int = Field(..., ge=1)
     from_: str = Field(..., alias="from")
     to: str
+    format: Literal["rows", "columnar"] = "rows"      # columnar: `items` as {columns, rows, dictionaries}
 
 class TimeSeriesIn(BaseModel):
     customerId: int = Field(..., ge=1)
@@ -87,15 +140,82 @@ class TimeSeriesIn(BaseModel):
     from_: str = Field(..., alias="from")
     to: str
     category: Optional[str] = None
+    format: Literal["rows", "columnar"] = "rows"      # columnar: `series` as {columns, rows, dictionaries}
+
+class CohortAnalyticsIn(BaseModel):
+    customerIds: Optional[list[int]] = Field(default=None, min_length=1, max_length=COHORT_MAX_CUSTOMERS)  # None = every customer
+    from_: str = Field(..., alias="from")
+    to: str
+    category: Optional[str] = None
+    currency: Optional[str] = None
+    topN: int = Field(default=5, ge=1, le=50)
+
+# Batch getters
+class BatchError(BaseModel):
+    id: int
+    status: Optional[int] = None   # upstream HTTP status, None for transport errors
+    error: str
+
+class BatchOut(BaseModel):
+    requested: int
+    found: int
+    items: list[dict] = Field(default_factory=list)
+    errors: list[BatchError] = Field(default_factory=list)
+
+# Auto-paginated listings
+class PagedRowsOut(BaseModel):
+    items: list[dict] = Field(default_factory=list)
+    returned: int
+    totalElements: Optional[int] = None   # upstream count for the filter
+    truncated: bool                       # True when maxRows cut the set short
+    pages: int                            # upstream pages fetched
+
+class ExportOut(BaseModel):
+    exportId: str
+    format: str
+    rows: int
+    bytes: int
+    sha256: str                           # of the file as served
+    downloadPath: str                     # GET on the HTTP transport, with the x-mcp-api-key header
+    expiresInSecs: float
+    totalElements: Optional[int] = None
+    truncated: bool
+    pages: int
 
 class CategoryItem(BaseModel):
     category: str
     amount: float
     currency: str
 
+class TableOut(BaseModel):
+    columns: list[str]
+    rows: list[list] = Field(default_factory=list)
+
+class ColumnarOut(TableOut):
+    dictionaries: dict[str, list[str]] = Field(default_factory=dict)   # column -> values its row indexes refer to
+
 class SpendByCategoryOut(BaseModel):
     customerId: int
     from_: str
     to: str
     baseCurrency: str
-    items: list[CategoryItem] = Field(default_factory=list)
+    items: Union[list[CategoryItem], ColumnarOut] = Field(default_factory=list)
+
+class CohortTotals(BaseModel):
+    customers: int
+    customersWithSpend: int
+    totalAmount: float
+    transactionCount: int
+    averageTicket: float
+
+class CohortOut(BaseModel):
+    from_: Optional[str] = Field(default=None, alias="from")
+    to: Optional[str] = None
+    source: str                          # per-customer | listing
+    truncated: bool                      # listing walk hit COHORT_MAX_ROWS
+    totals: CohortTotals
+    customers: TableOut                  # customerId, totalAmount, transactionCount, topCategory
+    categories: TableOut                 # category, totalAmount, transactionCount, customers, share
+    topCustomers: list[int] = Field(default_factory=list)
+    topCategories: list[str] = Field(default_factory=list)
+    errors: list[BatchError] = Field(default_factory=list)
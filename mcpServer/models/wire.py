@@ -0,0 +1,68 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Type, TypeVar
+
+# Slotted response types mirroring the Spring response records (dto/response, dto/analytics).
+# A slotted row is ~100 bytes against ~650 for the decoded dict, so use them for rows that are
+# kept around or reshaped; orjson (payments_api/codec.py) serializes them without a dict copy.
+# The upstream client itself keeps returning dicts, which is what the caches and tools share.
+
+T = TypeVar("T", bound="_Wire")
+
+
+class _Wire:
+    __slots__ = ()
+
+    @classmethod
+    def from_json(cls: Type[T], d: Dict[str, Any]) -> T:
+        """Known fields by name; missing ones are None, unknown ones are dropped."""
+        return cls(*map(d.get, cls.__dataclass_fields__))
+
+    @classmethod
+    def many(cls: Type[T], rows: Optional[List[Dict[str, Any]]]) -> List[T]:
+        from_json = cls.from_json
+        return [from_json(r) for r in rows or ()]
+
+
+@dataclass(slots=True)
+class Customer(_Wire):
+    id: Optional[int]
+    fullName: Optional[str]
+    email: Optional[str]
+    phoneNumber: Optional[str]
+
+
+@dataclass(slots=True)
+class Transaction(_Wire):
+    id: Optional[int]
+    customerId: Optional[int]
+    amount: Optional[float]
+    currency: Optional[str]
+    category: Optional[str]
+    status: Optional[str]
+    createdAt: Optional[str]
+    description: Optional[str]
+
+
+@dataclass(slots=True)
+class Payment(_Wire):
+    id: Optional[int]
+    transactionId: Optional[int]
+    method: Optional[str]
+    status: Optional[str]
+    referenceId: Optional[str]
+    processedAt: Optional[str]
+    failureReason: Optional[str]
+
+
+@dataclass(slots=True)
+class CategorySpendItem(_Wire):
+    """One row of the spend_by_category tool output (SpendByCategoryOut.items)."""
+    category: str
+    amount: float
+    transactionCount: int
+    currency: str
+
+    @classmethod
+    def from_upstream(cls, r: Dict[str, Any], currency: str) -> "CategorySpendItem":
+        return cls(r.get("category", ""), float(r.get("totalAmount", 0) or 0),
+                   r.get("transactionCount", 0), r.get("currency", currency))
@@ -0,0 +1,242 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from mcpServer.config import (
+    ADMISSION_INITIAL_LIMIT, ADMISSION_MIN_LIMIT, ADMISSION_MAX_LIMIT, ADMISSION_LATENCY_TOLERANCE,
+    ADMISSION_BACKOFF, ADMISSION_BULK_SHARE, ADMISSION_MAX_QUEUE, ADMISSION_MAX_WAIT_SECS,
+    ADMISSION_BASELINE_WINDOW_SECS,
+)
+from mcpServer.payments_api.resilience import CircuitOpen, Endpoint
+from mcpServer.util.logs import get_logger
+from mcpServer.util.metrics import (
+    ADMISSION_LIMIT, ADMISSION_LIMIT_CHANGES, ADMISSION_QUEUE, ADMISSION_REJECTED, ADMISSION_WAIT_SECONDS,
+)
+
+# Admission control in front of every upstream attempt: at most `limit` requests in flight, the limit
+# found by AIMD on latency. Each endpoint keeps a baseline (its fastest recent answer); a
+# response slower than ADMISSION_LATENCY_TOLERANCE x baseline, or an overload answer (429/503/504,
+# timeout), cuts the limit by ADMISSION_BACKOFF, at most once per round of requests. Requests that
+# complete while at least half the limit is in use raise it by 1/limit, so up to +1 per round.
+#
+# Waiting requests are served by lane: writes, then single-entity getters, then bulk (listings and
+# analytics, which Spring answers from unpaged result sets). Bulk never holds more than
+# ADMISSION_BULK_SHARE of the limit, so a burst of analytics leaves room for make_payment.
+# A full lane queue, or a wait past the lane's ADMISSION_MAX_WAIT_SECS, rejects at once.
+
+LANES = ("write", "entity", "bulk")              # priority order
+
+log = get_logger("mcpServer.admission")
+
+
+class AdmissionRejected(CircuitOpen):
+    """Refused before sending: the upstream is at its concurrency limit and the lane queue is full or too slow.
+
+    A CircuitOpen, so it is neither retried nor counted against the endpoint's breaker, and callers
+    that handle upstream outages (fan_out, reconcile) treat it the same way.
+    """
+
+
+def lane(ep: Endpoint) -> str:
+    method, path = ep
+    if method != "GET":
+        return "write"
+    if path.endswith("/{id}") or path.endswith("/payment"):
+        return "entity"
+    return "bulk"
+
+
+def parse_waits(spec: str) -> Dict[str, float]:
+    """"write=5,entity=2,bulk=1" -> per-lane max wait; a bare number applies to every lane."""
+    if "=" not in spec:
+        return {name: float(spec) for name in LANES}
+    waits = {name: 1.0 for name in LANES}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, secs = part.partition("=")
+        waits[name.strip()] = float(secs)
+    return waits
+
+
+class _Baseline:
+    """Windowed minimum of an endpoint's latency: the fastest answer of the current or the previous window.
+
+    A minimum ignores how many slow answers a burst produces; rotating windows let it follow a
+    lasting change (a bigger data set, a slower host) within two windows.
+    """
+
+    __slots__ = ("window", "current", "previous", "rotated")
+
+    def __init__(self, window: float, now: float):
+        self.window = window
+        self.current: Optional[float] = None
+        self.previous: Optional[float] = None
+        self.rotated = now
+
+    def update(self, secs: float, now: float) -> float:
+        if now - self.rotated >= self.window:
+            self.previous, self.current, self.rotated = self.current, None, now
+        if self.current is None or secs < self.current:
+            self.current = secs
+        return self.current if self.previous is None else min(self.current, self.previous)
+
+
+class Permit:
+    __slots__ = ("lane", "ep", "started")
+
+    def __init__(self, lane: str, ep: Endpoint, started: float):
+        self.lane, self.ep, self.started = lane, ep, started
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        initial_limit: float = ADMISSION_INITIAL_LIMIT,
+        min_limit: float = ADMISSION_MIN_LIMIT,
+        max_limit: float = ADMISSION_MAX_LIMIT,
+        tolerance: float = ADMISSION_LATENCY_TOLERANCE,
+        backoff: float = ADMISSION_BACKOFF,
+        bulk_share: float = ADMISSION_BULK_SHARE,
+        max_queue: int = ADMISSION_MAX_QUEUE,
+        max_wait: str = ADMISSION_MAX_WAIT_SECS,
+        min_slack_secs: float = 0.005,           # slower-than-baseline by less than this is jitter, not congestion
+        baseline_window_secs: float = ADMISSION_BASELINE_WINDOW_SECS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_limit, self.max_limit = max(1.0, min_limit), max(min_limit, max_limit)
+        self.limit = min(self.max_limit, max(self.min_limit, initial_limit))
+        self.tolerance, self.backoff, self.bulk_share = tolerance, backoff, bulk_share
+        self.max_queue = max_queue
+        self.max_wait = parse_waits(max_wait)
+        self.min_slack = min_slack_secs
+        self.baseline_window = baseline_window_secs
+        self._clock = clock
+        self.in_flight = 0
+        self.running: Dict[str, int] = {name: 0 for name in LANES}
+        self._queues: Dict[str, Deque[Tuple["asyncio.Future[None]", Permit]]] = {name: deque() for name in LANES}
+        self._baselines: Dict[Endpoint, _Baseline] = {}
+        self._last_decrease = float("-inf")
+        self.admitted = self.queued = self.increases = self.decreases = 0
+        self.rejected: Dict[str, int] = {"queueFull": 0, "timeout": 0}
+        ADMISSION_LIMIT.set(value=int(self.limit))
+
+    # --- admission ---
+
+    def _fits(self, name: str) -> bool:
+        if self.in_flight >= int(self.limit):
+            return False
+        return name != "bulk" or self.running["bulk"] < max(1, int(self.limit * self.bulk_share))
+
+    def _grant(self, permit: Permit) -> Permit:
+        self.in_flight += 1
+        self.running[permit.lane] += 1
+        self.admitted += 1
+        permit.started = self._clock()
+        return permit
+
+    async def acquire(self, ep: Endpoint) -> Permit:
+        name = lane(ep)
+        permit = Permit(name, ep, 0.0)
+        queue = self._queues[name]
+        if not queue and self._fits(name):
+            return self._grant(permit)
+        if len(queue) >= self.max_queue:
+            self._reject(name, "queueFull")
+        fut: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        queue.append((fut, permit))
+        self.queued += 1
+        ADMISSION_QUEUE.inc(name)
+        t0 = self._clock()
+        try:
+            await asyncio.wait_for(fut, self.max_wait.get(name, 1.0))
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if fut.done() and not fut.cancelled():
+                self.release(permit, None, False)             # granted as the wait ended: hand the slot on
+            else:
+                self._drop(name, fut)
+            if isinstance(e, asyncio.TimeoutError):
+                self._reject(name, "timeout")
+            raise
+        finally:
+            ADMISSION_WAIT_SECONDS.observe(self._clock() - t0, name)
+        return permit
+
+    def _drop(self, name: str, fut: "asyncio.Future[None]") -> None:
+        queue = self._queues[name]
+        for i, (f, _) in enumerate(queue):
+            if f is fut:
+                del queue[i]
+                ADMISSION_QUEUE.dec(name)
+                return
+
+    def _reject(self, name: str, reason: str) -> None:
+        self.rejected[reason] += 1
+        ADMISSION_REJECTED.inc(name, reason)
+        raise AdmissionRejected(f"upstream admission: {name} lane {'queue full' if reason == 'queueFull' else 'wait timed out'} "
+                                f"(limit {int(self.limit)}, in flight {self.in_flight})")
+
+    def _wake(self) -> None:
+        for name in LANES:
+            queue = self._queues[name]
+            while queue and self._fits(name):
+                fut, permit = queue.popleft()
+                ADMISSION_QUEUE.dec(name)
+                if not fut.done():
+                    self._grant(permit)
+                    fut.set_result(None)
+            if queue and self.in_flight >= int(self.limit):
+                return                                        # lower lanes cannot fit either
+
+    # --- completion ---
+
+    def release(self, permit: Permit, latency: Optional[float], overloaded: bool) -> None:
+        """`latency` of the finished attempt (None when it never got an answer); `overloaded` for 429/503/504/timeouts."""
+        saturated = self.in_flight * 2 >= self.limit           # the limit is being used, so probe above it
+        self.in_flight -= 1
+        self.running[permit.lane] -= 1
+        if overloaded:
+            self._decrease(permit)
+        elif latency is not None:
+            now = self._clock()
+            baseline = self._baselines.get(permit.ep)
+            if baseline is None:
+                baseline = self._baselines[permit.ep] = _Baseline(self.baseline_window, now)
+            base = baseline.update(latency, now)
+            if latency > base * self.tolerance and latency - base > self.min_slack:
+                self._decrease(permit)
+            elif saturated:
+                self._set_limit(self.limit + 1.0 / self.limit)
+        self._wake()
+
+    def _decrease(self, permit: Permit) -> None:
+        if permit.started < self._last_decrease:
+            return                                            # admitted before the last cut: same congestion episode
+        self._last_decrease = self._clock()
+        self._set_limit(self.limit * self.backoff)
+
+    def _set_limit(self, value: float) -> None:
+        before = int(self.limit)
+        self.limit = min(self.max_limit, max(self.min_limit, value))
+        after = int(self.limit)
+        if after != before:
+            direction = "up" if after > before else "down"
+            if direction == "up":
+                self.increases += 1
+            else:
+                self.decreases += 1
+                log.info("upstream concurrency limit %d -> %d", before, after)
+            ADMISSION_LIMIT_CHANGES.inc(direction)
+            ADMISSION_LIMIT.set(value=after)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "inFlight": self.in_flight,
+            "queued": {name: len(q) for name, q in self._queues.items()},
+            "admitted": self.admitted,
+            "waited": self.queued,
+            "rejectedQueueFull": self.rejected["queueFull"],
+            "rejectedTimeout": self.rejected["timeout"],
+            "limitIncreases": self.increases,
+            "limitDecreases": self.decreases,
+        }
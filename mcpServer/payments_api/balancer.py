@@ -0,0 +1,177 @@
+import asyncio
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from mcpServer.config import (
+    UPSTREAM_LB_POLICY, UPSTREAM_HEALTH_PATH, UPSTREAM_HEALTH_INTERVAL_SECS, UPSTREAM_HEALTH_TIMEOUT_SECS,
+    UPSTREAM_HEALTH_FAILURES, UPSTREAM_EJECT_FAILURES, UPSTREAM_EJECT_SECS, UPSTREAM_EJECT_MAX_SECS,
+)
+from mcpServer.util.logs import get_logger
+
+# Client-side load balancing over several upstream replicas (MY_PAYMENTS_BASE_URL="url1,url2,...").
+# Each replica has its own keep-alive pool. A request goes to the better of two randomly drawn
+# available replicas ("power of two choices"), scored by
+#   least_outstanding   requests in flight
+#   ewma                latency EWMA x (in flight + 1): fast replicas get more, a stalling one is
+#                       avoided as soon as requests pile up on it
+# Passive checks: UPSTREAM_EJECT_FAILURES consecutive failed requests (transport errors, 502/503/504;
+# not 429, which is rate limiting) eject a replica for UPSTREAM_EJECT_SECS, doubling per repeated ejection up to UPSTREAM_EJECT_MAX_SECS.
+# Active checks: every UPSTREAM_HEALTH_INTERVAL_SECS each replica gets GET UPSTREAM_HEALTH_PATH; any
+# answer below 500 is alive. UPSTREAM_HEALTH_FAILURES failed probes in a row mark it down until a probe
+# succeeds, which also ends an ejection early. With no replica available every replica is tried
+# again (panic mode) rather than failing requests outright.
+
+log = get_logger("mcpServer.balancer")
+
+EWMA_WEIGHT = 0.2                 # of each new latency sample
+
+
+class Replica:
+    def __init__(self, base_url: str, client: httpx.AsyncClient):
+        self.base_url = base_url
+        self.client = client
+        self.outstanding = 0
+        self.ewma: Optional[float] = None            # seconds
+        self.failures = 0                            # consecutive, passive
+        self.probe_failures = 0                      # consecutive, active
+        self.up = True                               # per active checks
+        self.ejected_until = 0.0
+        self.ejections = 0
+        self.requests = self.errors = 0
+
+    def available(self, now: float) -> bool:
+        return self.up and now >= self.ejected_until
+
+    def observe(self, secs: float) -> None:
+        self.ewma = secs if self.ewma is None else self.ewma + (secs - self.ewma) * EWMA_WEIGHT
+
+
+class Balancer:
+    def __init__(
+        self,
+        base_urls: List[str],
+        new_client: Callable[[str], httpx.AsyncClient],
+        policy: str = UPSTREAM_LB_POLICY,
+        health_path: str = UPSTREAM_HEALTH_PATH,
+        health_interval: float = UPSTREAM_HEALTH_INTERVAL_SECS,
+        health_timeout: float = UPSTREAM_HEALTH_TIMEOUT_SECS,
+        health_failures: int = UPSTREAM_HEALTH_FAILURES,
+        eject_failures: int = UPSTREAM_EJECT_FAILURES,
+        eject_secs: float = UPSTREAM_EJECT_SECS,
+        eject_max_secs: float = UPSTREAM_EJECT_MAX_SECS,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None,
+    ):
+        if policy not in ("least_outstanding", "ewma"):
+            raise ValueError(f"UPSTREAM_LB_POLICY must be least_outstanding or ewma, not {policy!r}")
+        self.replicas = [Replica(u, new_client(u)) for u in base_urls]
+        self.policy = policy
+        self.health_path = health_path
+        self.health_interval, self.health_timeout, self.health_failures = health_interval, health_timeout, health_failures
+        self.eject_failures, self.eject_secs, self.eject_max_secs = eject_failures, eject_secs, eject_max_secs
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._checker: Optional[asyncio.Task] = None
+        self.panics = 0
+
+    # --- selection ---
+
+    def _score(self, r: Replica) -> float:
+        if self.policy == "least_outstanding":
+            return r.outstanding
+        # unmeasured replicas score as the fastest measured one, so they get tried
+        measured = [x.ewma for x in self.replicas if x.ewma is not None]
+        ewma = r.ewma if r.ewma is not None else (min(measured) if measured else 0.0)
+        return (ewma + 1e-4) * (r.outstanding + 1)
+
+    def pick(self) -> Replica:
+        self._ensure_checker()
+        now = self._clock()
+        pool = [r for r in self.replicas if r.available(now)]
+        if not pool:
+            self.panics += 1
+            pool = self.replicas
+        if len(pool) == 1:
+            chosen = pool[0]
+        else:
+            a, b = self._rng.sample(pool, 2)
+            chosen = a if self._score(a) <= self._score(b) else b
+        chosen.outstanding += 1
+        chosen.requests += 1
+        return chosen
+
+    def done(self, r: Replica, latency: Optional[float], failed: bool) -> None:
+        """After a request: `latency` when an answer arrived, `failed` for transport errors / 502-504."""
+        r.outstanding -= 1
+        now = self._clock()
+        if not failed:
+            if latency is not None:                  # an answer; a cancelled request says nothing
+                r.observe(latency)
+                r.failures = 0
+            return                                   # (a fast 503 must not make a replica look fast)
+        r.errors += 1
+        r.failures += 1
+        if r.failures >= self.eject_failures and now >= r.ejected_until:
+            self._eject(r, now)
+
+    def _eject(self, r: Replica, now: float) -> None:
+        r.ejections += 1
+        secs = min(self.eject_max_secs, self.eject_secs * 2 ** (r.ejections - 1))
+        r.ejected_until = now + secs
+        r.failures = 0
+        log.warning("upstream %s ejected for %.0fs after %d failures", r.base_url, secs, self.eject_failures)
+
+    # --- active health checks ---
+
+    def _ensure_checker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self.health_interval > 0 and (self._checker is None or self._checker.get_loop() is not loop):
+            self._checker = loop.create_task(self._check_forever())
+
+    async def _check_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            await self.check()
+
+    async def check(self) -> None:
+        await asyncio.gather(*(self._probe(r) for r in self.replicas))
+
+    async def _probe(self, r: Replica) -> None:
+        try:
+            resp = await r.client.get(self.health_path, timeout=self.health_timeout)
+            alive = resp.status_code < 500
+        except httpx.HTTPError:
+            alive = False
+        if alive:
+            r.probe_failures = 0
+            if not r.up or r.ejected_until > self._clock():
+                log.info("upstream %s is healthy again", r.base_url)
+            r.up, r.ejected_until = True, 0.0
+            return
+        r.probe_failures += 1
+        if r.up and r.probe_failures >= self.health_failures:
+            r.up = False
+            log.warning("upstream %s marked down after %d failed health checks", r.base_url, r.probe_failures)
+
+    async def close(self) -> None:
+        if self._checker is not None:
+            self._checker.cancel()
+            self._checker = None
+        for r in self.replicas:
+            await r.client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        now = self._clock()
+        return {
+            "policy": self.policy,
+            "replicas": len(self.replicas),
+            "available": sum(r.available(now) for r in self.replicas),
+            "panics": self.panics,
+            "ejections": sum(r.ejections for r in self.replicas),
+            "byReplica": {r.base_url: {"requests": r.requests, "errors": r.errors, "outstanding": r.outstanding,
+                                       "ewmaMs": None if r.ewma is None else round(r.ewma * 1000, 2),
+                                       "available": r.available(now)} for r in self.replicas},
+        }
@@ -0,0 +1,146 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from mcpServer.config import CACHE_TTL_SECS, CACHE_MAX_ENTRIES, CACHE_MAX_BYTES
+
+# Read-through cache for upstream reads (entity getters, analytics windows).
+# Keys are small tuples like ("customer", 7); values are the decoded JSON bodies.
+# Entries may carry tags (e.g. ("customer", 7)) so related entries can be found and evicted together.
+# With `shared` (a SharedCacheTier) misses fall through to the on-disk tier other worker processes
+# fill, and puts / invalidations go to both tiers.
+class ResponseCache:
+    def __init__(
+        self,
+        ttl_secs: float = CACHE_TTL_SECS,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        max_bytes: int = CACHE_MAX_BYTES,
+        clock: Callable[[], float] = time.monotonic,
+        shared=None,
+        namespace: str = "",
+    ):
+        self.ttl_secs = ttl_secs
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes            # budget measured on the upstream body size
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, Any, Tuple]]" = OrderedDict()   # key -> (expires_at, size, value, tags)
+        self._tags: Dict[Hashable, Set[Hashable]] = {}
+        self._bytes = 0
+        # Bumped on every invalidation; a fill that started before it is dropped (see put()).
+        self.epoch = 0
+        self.shared = shared
+        self.namespace = namespace
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = self.shared_hits = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        item = self._entries.get(key)
+        if item is not None and item[0] <= self._clock():
+            self._drop(key)
+            self.expirations += 1
+            item = None
+        if item is None:
+            return self._get_shared(key)
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return item[2]
+
+    def _get_shared(self, key: Hashable) -> Optional[Any]:
+        rec = self.shared.get(self.namespace, key) if self.shared is not None else None
+        if rec is None:
+            self.misses += 1
+            return None
+        value, size, left, tags = rec
+        self._store(key, value, size, left, tags)         # tagged, so a customer invalidation finds it
+        self.hits += 1
+        self.shared_hits += 1
+        return value
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Look without touching LRU order or counters (used to follow entity links on invalidation)."""
+        item = self._entries.get(key)
+        return item[2] if item else None
+
+    def __len__(self) -> int:
+        return len(self._entries)                         # this process only; stats() has the shared count
+
+    def tagged(self, tag: Hashable) -> List[Hashable]:
+        keys = list(self._tags.get(tag, ()))
+        if self.shared is not None:
+            keys += [k for k in self.shared.tagged(self.namespace, tag) if k not in self._tags.get(tag, ())]
+        return keys
+
+    def put(
+        self,
+        key: Hashable,
+        value: Any,
+        size: int,
+        epoch: Optional[int] = None,
+        ttl: Optional[float] = None,
+        tags: Iterable[Hashable] = (),
+    ) -> None:
+        if epoch is not None and epoch != self.epoch:
+            return  # a write invalidated entries while this read was in flight; don't store a stale body
+        if size > self.max_bytes:
+            return
+        ttl = self.ttl_secs if ttl is None else ttl
+        tags = tuple(tags)
+        self._store(key, value, size, ttl, tags)
+        if self.shared is not None:
+            self.shared.put(self.namespace, key, value, size, ttl, tags)
+
+    def _store(self, key: Hashable, value: Any, size: int, ttl: float, tags: Tuple) -> None:
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (self._clock() + ttl, size, value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            old, _ = next(iter(self._entries.items()))
+            self._drop(old)
+            self.evictions += 1
+
+    def invalidate(self, *keys: Hashable) -> None:
+        self.epoch += 1
+        for key in keys:
+            if key in self._entries:
+                self._drop(key)
+                self.invalidations += 1
+        if self.shared is not None and keys:
+            self.shared.delete(self.namespace, keys)
+
+    def clear(self) -> None:
+        self.epoch += 1
+        self._entries.clear()
+        self._tags.clear()
+        self._bytes = 0
+        if self.shared is not None:
+            self.shared.clear(self.namespace)
+
+    def _drop(self, key: Hashable) -> None:
+        _, size, _, tags = self._entries.pop(key)
+        self._bytes -= size
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "maxEntries": self.max_entries,
+            "maxBytes": self.max_bytes,
+            "ttlSecs": self.ttl_secs,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "sharedHits": self.shared_hits,
+            "sharedEntries": self.shared.count(self.namespace) if self.shared is not None else None,
+        }
@@ -1,127 +1,629 @@
-from typing import Any, Dict, Optional
+import asyncio
+import copy
+import time
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Hashable, Iterable, Optional, Tuple
 import httpx
-from mcpServer.config import MY_PAYMENTS_BASE_URL, MY_PAYMENTS_API_KEY, REQUEST_TIMEOUT_SECS
+from mcpServer.config import (
+    MY_PAYMENTS_BASE_URL, MY_PAYMENTS_API_KEY, REQUEST_TIMEOUT_SECS,
+    UPSTREAM_MAX_CONNECTIONS, UPSTREAM_MAX_KEEPALIVE, UPSTREAM_KEEPALIVE_EXPIRY, UPSTREAM_HTTP2,
+    CACHE_ENABLED, SINGLEFLIGHT_ENABLED, ANALYTICS_CACHE_ENABLED, ANALYTICS_CACHE_LIVE_TTL_SECS, ANALYTICS_CACHE_PAST_TTL_SECS,
+    ANALYTICS_CACHE_SETTLE_SECS, ANALYTICS_CACHE_MAX_ENTRIES, ANALYTICS_CACHE_MAX_BYTES, PAGINATE_PAGE_SIZE,
+    ANALYTICS_MODE, IDEMPOTENCY_ENABLED, RESILIENCE_ENABLED, ATTEMPT_TIMEOUT_SECS, REVALIDATE_ENABLED,
+    SHARED_CACHE_PATH, ADMISSION_ENABLED,
+)
+from mcpServer.payments_api.admission import AdmissionController
+from mcpServer.payments_api.balancer import Balancer
+from mcpServer.payments_api.cache import ResponseCache
+from mcpServer.payments_api.codec import loads
+from mcpServer.payments_api.idempotency import IdempotencyStore, new_idempotency_store
+from mcpServer.payments_api.resilience import RETRY_STATUSES, ResiliencePolicy, endpoint
+from mcpServer.payments_api.revalidate import Validated, ValidatorStore, digest
+from mcpServer.payments_api.shared_cache import SharedCacheTier
+from mcpServer.util.logs import get_logger
+from mcpServer.util.metrics import UPSTREAM_IN_FLIGHT, observe_upstream
+from mcpServer.payments_api.singleflight import SingleFlight
+
+log = get_logger("mcpServer.client")
+
+# Per-try cap for point reads by id: cheap upstream, so a try that stalls past it is better retried.
+ENTITY_ATTEMPT_TIMEOUT_SECS = min(REQUEST_TIMEOUT_SECS, ATTEMPT_TIMEOUT_SECS)
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401  (httpx needs it for http2=True)
+        return True
+    except ImportError:
+        return False
+
+def _iso19(ts: Optional[str]) -> Optional[str]:
+    """Upstream LocalDateTime -> 'YYYY-MM-DDTHH:MM:SS' so windows and createdAt compare as strings."""
+    if not ts:
+        return None
+    ts = ts[:19]
+    return ts + ":00" if len(ts) == 16 else ts
+
+def new_analytics_cache(shared=None) -> ResponseCache:
+    return ResponseCache(
+        ttl_secs=ANALYTICS_CACHE_LIVE_TTL_SECS,
+        max_entries=ANALYTICS_CACHE_MAX_ENTRIES,
+        max_bytes=ANALYTICS_CACHE_MAX_BYTES,
+        shared=shared,
+        namespace="analytics",
+    )
+
+def new_columnar_store():
+    """Local analytics store, or None when numpy is missing (analytics then stay upstream)."""
+    try:
+        from mcpServer.payments_api.columnar import ColumnarStore
+    except ImportError:
+        log.warning("ANALYTICS_MODE=local needs `numpy`; answering analytics from upstream")
+        return None
+    return ColumnarStore()
+
+# Payment outcome -> resulting transaction status (PaymentService sets both together)
+_TX_STATUS_AFTER_PAYMENT = {"SUCCESS": "COMPLETED", "FAILED": "FAILED"}
 
 # This client implementation is used to make API calls to the specified API ( This is where API is wrapped)
 class PaymentsApiClient:
-    def __init__(self, base_url: str = MY_PAYMENTS_BASE_URL, api_key: str = MY_PAYMENTS_API_KEY):
-        self.base_url = base_url.rstrip("/")
+    def __init__(
+        self,
+        base_url: str = MY_PAYMENTS_BASE_URL,
+        api_key: str = MY_PAYMENTS_API_KEY,
+        transport: Optional[httpx.AsyncBaseTransport] = None,   # tests/benchmarks plug a stand-in here
+        cache: Optional[ResponseCache] = None,                   # read-through cache for entity getters
+        analytics_cache: Optional[ResponseCache] = None,         # window-aware cache for analytics results
+        coalesce: bool = SINGLEFLIGHT_ENABLED,                   # share identical in-flight requests
+        local=None,                                              # ColumnarStore: answer analytics locally
+        idempotency: Optional[IdempotencyStore] = None,          # replay keyed writes instead of re-sending
+        resilience: Optional[ResiliencePolicy] = None,           # retries / circuit breaker / hedged GETs
+        revalidator: Optional[ValidatorStore] = None,            # conditional GETs for entity getters (replaces `cache`)
+        admission: Optional[AdmissionController] = None,         # adaptive concurrency limit + priority lanes
+    ):
+        # "url1,url2,...": replicas balanced client-side (payments_api/balancer.py)
+        self.base_urls = [u.strip().rstrip("/") for u in base_url.split(",") if u.strip()]
+        self.base_url = self.base_urls[0]
         self.headers = {}
         if api_key:
             self.headers["X-API-Key"] = api_key
+        self._transport = transport
+        self.cache = cache
+        self.analytics_cache = analytics_cache
+        # followers get their own shallow copy of the (body, size) result
+        self.singleflight = SingleFlight(clone=lambda res: (copy.copy(res[0]), res[1])) if coalesce else None
+        self.local = local
+        self.idempotency = idempotency
+        self.resilience = resilience
+        self.revalidator = revalidator
+        self.admission = admission
+        self._local_loads = SingleFlight()       # one listing walk per customer, however many queries wait on it
         self._client: Optional[httpx.AsyncClient] = None
+        self._balancer: Optional[Balancer] = None
 
     # Asynchronous code defined with async def needs an event loop to run. 
     #The asyncio library provides the necessary infrastructure for managing and executing these coroutines within an event loop.
     async def _ac(self) -> httpx.AsyncClient:
         if self._client is None:
-            self._client = httpx.AsyncClient(
-                base_url=self.base_url,
-                timeout=httpx.Timeout(REQUEST_TIMEOUT_SECS),
-                headers=self.headers
-            )
+            self._client = self._new_client(self.base_url)
         return self._client
 
+    def _new_client(self, base_url: str) -> httpx.AsyncClient:
+        http2 = UPSTREAM_HTTP2 and _http2_available()
+        if UPSTREAM_HTTP2 and not http2:
+            log.warning("UPSTREAM_HTTP2=1 but `h2` is not installed; using HTTP/1.1")
+        # Keep-alive pool: connections are reused across tool calls instead of a handshake per call
+        return httpx.AsyncClient(
+            base_url=base_url,
+            timeout=httpx.Timeout(REQUEST_TIMEOUT_SECS),
+            headers=self.headers,
+            limits=httpx.Limits(
+                max_connections=UPSTREAM_MAX_CONNECTIONS,
+                max_keepalive_connections=UPSTREAM_MAX_KEEPALIVE,
+                keepalive_expiry=UPSTREAM_KEEPALIVE_EXPIRY,
+            ),
+            http2=http2,
+            transport=self._transport,
+        )
+
+    def _lb(self) -> Optional[Balancer]:
+        """The replica balancer (one pool per replica), or None for a single upstream URL."""
+        if self._balancer is None and len(self.base_urls) > 1:
+            self._balancer = Balancer(self.base_urls, self._new_client)
+        return self._balancer
+
     async def close(self):
         if self._client:
             await self._client.aclose()
             self._client = None
+        if self._balancer is not None:
+            await self._balancer.close()
+            self._balancer = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "analyticsCache": self.analytics_cache.stats() if self.analytics_cache is not None else None,
+            "singleflight": self.singleflight.stats() if self.singleflight is not None else None,
+            "localAnalytics": self.local.stats() if self.local is not None else None,
+            "idempotency": self.idempotency.stats() if self.idempotency is not None else None,
+            "resilience": self.resilience.stats() if self.resilience is not None else None,
+            "revalidation": self.revalidator.stats() if self.revalidator is not None else None,
+            "admission": self.admission.stats() if self.admission is not None else None,
+            "balancer": self._balancer.stats() if self._balancer is not None else None,
+        }
+
+    # --- Request helpers ---
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> Tuple[Any, int]:
+        """One upstream request -> (decoded body, body size in bytes). Raises on 4xx/5xx.
+
+        `timeout` caps each try (entity getters); other requests keep REQUEST_TIMEOUT_SECS.
+        """
+        if self.resilience is None:
+            return await self._attempt(method, path, params, json, headers, timeout)
+        # retrying is safe for reads and for writes the upstream de-duplicates by Idempotency-Key
+        retryable = method == "GET" or bool(headers and headers.get("Idempotency-Key"))
+        # an analytics or listing GET that ran into the full timeout is slow, not lost: don't send it again
+        retry_timeouts = method != "GET" or timeout is not None
+        return await self.resilience.execute(
+            method, path, retryable, lambda: self._attempt(method, path, params, json, headers, timeout),
+            retry_timeouts=retry_timeouts)
+
+    async def _attempt(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> Tuple[Any, int]:
+        r = await self._request(method, path, params, json, headers, timeout)
+        r.raise_for_status()
+        return loads(r.content) if r.content else None, len(r.content)
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> httpx.Response:
+        extra = {"timeout": timeout} if timeout is not None else {}
+        ep = endpoint(method, path)
+        permit = await self.admission.acquire(ep) if self.admission is not None else None
+        lb = self._lb()
+        replica = lb.pick() if lb is not None else None        # picked once admitted, on current load
+        ac = replica.client if replica is not None else await self._ac()
+        UPSTREAM_IN_FLIGHT.inc()
+        t0 = time.perf_counter()
+        latency, overloaded = None, True          # until an answer arrives: timeouts / resets count as overload
+        throttled = False
+        try:
+            r = await ac.request(method, path, params=params, json=json, headers=headers, **extra)
+            latency, overloaded = time.perf_counter() - t0, r.status_code in RETRY_STATUSES
+            throttled = r.status_code == 429
+            return r
+        except asyncio.CancelledError:
+            overloaded = False                    # the caller went away (hedge lost, tool cancelled)
+            raise
+        finally:
+            UPSTREAM_IN_FLIGHT.dec()
+            observe_upstream(method, ep[1], time.perf_counter() - t0)
+            if permit is not None:
+                self.admission.release(permit, latency, overloaded)
+            if replica is not None:
+                # a 429 is rate limiting, not a broken replica: neither a failure nor a latency sample
+                lb.done(replica, None if throttled else latency, overloaded and not throttled)
+
+    async def _call(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None,
+        idempotency_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Tuple[Any, int]:
+        """_send, coalesced: identical concurrent GETs (and writes sharing an Idempotency-Key) hit upstream once."""
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
+        if self.singleflight is None:
+            return await self._send(method, path, params, json, headers, timeout)
+        if method == "GET":
+            # same normalization httpx applies on the wire, so equal keys mean equal requests
+            key: Hashable = (method, path, tuple(sorted(httpx.QueryParams(params or {}).multi_items())))
+        elif idempotency_key:
+            key = (method, path, "Idempotency-Key", idempotency_key)
+        else:
+            return await self._send(method, path, params, json, headers)
+        return await self.singleflight.do(key, lambda: self._send(method, path, params, json, headers, timeout))
+
+    async def paginate(
+        self,
+        path: str,
+        params: Dict[str, Any],
+        page_size: int = PAGINATE_PAGE_SIZE,
+        max_rows: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Walk a Spring `Page<T>` listing, yielding each page while the next one is already in flight.
+
+        Stops after the last page or once `max_rows` rows were yielded (that page's content is trimmed).
+        Closing the generator early cancels the prefetch.
+        """
+        params = {k: v for k, v in params.items() if k not in ("page", "size") and v not in (None, "")}
+        size = max(1, page_size if max_rows is None else min(page_size, max_rows))
+
+        def fetch(n: int) -> "asyncio.Future[Tuple[Any, int]]":
+            return asyncio.ensure_future(self._call("GET", path, params={**params, "page": n, "size": size}))
+
+        number, seen = 0, 0
+        pending: Optional["asyncio.Future[Tuple[Any, int]]"] = fetch(0)
+        try:
+            while pending is not None:
+                body, _ = await pending
+                pending = None
+                rows = body.get("content") or []
+                if max_rows is not None and seen + len(rows) >= max_rows:
+                    rows = rows[:max_rows - seen]
+                elif rows and not body.get("last", True):
+                    number += 1
+                    pending = fetch(number)          # page N+1 downloads while the caller consumes page N
+                seen += len(rows)
+                yield {**body, "content": rows}
+        finally:
+            if pending is not None:
+                if pending.done() and not pending.cancelled():
+                    pending.exception()              # retrieved; the caller went away before needing it
+                else:
+                    pending.cancel()
+
+    async def _keyed_write(self, op: str, key: Optional[str], payload: Any, fn) -> Dict[str, Any]:
+        """Writes carrying an Idempotency-Key go through the result store when it is enabled."""
+        if self.idempotency is None:
+            return await fn()
+        return await self.idempotency.run(op, key, payload, fn)
+
+    # --- Cache helpers ---
+    async def _cached_get(
+        self,
+        cache: Optional[ResponseCache],
+        key: Hashable,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        ttl: Optional[float] = None,
+        tags: Iterable[Hashable] = (),
+        timeout: Optional[float] = None,
+    ) -> Any:
+        if cache is None:
+            body, _ = await self._call("GET", path, params=params, timeout=timeout)
+            return body
+        hit = cache.get(key)
+        if hit is not None:
+            return copy.copy(hit)            # callers get their own copy of the cached body
+        epoch = cache.epoch
+        body, size = await self._call("GET", path, params=params, timeout=timeout)
+        cache.put(key, body, size, epoch=epoch, ttl=ttl, tags=tags)
+        return copy.copy(body)
+
+    async def _entity_get(self, key: Hashable, path: str) -> Any:
+        """Entity getter: a conditional GET against the last seen representation, else the TTL cache.
+
+        A TTL-fresh entry could hide a payment status that changed upstream, so with a revalidator the
+        ValidatorStore is the only store and the entity cache is neither read nor filled.
+        """
+        if self.revalidator is None:
+            return await self._cached_get(self.cache, key, path, timeout=ENTITY_ATTEMPT_TIMEOUT_SECS)
+        if self.singleflight is None:
+            body, _ = await self._revalidate(key, path)
+        else:
+            body, _ = await self.singleflight.do(("GET", path, "revalidate"), lambda: self._revalidate(key, path))
+        return copy.copy(body)
+
+    async def _revalidate(self, key: Hashable, path: str) -> Tuple[Any, int]:
+        store = self.revalidator
+        seen = store.get(key)
+        headers = store.headers(seen)
+        if headers:
+            store.conditional += 1
+
+        async def attempt():
+            r = await self._request("GET", path, headers=headers, timeout=ENTITY_ATTEMPT_TIMEOUT_SECS)
+            if r.status_code == 304 and seen is not None:
+                return r
+            if r.status_code == 404:
+                store.forget(key)
+            r.raise_for_status()
+            return r
+
+        r = await (attempt() if self.resilience is None else self.resilience.execute("GET", path, True, attempt))
+        if r.status_code == 304:
+            store.not_modified += 1
+            store.bytes_saved += seen.size
+            return seen.body, seen.size
+        content = r.content
+        h = digest(content)
+        if seen is not None and h == seen.digest:
+            store.unchanged += 1                 # upstream without validators: same bytes, skip the decode
+            body = seen.body
+        else:
+            if seen is not None:
+                store.changed += 1
+            body = loads(content) if content else None
+        store.put(key, Validated(r.headers.get("etag"), r.headers.get("last-modified"), h, body, len(content)))
+        return body, len(content)
+
+    async def _cached_analytics(self, op: str, path: str, params: Dict[str, Any]) -> Any:
+        """Analytics read keyed on the (already normalized) window, customer, fxBase, bucket and category."""
+        if self.analytics_cache is None:
+            return await self._cached_get(None, None, path, params=params)
+        key = (op, params.get("customerId"), params.get("from"), params.get("to"),
+               params.get("fxBase"), params.get("bucket"), params.get("category"))
+        end = _iso19(params.get("to"))
+        settled = (datetime.now() - timedelta(seconds=ANALYTICS_CACHE_SETTLE_SECS)).isoformat(timespec="seconds")
+        ttl = ANALYTICS_CACHE_PAST_TTL_SECS if end and end < settled else ANALYTICS_CACHE_LIVE_TTL_SECS
+        return await self._cached_get(self.analytics_cache, key, path, params=params,
+                                      ttl=ttl, tags=[("customer", params.get("customerId"))])
+
+    async def _evict_analytics(self, tx: Optional[Dict[str, Any]], tx_id: Optional[int] = None) -> None:
+        """Drop cached analytics windows for the transaction's customer that contain its createdAt.
+
+        Writes move amounts in or out of COMPLETED, so any window covering the transaction may change:
+        a new transaction lands in "now" windows, a payment on an older one touches past windows too.
+        """
+        cache = self.analytics_cache
+        if cache is None or (not len(cache) and cache.shared is None):    # shared: other workers' entries
+            return
+        if tx is None and tx_id is not None:
+            try:
+                tx = await self.get_transaction(tx_id)
+            except httpx.HTTPError:
+                tx = None
+        if not tx or tx.get("customerId") is None:
+            self.analytics_cache.clear()     # can't tell which customer moved; start over
+            return
+        created = _iso19(tx.get("createdAt"))
+        stale = [
+            key for key in self.analytics_cache.tagged(("customer", tx["customerId"]))
+            if not created or ((key[2] is None or key[2] <= created) and (key[3] is None or created <= _iso19(key[3])))
+        ]
+        self.analytics_cache.invalidate(*stale)
+
+    # --- Local analytics ---
+    async def _local_ready(self, customer_id: int):
+        if not self.local.is_fresh(customer_id):
+            await self._local_loads.do(("load", customer_id), lambda: self._load_local(customer_id))
+        return self.local
+
+    async def _load_local(self, customer_id: int) -> None:
+        """Fill the column store for one customer from the transaction listing (id order keeps pages stable)."""
+        self.local.begin_load(customer_id)
+        rows = []
+        try:
+            async for page in self.iter_transactions({"customerId": customer_id, "sort": "id,asc"}):
+                rows.extend(page["content"])
+        except BaseException:
+            self.local.abort_load(customer_id)
+            raise
+        self.local.load(customer_id, rows)
+
+    async def reconcile_local(self) -> None:
+        """Reload every customer in the column store from upstream (drift is counted by the store)."""
+        if self.local is None:
+            return
+        for customer_id in self.local.loaded():
+            try:
+                await self._local_loads.do(("load", customer_id), lambda cid=customer_id: self._load_local(cid))
+            except httpx.HTTPError as e:
+                log.warning("reconcile of customer %s failed: %s", customer_id, e)
+
+    def _local_payment(self, body: Dict[str, Any]) -> None:
+        status = _TX_STATUS_AFTER_PAYMENT.get(body.get("status"))
+        if self.local is not None and status:
+            self.local.set_status(body.get("transactionId"), status)
+
+    def _peek(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """Last body seen for an entity (cache entry or revalidator's copy), to follow its links."""
+        body = self.cache.peek(key) if self.cache is not None else None
+        if body is None and self.revalidator is not None:
+            seen = self.revalidator.get(key)
+            body = seen.body if seen is not None else None
+        return body
+
+    def _peek_transaction(self, tx_id: Optional[int]) -> Optional[Dict[str, Any]]:
+        return self._peek(("transaction", tx_id)) if tx_id is not None else None
+
+    def _evict_transaction(self, tx_id: Optional[int], customer_id: Optional[int] = None) -> None:
+        """Drop a transaction, its payment and its customer. Links are followed through cached bodies."""
+        if self.cache is None or tx_id is None:
+            return
+        keys = [("transaction", tx_id), ("payment_by_tx", tx_id)]
+        pay = self.cache.peek(("payment_by_tx", tx_id))
+        if pay and pay.get("id") is not None:
+            keys.append(("payment", pay["id"]))
+        tx = self.cache.peek(("transaction", tx_id))
+        if customer_id is None and tx:
+            customer_id = tx.get("customerId")
+        if customer_id is not None:
+            keys.append(("customer", customer_id))
+        self.cache.invalidate(*keys)
+
+    def _peek_payment_tx(self, payment_id: Optional[int]) -> Optional[int]:
+        pay = self._peek(("payment", payment_id)) if payment_id is not None else None
+        return pay.get("transactionId") if pay else None
+
+    def _evict_payment(self, payment_id: Optional[int], tx_id: Optional[int] = None) -> None:
+        if self.cache is None:
+            return
+        pay = self.cache.peek(("payment", payment_id)) if payment_id is not None else None
+        if tx_id is None and pay:
+            tx_id = pay.get("transactionId")
+        self._evict_transaction(tx_id)
+        if payment_id is not None:
+            self.cache.invalidate(("payment", payment_id))
 
     # --- Customers ---
     async def create_customer(self, payload: Dict[str, Any]) -> Dict[str, Any]:     #async def defines a coroutine function
-        ac = await self._ac()                                       # await in this line means lazy initialization of the HTTP client
-        r = await ac.post("/customers", json=payload)               # await means non-blocking HTTP call; yields to event loop
-        r.raise_for_status()
-        return r.json()
+        body, _ = await self._call("POST", "/customers", json=payload)              # await means non-blocking HTTP call; yields to event loop
+        return body
 
     async def get_customer(self, customer_id: int) -> Dict[str, Any]:
-        ac = await self._ac()
-        r = await ac.get(f"/customers/{customer_id}")
-        r.raise_for_status()
-        return r.json()
+        return await self._entity_get(("customer", customer_id), f"/customers/{customer_id}")
 
     async def list_customer_transactions(self, customer_id: int, params: Dict[str, Any]) -> Dict[str, Any]:
-        ac = await self._ac()
-        r = await ac.get(f"/customers/{customer_id}/transactions", params=params)
-        r.raise_for_status()
-        return r.json()
+        body, _ = await self._call("GET", f"/customers/{customer_id}/transactions", params=params)
+        return body
+
+    def iter_customer_transactions(self, customer_id: int, params: Dict[str, Any],
+                                   max_rows: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        return self.paginate(f"/customers/{customer_id}/transactions", params, max_rows=max_rows)
 
     # --- Transactions ---
     async def create_transaction(self, payload: Dict[str, Any], idempotency_key: str | None) -> Dict[str, Any]:
-        ac = await self._ac()
-        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
-        r = await ac.post("/transactions", json=payload, headers=headers)
-        r.raise_for_status()
-        return r.json()
+        return await self._keyed_write("create_transaction", idempotency_key, payload,
+                                       lambda: self._create_transaction(payload, idempotency_key))
+
+    async def _create_transaction(self, payload: Dict[str, Any], idempotency_key: str | None) -> Dict[str, Any]:
+        try:
+            body, _ = await self._call("POST", "/transactions", json=payload, idempotency_key=idempotency_key)
+        finally:
+            if self.cache is not None:
+                self.cache.invalidate(("customer", payload.get("customerId")))
+        if self.local is not None:
+            self.local.upsert(body)
+        await self._evict_analytics(body)
+        return body
 
     async def get_transaction(self, tx_id: int) -> Dict[str, Any]:
-        ac = await self._ac()
-        r = await ac.get(f"/transactions/{tx_id}")
-        r.raise_for_status()
-        return r.json()
+        return await self._entity_get(("transaction", tx_id), f"/transactions/{tx_id}")
 
     async def search_transactions(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        ac = await self._ac()
-        r = await ac.get("/transactions", params=params)
-        r.raise_for_status()
-        return r.json()
+        body, _ = await self._call("GET", "/transactions", params=params)
+        return body
+
+    def iter_transactions(self, params: Dict[str, Any], max_rows: Optional[int] = None,
+                          page_size: int = PAGINATE_PAGE_SIZE) -> AsyncIterator[Dict[str, Any]]:
+        return self.paginate("/transactions", params, page_size=page_size, max_rows=max_rows)
 
     async def cancel_transaction(self, tx_id: int, idempotency_key: str | None) -> Dict[str, Any]:
-        ac = await self._ac()
-        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
-        r = await ac.post(f"/transactions/{tx_id}/cancel", headers=headers)
-        r.raise_for_status()
-        return r.json()
+        return await self._keyed_write("cancel_transaction", idempotency_key, {"id": tx_id},
+                                       lambda: self._cancel_transaction(tx_id, idempotency_key))
+
+    async def _cancel_transaction(self, tx_id: int, idempotency_key: str | None) -> Dict[str, Any]:
+        try:
+            body, _ = await self._call("POST", f"/transactions/{tx_id}/cancel", idempotency_key=idempotency_key)
+        finally:
+            self._evict_transaction(tx_id)
+        self._evict_transaction(tx_id, body.get("customerId"))
+        if self.local is not None:
+            self.local.upsert(body)
+        await self._evict_analytics(body)
+        return body
 
     # --- Payments ---
     async def make_payment(self, payload: Dict[str, Any], idempotency_key: str | None) -> Dict[str, Any]:
-        ac = await self._ac()
-        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
-        r = await ac.post("/payments", json=payload, headers=headers)
-        r.raise_for_status()
-        return r.json()
+        return await self._keyed_write("make_payment", idempotency_key, payload,
+                                       lambda: self._make_payment(payload, idempotency_key))
+
+    async def _make_payment(self, payload: Dict[str, Any], idempotency_key: str | None) -> Dict[str, Any]:
+        tx = self._peek_transaction(payload.get("transactionId"))
+        try:
+            body, _ = await self._call("POST", "/payments", json=payload, idempotency_key=idempotency_key)
+        finally:
+            self._evict_transaction(payload.get("transactionId"))
+        self._evict_payment(body.get("id"), body.get("transactionId"))
+        self._local_payment(body)
+        await self._evict_analytics(tx, body.get("transactionId"))
+        return body
 
     async def get_payment(self, payment_id: int) -> Dict[str, Any]:
-        ac = await self._ac()
-        r = await ac.get(f"/payments/{payment_id}")
-        r.raise_for_status()
-        return r.json()
+        return await self._entity_get(("payment", payment_id), f"/payments/{payment_id}")
 
     async def get_payment_by_tx(self, tx_id: int) -> Dict[str, Any]:
-        ac = await self._ac()
-        r = await ac.get(f"/transactions/{tx_id}/payment")
-        r.raise_for_status()
-        return r.json()
+        return await self._entity_get(("payment_by_tx", tx_id), f"/transactions/{tx_id}/payment")
 
     async def retry_payment(self, payment_id: int, idempotency_key: str | None) -> Dict[str, Any]:
-        ac = await self._ac()
-        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
-        r = await ac.post(f"/payments/{payment_id}/retry", headers=headers)
-        r.raise_for_status()
-        return r.json()
+        return await self._keyed_write("retry_payment", idempotency_key, {"id": payment_id},
+                                       lambda: self._retry_payment(payment_id, idempotency_key))
+
+    async def _retry_payment(self, payment_id: int, idempotency_key: str | None) -> Dict[str, Any]:
+        tx = self._peek_transaction(self._peek_payment_tx(payment_id))
+        try:
+            body, _ = await self._call("POST", f"/payments/{payment_id}/retry", idempotency_key=idempotency_key)
+        finally:
+            self._evict_payment(payment_id)
+        self._evict_payment(payment_id, body.get("transactionId"))
+        self._local_payment(body)
+        await self._evict_analytics(tx, body.get("transactionId"))
+        return body
 
     async def fail_payment(self, payment_id: int, reason_code: str, idempotency_key: str | None) -> Dict[str, Any]:
-        ac = await self._ac()
-        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
-        r = await ac.post(f"/payments/{payment_id}/fail", params={"reasonCode": reason_code}, headers=headers)
-        r.raise_for_status()
-        return r.json()
+        return await self._keyed_write("fail_payment", idempotency_key, {"id": payment_id, "reasonCode": reason_code},
+                                       lambda: self._fail_payment(payment_id, reason_code, idempotency_key))
+
+    async def _fail_payment(self, payment_id: int, reason_code: str, idempotency_key: str | None) -> Dict[str, Any]:
+        tx = self._peek_transaction(self._peek_payment_tx(payment_id))
+        try:
+            body, _ = await self._call("POST", f"/payments/{payment_id}/fail", params={"reasonCode": reason_code},
+                                       idempotency_key=idempotency_key)
+        finally:
+            self._evict_payment(payment_id)
+        self._evict_payment(payment_id, body.get("transactionId"))
+        self._local_payment(body)
+        await self._evict_analytics(tx, body.get("transactionId"))
+        return body
 
     # --- Analytics ---
+    # In local mode the column store answers instead of the upstream analytics endpoints.
     async def spend_summary(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        ac = await self._ac()
-        r = await ac.get("/analytics/spend-summary", params=params)
-        r.raise_for_status()
-        return r.json()
+        if self.local is not None:
+            return (await self._local_ready(params["customerId"])).spend_summary(params)
+        return await self._cached_analytics("spend_summary", "/analytics/spend-summary", params)
 
     async def spend_by_category(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        ac = await self._ac()
-        r = await ac.get("/analytics/spend-by-category", params=params)
-        r.raise_for_status()
-        return r.json()
+        if self.local is not None:
+            return (await self._local_ready(params["customerId"])).spend_by_category(params)
+        return await self._cached_analytics("spend_by_category", "/analytics/spend-by-category", params)
 
     async def time_series(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        ac = await self._ac()
-        r = await ac.get("/analytics/time-series", params=params)
-        r.raise_for_status()
-        return r.json()
+        if self.local is not None:
+            return (await self._local_ready(params["customerId"])).time_series(params)
+        return await self._cached_analytics("time_series", "/analytics/time-series", params)
+
+# --- Process-wide instance ---
+# Tools and resources share one client (and therefore one connection pool). It is created on
+# first use / by the FastMCP lifespan (mcpServer/runtime.py) and closed by the shutdown hook.
+_shared: Optional[PaymentsApiClient] = None
+
+def get_payments_api() -> PaymentsApiClient:
+    global _shared
+    if _shared is None:
+        tier = SharedCacheTier(SHARED_CACHE_PATH) if SHARED_CACHE_PATH else None   # one file for all workers
+        _shared = PaymentsApiClient(
+            # with revalidation on, every entity read is a conditional GET: no TTL cache in front of it
+            cache=ResponseCache(shared=tier, namespace="entity") if CACHE_ENABLED and not REVALIDATE_ENABLED else None,
+            analytics_cache=new_analytics_cache(tier) if ANALYTICS_CACHE_ENABLED else None,
+            local=new_columnar_store() if ANALYTICS_MODE == "local" else None,
+            idempotency=new_idempotency_store() if IDEMPOTENCY_ENABLED else None,
+            resilience=ResiliencePolicy() if RESILIENCE_ENABLED else None,
+            revalidator=ValidatorStore() if REVALIDATE_ENABLED else None,
+            admission=AdmissionController() if ADMISSION_ENABLED else None,
+        )
+    return _shared
+
+async def close_payments_api() -> None:
+    global _shared
+    api, _shared = _shared, None
+    if api is not None:
+        await api.close()
+        for cache in (api.cache, api.analytics_cache):
+            if cache is not None and cache.shared is not None:
+                await asyncio.to_thread(cache.shared.close)      # lets queued writes land
@@ -0,0 +1,38 @@
+import json
+from typing import Any
+
+from mcpServer.config import FAST_JSON
+
+try:
+    import orjson
+except ImportError:                      # optional: the json module does the same, slower
+    orjson = None
+
+# JSON in and out of the server. orjson decodes the upstream bytes directly (no str round trip)
+# and encodes dicts, slotted dataclasses (models/wire.py) and numpy scalars natively.
+
+FAST = FAST_JSON and orjson is not None
+
+
+def _default(obj: Any) -> Any:
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json", by_alias=True)
+    if hasattr(obj, "__dataclass_fields__"):
+        return {f: getattr(obj, f) for f in obj.__dataclass_fields__}
+    if hasattr(obj, "item"):                  # numpy scalar
+        return obj.item()
+    return str(obj)
+
+
+def loads(data: bytes) -> Any:
+    return orjson.loads(data) if FAST else json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    if FAST:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, separators=(",", ":")).encode()
+
+
+def dumps_str(obj: Any) -> str:
+    return dumps(obj).decode()
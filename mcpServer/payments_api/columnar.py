@@ -0,0 +1,321 @@
+import time
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from mcpServer.config import LOCAL_ANALYTICS_REFRESH_SECS, ROLLUPS_ENABLED
+from mcpServer.payments_api.rollups import DAY as _DAY, DailyRollup
+from mcpServer.util.logs import get_logger
+
+# Local analytics engine: one column set per customer, rows sorted by createdAt.
+# Answers spend-summary / spend-by-category / time-series with the same JSON shapes as the
+# Spring AnalyticsService, so the tools can switch between upstream and local mode freely.
+
+_EPOCH_MONDAY_OFFSET = 3          # 1970-01-01 was a Thursday
+
+log = get_logger("mcpServer.columnar")
+
+
+class _Codes:
+    """Dictionary encoding for a low-cardinality string column (category, status, currency)."""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def code(self, value: Optional[str]) -> int:
+        value = value or ""
+        c = self._index.get(value)
+        if c is None:
+            c = self._index[value] = len(self.values)
+            self.values.append(value)
+        return c
+
+    def find(self, value: Optional[str]) -> int:
+        """Code of an existing value, -1 if never seen (matches nothing)."""
+        return self._index.get(value or "", -1)
+
+
+def _ts(values: Iterable[Optional[str]]) -> np.ndarray:
+    """Upstream LocalDateTime strings -> int64 seconds (naive, same clock as the filters)."""
+    return np.array([(v or "1970-01-01T00:00:00")[:19] for v in values], dtype="datetime64[s]").astype(np.int64)
+
+
+def _ts1(value: Optional[str]) -> Optional[int]:
+    return int(_ts([value])[0]) if value else None
+
+
+def _ldt(seconds: int) -> str:
+    return str(np.datetime64(int(seconds), "s"))
+
+
+def _java_ldt(value: Optional[str]) -> Optional[str]:
+    """Mirror LocalDateTime.toString(): trailing ':00' seconds are dropped."""
+    if not value:
+        return None
+    value = value[:19]
+    return value[:16] if len(value) == 19 and value.endswith(":00") else value
+
+
+class _Columns:
+    __slots__ = ("ids", "ts", "amount", "category", "status", "currency", "loaded_at", "rollup")
+
+    def __init__(self, loaded_at: float):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.ts = np.empty(0, dtype=np.int64)
+        self.amount = np.empty(0, dtype=np.float64)
+        self.category = np.empty(0, dtype=np.int32)
+        self.status = np.empty(0, dtype=np.int8)
+        self.currency = np.empty(0, dtype=np.int16)
+        self.loaded_at = loaded_at
+        self.rollup: Optional[DailyRollup] = None     # built on first window query, then kept incrementally
+
+    def window(self, lo: Optional[int], hi: Optional[int]) -> slice:
+        """Rows with lo <= ts <= hi (inclusive bounds, like TransactionSpecs.createdFrom/createdTo)."""
+        start = 0 if lo is None else int(np.searchsorted(self.ts, lo, side="left"))
+        stop = len(self.ts) if hi is None else int(np.searchsorted(self.ts, hi, side="right"))
+        return slice(start, max(start, stop))
+
+
+class ColumnarStore:
+    def __init__(
+        self,
+        refresh_secs: float = LOCAL_ANALYTICS_REFRESH_SECS,
+        rollups: bool = ROLLUPS_ENABLED,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.refresh_secs = refresh_secs        # full reload per customer; covers writes made outside this server
+        self.rollups = rollups                  # answer summary / by-category windows from daily prefix sums
+        self._clock = clock
+        self.categories, self.statuses, self.currencies = _Codes(), _Codes(), _Codes()
+        self._completed = self.statuses.code("COMPLETED")
+        self._customers: Dict[int, _Columns] = {}
+        self._owner: Dict[int, int] = {}                      # transaction id -> customer id
+        self._journals: Dict[int, List[tuple]] = {}           # customer id -> writes seen while it loads
+        self.loads = self.upserts = self.queries = 0
+        self.reconciled = self.drifted = 0
+
+    # --- population ---
+    def is_fresh(self, customer_id: int) -> bool:
+        cols = self._customers.get(customer_id)
+        return cols is not None and self._clock() - cols.loaded_at < self.refresh_secs
+
+    def begin_load(self, customer_id: int) -> None:
+        self._journals.setdefault(customer_id, [])
+
+    def load(self, customer_id: int, rows: List[Dict[str, Any]]) -> None:
+        """Replace a customer's columns with a full listing, then replay writes that raced the walk."""
+        cols = _Columns(self._clock())
+        if rows:
+            ts = _ts(r.get("createdAt") for r in rows)
+            order = np.argsort(ts, kind="stable")
+            cols.ts = ts[order]
+            cols.ids = np.array([r["id"] for r in rows], dtype=np.int64)[order]
+            cols.amount = np.array([float(r.get("amount") or 0) for r in rows], dtype=np.float64)[order]
+            cols.category = np.array([self.categories.code(r.get("category")) for r in rows], dtype=np.int32)[order]
+            cols.status = np.array([self.statuses.code(r.get("status")) for r in rows], dtype=np.int8)[order]
+            cols.currency = np.array([self.currencies.code(r.get("currency")) for r in rows], dtype=np.int16)[order]
+        old = self._customers.get(customer_id)
+        if old is not None:
+            for tx_id in old.ids.tolist():
+                self._owner.pop(tx_id, None)
+            self._check_drift(customer_id, old, cols)
+        self._customers[customer_id] = cols
+        for tx_id in cols.ids.tolist():
+            self._owner[tx_id] = customer_id
+        self.loads += 1
+        for op, arg, status in self._journals.pop(customer_id, ()):
+            if op == "upsert":
+                self.upsert(arg)
+            else:
+                self.set_status(arg, status)
+
+    def _check_drift(self, customer_id: int, old: _Columns, new: _Columns) -> None:
+        """A reload is the reconciliation: compare what the incremental rollups held with upstream's view."""
+        self.reconciled += 1
+        if old.rollup is not None:
+            count, amount = old.rollup.totals()
+        else:
+            held = old.status == self._completed
+            count, amount = int(np.count_nonzero(held)), float(old.amount[held].sum())
+        mask = new.status == self._completed
+        up_count, up_amount = int(np.count_nonzero(mask)), float(new.amount[mask].sum())
+        if count != up_count or round(amount, 2) != round(up_amount, 2):
+            self.drifted += 1
+            log.warning("rollup drift for customer %s: local %d/%.2f, upstream %d/%.2f (writes made outside this server?)",
+                        customer_id, count, amount, up_count, up_amount)
+
+    def loaded(self) -> List[int]:
+        return list(self._customers)
+
+    def abort_load(self, customer_id: int) -> None:
+        self._journals.pop(customer_id, None)
+
+    def forget(self, customer_id: Optional[int] = None) -> None:
+        """Drop one customer (or everything) so the next query reloads from upstream."""
+        ids = list(self._customers) if customer_id is None else [customer_id]
+        for cid in ids:
+            cols = self._customers.pop(cid, None)
+            if cols is not None:
+                for tx_id in cols.ids.tolist():
+                    self._owner.pop(tx_id, None)
+
+    # --- MCP-side writes ---
+    def upsert(self, tx: Optional[Dict[str, Any]]) -> None:
+        """Insert or update one transaction body (create_transaction / cancel_transaction responses)."""
+        if not tx or tx.get("id") is None or tx.get("customerId") is None:
+            return
+        cid = tx["customerId"]
+        if cid in self._journals:
+            self._journals[cid].append(("upsert", dict(tx), None))
+        cols = self._customers.get(cid)
+        if cols is None:
+            return                                  # not loaded; the first query fetches it fresh
+        self.upserts += 1
+        hit = np.flatnonzero(cols.ids == tx["id"])
+        if hit.size:
+            i = int(hit[0])
+            self._roll(cols, i, -1)
+            cols.ids, cols.ts, cols.amount = np.delete(cols.ids, i), np.delete(cols.ts, i), np.delete(cols.amount, i)
+            cols.category, cols.status = np.delete(cols.category, i), np.delete(cols.status, i)
+            cols.currency = np.delete(cols.currency, i)
+        ts = _ts1(tx.get("createdAt")) or 0
+        i = int(np.searchsorted(cols.ts, ts, side="right"))
+        cols.ids = np.insert(cols.ids, i, tx["id"])
+        cols.ts = np.insert(cols.ts, i, ts)
+        cols.amount = np.insert(cols.amount, i, float(tx.get("amount") or 0))
+        cols.category = np.insert(cols.category, i, self.categories.code(tx.get("category")))
+        cols.status = np.insert(cols.status, i, self.statuses.code(tx.get("status")))
+        cols.currency = np.insert(cols.currency, i, self.currencies.code(tx.get("currency")))
+        self._roll(cols, i, +1)
+        self._owner[tx["id"]] = cid
+
+    def _roll(self, cols: _Columns, i: int, sign: int) -> None:
+        """Keep the rollup in step with row i entering (+1) or leaving (-1) the COMPLETED set."""
+        if cols.rollup is None or cols.status[i] != self._completed:
+            return
+        if not cols.rollup.add(int(cols.ts[i]), int(cols.category[i]), float(cols.amount[i]), sign):
+            cols.rollup = None                      # outside the arrays (older day / new category): rebuild lazily
+
+    def set_status(self, tx_id: Optional[int], status: str) -> None:
+        """Payment writes only return the payment; they move the transaction to COMPLETED / FAILED."""
+        if tx_id is None:
+            return
+        cid = self._owner.get(tx_id)
+        journals = [self._journals[cid]] if cid in self._journals else (
+            list(self._journals.values()) if cid is None else [])
+        for journal in journals:
+            journal.append(("status", tx_id, status))
+        cols = self._customers.get(cid) if cid is not None else None
+        if cols is None:
+            return
+        hit = np.flatnonzero(cols.ids == tx_id)
+        if hit.size:
+            i = int(hit[0])
+            self._roll(cols, i, -1)
+            cols.status[i] = self.statuses.code(status)
+            self._roll(cols, i, +1)
+            self.upserts += 1
+
+    # --- queries (params as sent upstream: customerId, from, to, fxBase / bucket, category) ---
+    def _completed_rows(self, params: Dict[str, Any]):
+        self.queries += 1
+        cols = self._customers[params["customerId"]]
+        sl = cols.window(_ts1(params.get("from")), _ts1(params.get("to")))
+        mask = cols.status[sl] == self._completed
+        return cols, sl, mask
+
+    def _category_totals(self, params: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-category (count, amount) of COMPLETED rows with from <= createdAt <= to."""
+        n = len(self.categories.values)
+        if not self.rollups:
+            cols, sl, mask = self._completed_rows(params)
+            codes = cols.category[sl][mask]
+            return np.bincount(codes, minlength=n), np.bincount(codes, weights=cols.amount[sl][mask], minlength=n)
+        self.queries += 1
+        cols = self._customers[params["customerId"]]
+        if cols.rollup is None or cols.rollup.categories < n:
+            cols.rollup = DailyRollup(cols.ts, cols.amount, cols.category, cols.status == self._completed, n)
+        lo, hi = _ts1(params.get("from")), _ts1(params.get("to"))
+        first = cols.rollup.day0 if lo is None else -(-lo // _DAY)                       # first whole day
+        last = cols.rollup.day0 + cols.rollup.days - 1 if hi is None else (hi + 1) // _DAY - 1   # last whole day
+        counts = np.zeros(n, dtype=np.int64)
+        amounts = np.zeros(n, dtype=np.float64)
+        if first <= last:
+            c, a = cols.rollup.range(first, last)
+            counts[:len(c)] += c
+            amounts[:len(a)] += a
+            edges = [(lo, first * _DAY - 1), ((last + 1) * _DAY, hi)]
+        else:
+            edges = [(lo, hi)]
+        for a, b in edges:                          # partial days at either end come from the raw rows
+            if a is not None and b is not None and a > b:
+                continue
+            sl = cols.window(a, b)
+            mask = cols.status[sl] == self._completed
+            codes = cols.category[sl][mask]
+            counts += np.bincount(codes, minlength=n)
+            amounts += np.bincount(codes, weights=cols.amount[sl][mask], minlength=n)
+        return counts, amounts
+
+    def spend_summary(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        counts, amounts = self._category_totals(params)
+        count = int(counts.sum())
+        total = round(float(amounts.sum()), 2)
+        avg = (Decimal(repr(total)) / count).quantize(Decimal("0.01"), ROUND_HALF_UP) if count else 0
+        return {
+            "customerId": params["customerId"],
+            "baseCurrency": params.get("fxBase"),
+            "totalAmount": total,
+            "transactionCount": count,
+            "averageTicket": float(avg),
+            "periodFrom": _java_ldt(params.get("from")),
+            "periodTo": _java_ldt(params.get("to")),
+        }
+
+    def spend_by_category(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        counts, amounts = self._category_totals(params)
+        return [
+            {"customerId": params["customerId"], "category": self.categories.values[c],
+             "totalAmount": round(float(amounts[c]), 2), "transactionCount": int(counts[c])}
+            for c in np.flatnonzero(counts).tolist()
+        ]
+
+    def time_series(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        bucket = (params.get("bucket") or "").lower()
+        if bucket not in ("day", "week", "month"):
+            raise ValueError("bucket must be day|week|month")
+        cols, sl, mask = self._completed_rows(params)
+        if params.get("category"):
+            mask &= cols.category[sl] == self.categories.find(params["category"])
+        ts = cols.ts[sl][mask]
+        if bucket == "day":
+            keys = ts // _DAY * _DAY
+        elif bucket == "week":
+            days = ts // _DAY
+            keys = (days - (days + _EPOCH_MONDAY_OFFSET) % 7) * _DAY
+        else:
+            keys = ts.astype("datetime64[s]").astype("datetime64[M]").astype("datetime64[s]").astype(np.int64)
+        starts, inverse = np.unique(keys, return_inverse=True)
+        sums = np.bincount(inverse, weights=cols.amount[sl][mask], minlength=len(starts))
+        return {
+            "customerId": params["customerId"],
+            "bucket": bucket,
+            "category": params.get("category"),
+            "series": [{"timestampStart": _ldt(s), "amount": round(float(a), 2)}
+                       for s, a in zip(starts.tolist(), sums.tolist())],
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "customers": len(self._customers),
+            "rows": sum(len(c.ids) for c in self._customers.values()),
+            "categories": len(self.categories.values),
+            "loads": self.loads,
+            "upserts": self.upserts,
+            "queries": self.queries,
+            "rollups": self.rollups,
+            "reconciled": self.reconciled,
+            "drifted": self.drifted,
+        }
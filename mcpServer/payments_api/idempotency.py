@@ -0,0 +1,191 @@
+import asyncio
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from mcpServer.config import (
+    IDEMPOTENCY_TTL_SECS, IDEMPOTENCY_MAX_ENTRIES, IDEMPOTENCY_SQLITE_PATH, IDEMPOTENCY_SQLITE_BUSY_SECS,
+)
+from mcpServer.util.errors import IdempotencyConflict
+from mcpServer.util.logs import get_logger
+
+# MCP-side record of write results by Idempotency-Key, so agent retries are answered here instead
+# of costing another upstream write. Only successful results are recorded; a failed write can be retried.
+# Backends with `blocking = True` (SQLite) are called through asyncio.to_thread, so a file locked by
+# another process stalls that one write, not the event loop.
+
+log = get_logger("mcpServer.idempotency")
+
+Record = Tuple[str, Any, float]          # (fingerprint, response body, expires_at)
+
+
+def fingerprint(op: str, payload: Any) -> str:
+    """Operation + canonical JSON payload; the same key with another fingerprint is a conflict."""
+    raw = json.dumps({"op": op, "payload": payload}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class MemoryBackend:
+    blocking = False
+
+    def __init__(self, max_entries: int = IDEMPOTENCY_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._records: "OrderedDict[str, Record]" = OrderedDict()
+
+    def get(self, key: str, now: float) -> Optional[Record]:
+        rec = self._records.get(key)
+        if rec is None:
+            return None
+        if rec[2] <= now:
+            del self._records[key]
+            return None
+        return rec
+
+    def put(self, key: str, rec: Record) -> None:
+        self._records[key] = rec
+        self._records.move_to_end(key)
+        while len(self._records) > self.max_entries:
+            self._records.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+class SqliteBackend:
+    """Survives restarts (and is shared by processes pointing at the same file).
+
+    Blocking: called from worker threads, one statement at a time. A file still locked after
+    `busy_timeout` reads as no record (the upstream de-duplicates the key as well) and loses the put.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, busy_timeout: float = IDEMPOTENCY_SQLITE_BUSY_SECS):
+        self.path = path
+        self._puts = self._count = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=busy_timeout)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS idempotency ("
+            " key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, response TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str, now: float) -> Optional[Record]:
+        try:
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT fingerprint, response, expires_at FROM idempotency WHERE key = ? AND expires_at > ?",
+                    (key, now),
+                ).fetchone()
+        except sqlite3.OperationalError as e:
+            log.warning("idempotency lookup of %r failed: %s", key, e)
+            return None
+        return (row[0], json.loads(row[1]), row[2]) if row else None
+
+    def put(self, key: str, rec: Record) -> None:
+        fp, response, expires_at = rec
+        try:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO idempotency (key, fingerprint, response, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, fp, json.dumps(response), expires_at),
+                )
+                self._puts += 1
+                if self._puts % 1000 == 0:
+                    self._db.execute("DELETE FROM idempotency WHERE expires_at <= ?", (time.time(),))
+        except sqlite3.OperationalError as e:
+            log.warning("idempotency record for %r not stored: %s", key, e)
+
+    def purge(self, now: float) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM idempotency WHERE expires_at <= ?", (now,))
+
+    def __len__(self) -> int:
+        """Record count for stats(); the last known one while a worker thread holds the connection."""
+        if not self._lock.acquire(blocking=False):
+            return self._count
+        try:
+            self._count = self._db.execute("SELECT COUNT(*) FROM idempotency").fetchone()[0]
+        except sqlite3.OperationalError:
+            pass
+        finally:
+            self._lock.release()
+        return self._count
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class IdempotencyStore:
+    def __init__(self, backend=None, ttl_secs: float = IDEMPOTENCY_TTL_SECS, clock: Callable[[], float] = time.time):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl_secs = ttl_secs
+        self._clock = clock                       # wall clock: sqlite records outlive the process
+        self._inflight: Dict[str, Tuple[str, "asyncio.Task[Any]"]] = {}
+        self.writes = self.replays = self.joined = self.conflicts = 0
+
+    async def run(self, op: str, key: Optional[str], payload: Any, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a keyed write once; repeats with the same key and payload get the recorded response."""
+        if not key:
+            return await fn()
+        fp = fingerprint(op, payload)
+        rec = await self._io(self.backend.get, key, self._clock())
+        if rec is not None:
+            self._check(key, rec[0], fp)
+            self.replays += 1
+            return copy.deepcopy(rec[1])
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._check(key, pending[0], fp)
+            self.joined += 1                      # concurrent duplicate: wait for the first one's outcome
+            return copy.deepcopy(await asyncio.shield(pending[1]))
+        self.writes += 1
+
+        async def write():
+            body = await fn()
+            await self._io(self.backend.put, key, (fp, copy.deepcopy(body), self._clock() + self.ttl_secs))
+            return body
+
+        # recorded by the task itself, so the result is kept even if the first caller goes away
+        task = asyncio.ensure_future(write())
+        self._inflight[key] = (fp, task)
+        task.add_done_callback(lambda t, k=key: self._done(k, t))
+        return await asyncio.shield(task)
+
+    async def _io(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.to_thread(fn, *args) if self.backend.blocking else fn(*args)
+
+    def _done(self, key: str, task: "asyncio.Task[Any]") -> None:
+        if self._inflight.get(key, (None, None))[1] is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    def _check(self, key: str, recorded: str, fp: str) -> None:
+        if recorded != fp:
+            self.conflicts += 1
+            raise IdempotencyConflict(f"Idempotency-Key {key!r} was already used with a different request")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.backend).__name__,
+            "records": len(self.backend),
+            "inFlight": len(self._inflight),
+            "ttlSecs": self.ttl_secs,
+            "writes": self.writes,
+            "replays": self.replays,
+            "joined": self.joined,
+            "conflicts": self.conflicts,
+        }
+
+
+def new_idempotency_store() -> IdempotencyStore:
+    backend = SqliteBackend(IDEMPOTENCY_SQLITE_PATH) if IDEMPOTENCY_SQLITE_PATH else MemoryBackend()
+    return IdempotencyStore(backend)
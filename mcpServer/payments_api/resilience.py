@@ -0,0 +1,229 @@
+import asyncio
+import random
+import re
+import time
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+import httpx
+
+from mcpServer.util.logs import get_logger
+from mcpServer.config import (
+    RETRY_ATTEMPTS, RETRY_BASE_DELAY_SECS, RETRY_MAX_DELAY_SECS,
+    BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_SECS,
+    HEDGE_ENABLED, HEDGE_MIN_DELAY_SECS, HEDGE_MIN_SAMPLES,
+)
+
+# Policy layer between PaymentsApiClient and the wire: retries with jittered backoff, a circuit
+# breaker per endpoint, and optional hedged GETs. Only failures that say "upstream is unhealthy"
+# (transport errors, 429/502/503/504) are retried or counted against the breaker; other 4xx/5xx
+# are answers and pass straight through.
+
+RETRY_STATUSES = {429, 502, 503, 504}
+
+log = get_logger("mcpServer.resilience")
+
+Endpoint = Tuple[str, str]          # (method, path template) e.g. ("GET", "/customers/{id}")
+
+
+class CircuitOpen(httpx.TransportError):
+    """Raised without touching the network while an endpoint's breaker is open.
+
+    A TransportError so callers that already handle upstream outages (fan_out, reconcile) treat it the same way.
+    """
+
+
+def endpoint(method: str, path: str) -> Endpoint:
+    return method, re.sub(r"/\d+(?=/|$)", "/{id}", path)
+
+
+def is_unhealthy(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRY_STATUSES
+    return isinstance(exc, httpx.TransportError) and not isinstance(exc, CircuitOpen)
+
+
+class CircuitBreaker:
+    """closed -> open after `threshold` consecutive failures -> one half-open probe after `reset_secs`."""
+
+    def __init__(self, threshold: int, reset_secs: float, clock: Callable[[], float]):
+        self.threshold = threshold
+        self.reset_secs = reset_secs
+        self._clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if not self._probing and self._clock() - self.opened_at >= self.reset_secs:
+            self._probing = True                  # let one request through to test the endpoint
+            return True
+        return False
+
+    def success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def release(self) -> None:
+        """The request ended without an answer (cancelled): free the probe slot, count nothing."""
+        self._probing = False
+
+    def failure(self) -> bool:
+        """Record a failure; True when this one (re)opened the breaker."""
+        self.failures += 1
+        if self._probing or (self.opened_at is None and self.failures >= self.threshold):
+            self._probing = False
+            self.opened_at = self._clock()
+            return True
+        return False
+
+
+class _Latency:
+    """Recent successful attempt latencies for one endpoint; p95 drives the hedge delay."""
+
+    def __init__(self, size: int = 256):
+        self.samples: Deque[float] = deque(maxlen=size)
+        self._p95: Optional[float] = None
+        self._dirty = 0
+
+    def add(self, secs: float) -> None:
+        self.samples.append(secs)
+        self._dirty += 1
+
+    def p95(self) -> float:
+        if self._p95 is None or self._dirty >= 16:      # re-sort every 16 samples, not every request
+            s = sorted(self.samples)
+            self._p95 = s[min(len(s) - 1, int(0.95 * (len(s) - 1) + 0.5))]
+            self._dirty = 0
+        return self._p95
+
+
+class ResiliencePolicy:
+    def __init__(
+        self,
+        attempts: int = RETRY_ATTEMPTS,
+        base_delay: float = RETRY_BASE_DELAY_SECS,
+        max_delay: float = RETRY_MAX_DELAY_SECS,
+        breaker_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        breaker_reset_secs: float = BREAKER_RESET_SECS,
+        hedge: bool = HEDGE_ENABLED,
+        hedge_min_delay: float = HEDGE_MIN_DELAY_SECS,
+        hedge_min_samples: int = HEDGE_MIN_SAMPLES,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None,
+    ):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._breakers: Dict[Endpoint, CircuitBreaker] = defaultdict(
+            lambda: CircuitBreaker(breaker_threshold, breaker_reset_secs, clock))
+        self._latency: Dict[Endpoint, _Latency] = defaultdict(_Latency)
+        self.retries = self.exhausted = self.opened = self.rejected = self.hedges = self.hedge_wins = 0
+
+    def backoff(self, retry: int) -> float:
+        """Full jitter: uniform over [0, min(max_delay, base * 2^retry)]."""
+        return self._rng.uniform(0, min(self.max_delay, self.base_delay * (2 ** retry)))
+
+    async def execute(self, method: str, path: str, retryable: bool, attempt: Callable[[], Awaitable[Any]],
+                      retry_timeouts: bool = True) -> Any:
+        """Run `attempt` under the policy. `retryable` = GET or a write carrying an Idempotency-Key.
+
+        `retry_timeouts=False` gives up after a read timeout: a slow query that used up the whole
+        timeout would only time out again.
+        """
+        ep = endpoint(method, path)
+        breaker = self._breakers[ep]
+        tries = self.attempts if retryable else 1
+        for n in range(tries):
+            if not breaker.allow():
+                self.rejected += 1
+                raise CircuitOpen(f"circuit open for {ep[0]} {ep[1]}")
+            probe = breaker.is_open               # allowed through an open breaker: this is the half-open probe
+            try:
+                if self.hedge and method == "GET":
+                    result = await self._hedged(ep, attempt)
+                else:
+                    result = await self._timed(ep, attempt)
+            except CircuitOpen:
+                if probe:
+                    breaker.release()             # the probe never left: let the next caller probe
+                raise                             # refused locally (admission control); says nothing about upstream
+            except Exception as e:
+                if not is_unhealthy(e):
+                    breaker.success()             # upstream answered (e.g. 404); it is healthy
+                    raise
+                if breaker.failure():
+                    self.opened += 1
+                    log.warning("circuit opened for %s %s after %d failures", ep[0], ep[1], breaker.failures)
+                if n == tries - 1:
+                    if tries > 1:
+                        self.exhausted += 1
+                    raise
+                if not retry_timeouts and isinstance(e, httpx.ReadTimeout):
+                    raise
+                self.retries += 1
+                await asyncio.sleep(self.backoff(n))
+                continue
+            except BaseException:
+                if probe:
+                    breaker.release()             # cancelled mid-probe: the next caller probes instead
+                raise
+            breaker.success()
+            return result
+
+    async def _timed(self, ep: Endpoint, attempt: Callable[[], Awaitable[Any]]) -> Any:
+        t0 = self._clock()
+        result = await attempt()
+        self._latency[ep].add(self._clock() - t0)
+        return result
+
+    async def _hedged(self, ep: Endpoint, attempt: Callable[[], Awaitable[Any]]) -> Any:
+        """Send a second copy of a slow GET after the endpoint's p95; first success wins."""
+        lat = self._latency[ep]
+        if len(lat.samples) < self.hedge_min_samples:
+            return await self._timed(ep, attempt)
+        first = asyncio.ensure_future(self._timed(ep, attempt))
+        tasks = [first]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=max(self.hedge_min_delay, lat.p95()))
+            if not done:
+                self.hedges += 1
+                tasks.append(asyncio.ensure_future(self._timed(ep, attempt)))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for t in done:
+                    if t.exception() is None:
+                        if t is not first:
+                            self.hedge_wins += 1
+                        return t.result()
+            return first.result()                 # both failed: surface the primary's error
+        finally:
+            for t in tasks:
+                if not t.done():
+                    t.cancel()
+                elif not t.cancelled():
+                    t.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "retries": self.retries,
+            "retriesExhausted": self.exhausted,
+            "breakerOpened": self.opened,
+            "breakerRejected": self.rejected,
+            "openEndpoints": [f"{m} {p}" for (m, p), b in self._breakers.items() if b.is_open],
+            "hedges": self.hedges,
+            "hedgeWins": self.hedge_wins,
+        }
@@ -0,0 +1,68 @@
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, NamedTuple, Optional
+
+from mcpServer.config import REVALIDATE_MAX_ENTRIES
+
+# Last seen representation of each entity read, with its validators. Every read asks upstream
+# "changed since?" instead of re-downloading: a 304 (or, without validator support, a 200 whose
+# bytes hash the same) is answered with the stored body and nothing is decoded. This replaces the
+# TTL entity cache, which could serve a payment whose status had already changed upstream.
+
+
+class Validated(NamedTuple):
+    etag: Optional[str]
+    last_modified: Optional[str]
+    digest: str
+    body: Any
+    size: int
+
+
+def digest(content: bytes) -> str:
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+class ValidatorStore:
+    def __init__(self, max_entries: int = REVALIDATE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Validated]" = OrderedDict()
+        self.conditional = self.not_modified = self.unchanged = self.changed = self.bytes_saved = 0
+
+    def get(self, key: Hashable) -> Optional[Validated]:
+        v = self._entries.get(key)
+        if v is not None:
+            self._entries.move_to_end(key)
+        return v
+
+    def put(self, key: Hashable, v: Validated) -> None:
+        self._entries[key] = v
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def forget(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    @staticmethod
+    def headers(v: Optional[Validated]) -> Optional[Dict[str, str]]:
+        if v is None:
+            return None
+        h = {}
+        if v.etag:
+            h["If-None-Match"] = v.etag
+        if v.last_modified:
+            h["If-Modified-Since"] = v.last_modified
+        return h or None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "conditionalRequests": self.conditional,
+            "notModified": self.not_modified,          # 304: no body sent
+            "unchangedBody": self.unchanged,           # 200 with the same bytes: decode skipped
+            "changed": self.changed,
+            "bytesSaved": self.bytes_saved,
+        }
@@ -0,0 +1,59 @@
+from typing import Tuple
+
+import numpy as np
+
+DAY = 86400
+
+
+class DailyRollup:
+    """Completed count / amount per (category, day) for one customer, stored as prefix sums.
+
+    count[c, k] is the number of COMPLETED rows of category c on days day0 .. day0+k-1, so the
+    total for days [a, b] is count[c, b+1] - count[c, a]: two lookups whatever the window length.
+    """
+
+    def __init__(self, ts: np.ndarray, amount: np.ndarray, category: np.ndarray, completed: np.ndarray, categories: int):
+        days = ts[completed] // DAY
+        self.day0 = int(days.min()) if days.size else 0
+        width = int(days.max()) - self.day0 + 1 if days.size else 1
+        cells = category[completed].astype(np.int64) * width + (days - self.day0)
+        size = categories * width
+        daily_count = np.bincount(cells, minlength=size).reshape(categories, width)
+        daily_amount = np.bincount(cells, weights=amount[completed], minlength=size).reshape(categories, width)
+        self.count = np.zeros((categories, width + 1), dtype=np.int64)
+        self.amount = np.zeros((categories, width + 1), dtype=np.float64)
+        np.cumsum(daily_count, axis=1, out=self.count[:, 1:])
+        np.cumsum(daily_amount, axis=1, out=self.amount[:, 1:])
+
+    @property
+    def categories(self) -> int:
+        return self.count.shape[0]
+
+    @property
+    def days(self) -> int:
+        return self.count.shape[1] - 1
+
+    def range(self, first_day: int, last_day: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-category (count, amount) over whole days first_day..last_day (inclusive)."""
+        a = min(max(first_day - self.day0, 0), self.days)
+        b = min(max(last_day - self.day0 + 1, 0), self.days)
+        if b <= a:
+            return np.zeros(self.categories, dtype=np.int64), np.zeros(self.categories, dtype=np.float64)
+        return self.count[:, b] - self.count[:, a], self.amount[:, b] - self.amount[:, a]
+
+    def add(self, ts: int, category: int, amount: float, sign: int) -> bool:
+        """Move one completed row in (+1) or out (-1). False when it falls outside the arrays; rebuild then."""
+        day = ts // DAY
+        if category >= self.categories or day < self.day0:
+            return False
+        k = day - self.day0
+        if k >= self.days:                 # new day after the last one (the usual case for new transactions)
+            grow = k + 1 - self.days
+            self.count = np.pad(self.count, ((0, 0), (0, grow)), mode="edge")
+            self.amount = np.pad(self.amount, ((0, 0), (0, grow)), mode="edge")
+        self.count[category, k + 1:] += sign
+        self.amount[category, k + 1:] += sign * amount
+        return True
+
+    def totals(self) -> Tuple[int, float]:
+        return int(self.count[:, -1].sum()), float(self.amount[:, -1].sum())
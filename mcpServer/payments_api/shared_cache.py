@@ -0,0 +1,180 @@
+import json
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from mcpServer.config import SHARED_CACHE_READ_TIMEOUT_SECS
+from mcpServer.util.logs import get_logger
+
+# Optional second cache tier shared by every worker process on the host: one SQLite file (WAL),
+# so a body fetched by one worker is served to the others without another upstream call.
+# ResponseCache keeps its in-memory tier in front of it; keys are the same small tuples, stored
+# as JSON. Expiry uses the wall clock because entries outlive the process that wrote them.
+# ResponseCache is called on the event loop, so nothing here waits on a lock for long: writes are
+# queued to a writer thread (batched into one transaction), and a read that finds the file locked
+# for more than SHARED_CACHE_READ_TIMEOUT_SECS is a miss. Until its queued write has landed, a key
+# reads as a miss here too, so an invalidated body is never read back from the file.
+
+log = get_logger("mcpServer.shared_cache")
+
+_BATCH = 256                                      # queued writes per transaction
+
+
+def _key(key: Hashable) -> str:
+    return json.dumps(list(key) if isinstance(key, tuple) else key, separators=(",", ":"))
+
+
+def _unkey(raw: str) -> Hashable:
+    v = json.loads(raw)
+    return tuple(v) if isinstance(v, list) else v
+
+
+class SharedCacheTier:
+    def __init__(self, path: str, clock: Callable[[], float] = time.time,
+                 read_timeout: float = SHARED_CACHE_READ_TIMEOUT_SECS):
+        self.path = path
+        self._clock = clock
+        self._puts = 0
+        self._wdb = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=1.0)
+        self._wdb.execute("PRAGMA journal_mode=WAL")
+        self._wdb.execute("PRAGMA synchronous=NORMAL")      # a lost cache entry after a crash is harmless
+        self._wdb.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " ns TEXT NOT NULL, key TEXT NOT NULL, tag TEXT, body TEXT NOT NULL, size INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL, PRIMARY KEY (ns, key))"
+        )
+        self._wdb.execute("CREATE INDEX IF NOT EXISTS cache_tag ON cache (ns, tag)")
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=read_timeout)
+        self._writes: "queue.Queue[Optional[Tuple]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str], int] = {}        # (ns, key) -> queued writes not applied yet
+        self._pending_clear: Dict[str, int] = {}
+        self._closed = False
+        self.dropped = 0                                       # writes lost to errors (e.g. a long lock)
+        self._writer = threading.Thread(target=self._write_loop, name="shared-cache-writer", daemon=True)
+        self._writer.start()
+
+    # --- reads (caller's thread, short busy timeout) ---
+
+    def _busy(self, ns: str, k: str) -> bool:
+        with self._lock:
+            return (ns, k) in self._pending or ns in self._pending_clear
+
+    def get(self, ns: str, key: Hashable) -> Optional[Tuple[Any, int, float, Tuple]]:
+        """(body, size, seconds left, tags) or None."""
+        k = _key(key)
+        if self._busy(ns, k):
+            return None
+        now = self._clock()
+        try:
+            row = self._db.execute(
+                "SELECT body, size, expires_at, tag FROM cache WHERE ns = ? AND key = ? AND expires_at > ?", (ns, k, now)
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1], row[2] - now, (_unkey(row[3]),) if row[3] is not None else ()
+
+    def tagged(self, ns: str, tag: Hashable) -> List[Hashable]:
+        try:
+            rows = self._db.execute("SELECT key FROM cache WHERE ns = ? AND tag = ?", (ns, _key(tag))).fetchall()
+        except sqlite3.OperationalError:
+            return []
+        return [_unkey(r[0]) for r in rows]
+
+    def count(self, ns: str) -> int:
+        try:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM cache WHERE ns = ? AND expires_at > ?", (ns, self._clock())).fetchone()[0]
+        except sqlite3.OperationalError:
+            return 0
+
+    # --- writes (queued) ---
+
+    def put(self, ns: str, key: Hashable, body: Any, size: int, ttl: float, tags: Iterable[Hashable] = ()) -> None:
+        tag = next(iter(tags), None)              # the callers use at most one tag (the customer)
+        self._enqueue(("put", ns, [_key(key)], _key(tag) if tag is not None else None, json.dumps(body), size,
+                       self._clock() + ttl))
+
+    def delete(self, ns: str, keys: Iterable[Hashable]) -> None:
+        self._enqueue(("delete", ns, [_key(k) for k in keys]))
+
+    def clear(self, ns: str) -> None:
+        self._enqueue(("clear", ns, []))
+
+    def _enqueue(self, op: Tuple) -> None:
+        if self._closed:
+            return
+        self._track(op, +1)
+        self._writes.put(op)
+
+    def _track(self, op: Tuple, n: int) -> None:
+        kind, ns, keys = op[:3]
+        with self._lock:
+            counts, ids = (self._pending_clear, [ns]) if kind == "clear" else (self._pending, [(ns, k) for k in keys])
+            for i in ids:
+                left = counts.get(i, 0) + n
+                if left:
+                    counts[i] = left
+                else:
+                    del counts[i]
+
+    def _write_loop(self) -> None:
+        stop = False
+        while not stop:
+            ops = [self._writes.get()]
+            while len(ops) < _BATCH:
+                try:
+                    ops.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in ops
+            ops = [op for op in ops if op is not None]
+            try:
+                self._apply(ops)
+            except sqlite3.Error as e:
+                self.dropped += len(ops)
+                log.warning("shared cache: %d writes dropped: %s", len(ops), e)
+            finally:
+                for op in ops:
+                    self._track(op, -1)
+                for _ in range(len(ops) + stop):
+                    self._writes.task_done()
+
+    def _apply(self, ops: List[Tuple]) -> None:
+        db = self._wdb
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            for op in ops:
+                kind, ns, keys = op[:3]
+                if kind == "put":
+                    tag, body, size, expires_at = op[3:]
+                    db.execute("INSERT OR REPLACE INTO cache (ns, key, tag, body, size, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                               (ns, keys[0], tag, body, size, expires_at))
+                    self._puts += 1
+                    if self._puts % 1000 == 0:
+                        db.execute("DELETE FROM cache WHERE expires_at <= ?", (self._clock(),))
+                elif kind == "delete":
+                    db.executemany("DELETE FROM cache WHERE ns = ? AND key = ?", [(ns, k) for k in keys])
+                else:
+                    db.execute("DELETE FROM cache WHERE ns = ?", (ns,))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def flush(self) -> None:
+        """Wait until every queued write is in the file (tests, shutdown)."""
+        self._writes.join()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._writes.put(None)
+        self._writer.join()
+        self._wdb.close()
+        self._db.close()
@@ -0,0 +1,31 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+# Request coalescing: concurrent calls with the same key share one in-flight upstream request.
+# The shared work runs as its own task, so a cancelled caller doesn't cancel it for the others.
+class SingleFlight:
+    def __init__(self, clone: Callable[[Any], Any] = lambda result: result):
+        self._clone = clone                  # followers get clone(result) so nobody shares a mutable body
+        self._inflight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self.calls = 0                       # requests actually sent upstream
+        self.saved = 0                       # callers that joined an in-flight request instead
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.saved += 1
+            return self._clone(await asyncio.shield(task))
+        self.calls += 1
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+        task.add_done_callback(lambda t, k=key: self._done(k, t))
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()                 # mark retrieved even if every caller went away
+
+    def stats(self) -> Dict[str, Any]:
+        return {"upstreamCalls": self.calls, "saved": self.saved, "inFlight": len(self._inflight)}
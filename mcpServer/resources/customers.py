@@ -1,5 +1,5 @@
 from mcpServer.runtime import mcp
-from mcpServer.payments_api.client import PaymentsApiClient
+from mcpServer.payments_api.client import get_payments_api
 
 @mcp.resource(
     uri="resource://customers/{id}",
@@ -8,8 +8,5 @@ from mcpServer.payments_api.client import PaymentsApiClient
     mime_type="application/json",
 )
 async def customer_resource(id: str) -> dict:                  
-    api = PaymentsApiClient()
-    try:
-        return await api.get_customer(int(id))
-    finally:
-        await api.close()
+    api = get_payments_api()
+    return await api.get_customer(int(id))
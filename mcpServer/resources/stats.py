@@ -0,0 +1,11 @@
+from mcpServer.runtime import mcp
+from mcpServer.payments_api.client import get_payments_api
+
+@mcp.resource(
+    uri="resource://server/stats",
+    name="server-stats",
+    description="Upstream client counters (cache hits/misses/evictions) for tuning",
+    mime_type="application/json",
+)
+async def server_stats_resource() -> dict:
+    return get_payments_api().stats()
@@ -1,7 +1,84 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+from mcpServer.config import (
+    LOCAL_ANALYTICS_RECONCILE_SECS, METRICS_ENABLED, MCP_WORKER_ID, WORKER_METRICS_DIR, WORKER_METRICS_FLUSH_SECS,
+)
+from mcpServer.payments_api.client import get_payments_api, close_payments_api
+from mcpServer.payments_api.codec import dumps_str
+from mcpServer.util.logs import logging_stats
+from mcpServer.util.metrics import REGISTRY, ToolMetrics, render_workers, stats_collector, write_snapshot
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    # On the HTTP transport FastMCP enters this once per MCP session, so it only hands out the
+    # process-wide upstream client; the pool itself is closed by the process shutdown hook below.
+    yield {"api": get_payments_api()}
 
 # One global app instance that tools/resources attach to
 mcp = FastMCP(
     name="myPayments-mcp",
     version="1.0.0",
+    lifespan=lifespan,
+    tool_serializer=dumps_str,      # text content of dict-returning tools, via orjson when installed
 )
+
+if METRICS_ENABLED:
+    mcp.add_middleware(ToolMetrics())
+    REGISTRY.collectors.append(stats_collector(lambda: {**get_payments_api().stats(), "logging": logging_stats()}))
+
+    # Served by the same uvicorn app as the MCP endpoint (mcp.http_app() includes custom routes)
+    @mcp.custom_route("/metrics", methods=["GET"])
+    async def metrics(request: Request) -> PlainTextResponse:
+        # under the worker supervisor any worker may get the scrape: serve the merge of all workers
+        text = await render_workers(WORKER_METRICS_DIR, MCP_WORKER_ID) if _in_worker() else REGISTRY.render()
+        return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+def _in_worker() -> bool:
+    return bool(METRICS_ENABLED and WORKER_METRICS_DIR and MCP_WORKER_ID)
+
+async def _flush_metrics_forever(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        await write_snapshot(WORKER_METRICS_DIR, MCP_WORKER_ID)
+
+async def _reconcile_forever(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        await get_payments_api().reconcile_local()
+
+@asynccontextmanager
+async def background():
+    """Process-wide background work (local analytics reconciliation) for the server's lifetime."""
+    tasks = []
+    if get_payments_api().local is not None and LOCAL_ANALYTICS_RECONCILE_SECS > 0:
+        tasks.append(asyncio.create_task(_reconcile_forever(LOCAL_ANALYTICS_RECONCILE_SECS)))
+    if _in_worker():
+        tasks.append(asyncio.create_task(_flush_metrics_forever(WORKER_METRICS_FLUSH_SECS)))
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        if _in_worker():
+            await write_snapshot(WORKER_METRICS_DIR, MCP_WORKER_ID)   # final counts survive the worker
+
+def http_app(**kwargs):
+    """FastMCP's streamable-HTTP ASGI app, with the upstream pool closed on ASGI shutdown."""
+    app = mcp.http_app(**kwargs)
+    inner = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def _lifespan(a):
+        async with inner(a), background():
+            try:
+                yield
+            finally:
+                await close_payments_api()
+
+    app.router.lifespan_context = _lifespan
+    return app
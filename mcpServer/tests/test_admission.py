@@ -0,0 +1,149 @@
+import asyncio
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from mcpServer.payments_api.admission import AdmissionController, AdmissionRejected, lane, parse_waits
+from mcpServer.payments_api.client import PaymentsApiClient
+from mcpServer.payments_api.resilience import ResiliencePolicy
+from mcpServer.util.metrics import REGISTRY
+
+BASE = "http://standin/api/v1/service"
+GET_TX, SEARCH, PAY = ("GET", "/transactions/{id}"), ("GET", "/transactions"), ("POST", "/payments")
+
+
+def test_lanes_and_waits():
+    assert [lane(ep) for ep in (PAY, GET_TX, ("GET", "/transactions/{id}/payment"), SEARCH,
+                                ("GET", "/analytics/spend-by-category"), ("GET", "/customers/{id}/transactions"))] \
+        == ["write", "entity", "entity", "bulk", "bulk", "bulk"]
+    assert parse_waits("write=5,bulk=0.5") == {"write": 5.0, "entity": 1.0, "bulk": 0.5}
+    assert parse_waits("3") == {"write": 3.0, "entity": 3.0, "bulk": 3.0}
+
+
+def test_waiters_are_served_by_lane_priority():
+    async def _run():
+        ac = AdmissionController(initial_limit=2, min_limit=2, max_limit=2, bulk_share=1.0)
+        held = [await ac.acquire(SEARCH), await ac.acquire(SEARCH)]
+        order = []
+
+        async def want(ep):
+            permit = await ac.acquire(ep)
+            order.append(ep[0] + " " + ep[1])
+            return permit
+
+        waiters = [asyncio.create_task(want(ep)) for ep in (SEARCH, GET_TX, PAY)]
+        await asyncio.sleep(0)
+        assert ac.stats()["queued"] == {"write": 1, "entity": 1, "bulk": 1}
+        for p in held:
+            ac.release(p, None, False)
+        await asyncio.sleep(0.01)
+        assert order == ["POST /payments", "GET /transactions/{id}"]        # bulk still waits
+        for p in [w.result() for w in waiters[1:]]:
+            ac.release(p, None, False)
+        await waiters[0]
+        return order
+    assert asyncio.run(_run())[-1] == "GET /transactions"
+
+
+def test_bulk_share_leaves_room_for_writes_and_getters():
+    async def _run():
+        ac = AdmissionController(initial_limit=4, min_limit=4, max_limit=4, bulk_share=0.5, max_wait="0.05")
+        bulk = [await ac.acquire(SEARCH), await ac.acquire(SEARCH)]
+        with pytest.raises(AdmissionRejected, match="wait timed out"):
+            await ac.acquire(SEARCH)                                  # bulk is at its half of the limit
+        write, getter = await ac.acquire(PAY), await ac.acquire(GET_TX)
+        return ac.stats(), bulk, write, getter
+    stats, *_ = asyncio.run(_run())
+    assert stats["inFlight"] == 4 and stats["rejectedTimeout"] == 1 and stats["queued"]["bulk"] == 0
+
+
+def test_full_queue_rejects_without_waiting():
+    async def _run():
+        ac = AdmissionController(initial_limit=1, min_limit=1, max_limit=1, max_queue=1, max_wait="10")
+        held = await ac.acquire(GET_TX)
+        waiter = asyncio.create_task(ac.acquire(GET_TX))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected, match="queue full"):
+            await ac.acquire(GET_TX)
+        ac.release(held, 0.01, False)
+        ac.release(await waiter, 0.01, False)
+        return ac.stats()
+    stats = asyncio.run(_run())
+    assert stats["rejectedQueueFull"] == 1 and stats["inFlight"] == 0
+    assert 'mcp_upstream_admission_rejected_total{lane="entity",reason="queueFull"}' in REGISTRY.render()
+
+
+def test_limit_backs_off_on_slow_or_overloaded_answers_and_grows_when_healthy():
+    now = [0.0]
+    ac = AdmissionController(initial_limit=10, min_limit=2, max_limit=20, clock=lambda: now[0])
+
+    async def one(latency, overloaded=False):
+        p = await ac.acquire(GET_TX)
+        now[0] += latency
+        ac.release(p, latency, overloaded)
+
+    async def _run():
+        await one(0.010)                                            # baseline
+        await one(0.050)                                            # 5x slower: congested
+        assert int(ac.limit) == 8
+        permits = [await ac.acquire(GET_TX) for _ in range(3)]     # admitted before the next cut
+        now[0] += 1
+        ac.release(permits[0], None, True)                          # 503: one cut for the episode
+        ac.release(permits[1], None, True)
+        ac.release(permits[2], 0.2, False)
+        assert int(ac.limit) == 6 and ac.stats()["limitDecreases"] == 2
+        for _ in range(60):                                         # saturated and healthy: additive increase
+            held = [await ac.acquire(GET_TX) for _ in range(int(ac.limit))]
+            for p in held:
+                ac.release(p, 0.010, False)
+        return int(ac.limit)
+    assert asyncio.run(_run()) == 20
+
+
+def _congestible(capacity: int, base_ms: float):
+    """An upstream whose latency grows with the requests it is serving beyond `capacity`."""
+    state = {"now": 0, "peak": 0}
+
+    async def search(req):
+        state["now"] += 1
+        state["peak"] = max(state["peak"], state["now"])
+        try:
+            await asyncio.sleep(base_ms / 1000 * max(1.0, state["now"] / capacity))
+        finally:
+            state["now"] -= 1
+        return JSONResponse({"content": [], "totalElements": 0, "last": True})
+
+    async def pay(req):
+        return JSONResponse({"id": 1, "transactionId": 1, "status": "SUCCESS"}, status_code=201)
+
+    app = Starlette(routes=[Route("/api/v1/service/transactions", search),
+                            Route("/api/v1/service/payments", pay, methods=["POST"])])
+    return app, state
+
+
+def test_client_converges_under_an_analytics_burst_and_keeps_writes_fast():
+    app, state = _congestible(capacity=4, base_ms=20)
+    admission = AdmissionController(initial_limit=40, min_limit=2, max_limit=40, max_queue=1000, max_wait="60")
+    api = PaymentsApiClient(base_url=BASE, transport=httpx.ASGITransport(app=app), coalesce=False,
+                            resilience=ResiliencePolicy(), admission=admission)
+
+    async def _run():
+        for i in range(5):                           # normal traffic first: the endpoint's uncongested latency
+            await api.search_transactions({"customerId": i})
+        burst = [asyncio.create_task(api.search_transactions({"customerId": i})) for i in range(300)]
+        await asyncio.sleep(0.3)
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        await api.make_payment({"transactionId": 1, "method": "Card"}, None)
+        write_secs = loop.time() - t0
+        await asyncio.gather(*burst)
+        await api.close()
+        return write_secs
+    write_secs = asyncio.run(_run())
+    stats = admission.stats()
+    assert stats["limitDecreases"] >= 3 and stats["limit"] <= 12 and stats["waited"] > 100
+    assert write_secs < 0.2                          # queued ahead of ~250 waiting listings
+    assert state["peak"] <= 40
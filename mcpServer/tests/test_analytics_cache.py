@@ -0,0 +1,70 @@
+import asyncio
+from datetime import datetime, timedelta
+import httpx
+
+from mcpServer.bench.standin import build_app
+from mcpServer.config import ANALYTICS_CACHE_PAST_TTL_SECS, ANALYTICS_CACHE_LIVE_TTL_SECS
+from mcpServer.payments_api.client import PaymentsApiClient, new_analytics_cache
+from mcpServer.payments_api.cache import ResponseCache
+
+BASE = "http://standin/api/v1/service"
+SUMMARY = ("GET", "/analytics/spend-summary")
+
+def _iso(dt: datetime) -> str:
+    return dt.replace(microsecond=0).isoformat()
+
+def _client(app):
+    return PaymentsApiClient(base_url=BASE, transport=httpx.ASGITransport(app=app),
+                             cache=ResponseCache(), analytics_cache=new_analytics_cache())
+
+def _window(cid, frm, to):
+    return {"customerId": cid, "from": _iso(frm), "to": _iso(to), "fxBase": "USD"}
+
+def test_past_windows_live_long_and_live_windows_short():
+    async def _run():
+        app = build_app()
+        api = _client(app)
+        now = datetime.now()
+        past = _window(1, now - timedelta(days=400), now - timedelta(days=30))
+        live = _window(1, now - timedelta(days=30), now + timedelta(hours=1))
+        for _ in range(3):
+            await api.spend_summary(past)
+            await api.spend_summary(live)
+        assert app.state.hits[SUMMARY] == 2
+        ttls = sorted(e[0] for e in api.analytics_cache._entries.values())
+        assert ttls[1] - ttls[0] > ANALYTICS_CACHE_PAST_TTL_SECS - ANALYTICS_CACHE_LIVE_TTL_SECS - 5
+        await api.close()
+    asyncio.run(_run())
+
+def test_writes_evict_only_windows_covering_the_transaction():
+    async def _run():
+        app = build_app()
+        api = _client(app)
+        now = datetime.now()
+        live_1 = _window(1, now - timedelta(days=30), now + timedelta(hours=1))
+        live_2 = _window(2, now - timedelta(days=30), now + timedelta(hours=1))
+        past_1 = _window(1, now - timedelta(days=900), now - timedelta(days=800))
+        for w in (live_1, live_2, past_1):
+            await api.spend_summary(w)
+        await api.create_transaction({"customerId": 1, "amount": 5, "currency": "USD", "category": "Retail"}, None)
+        for w in (live_1, live_2, past_1):
+            await api.spend_summary(w)
+        # only customer 1's live window was refetched
+        assert app.state.hits[SUMMARY] == 4
+        await api.close()
+    asyncio.run(_run())
+
+def test_payment_on_old_transaction_evicts_past_window():
+    async def _run():
+        app = build_app()
+        api = _client(app)
+        data = app.state.data
+        tx = next(t for t in data.transactions.values() if t["status"] == "PENDING")
+        created = datetime.fromisoformat(tx["createdAt"])
+        w = _window(tx["customerId"], created - timedelta(days=1), created + timedelta(seconds=1))
+        before = (await api.spend_summary(w))["totalAmount"]
+        await api.make_payment({"transactionId": tx["id"], "method": "UPI"}, None)
+        after = (await api.spend_summary(w))["totalAmount"]
+        assert round(after - before, 2) == round(tx["amount"], 2)
+        await api.close()
+    asyncio.run(_run())
@@ -0,0 +1,133 @@
+import asyncio
+import random
+
+import httpx
+
+from mcpServer.bench.standin import Faults, Latency, ServedStandIn, build_app
+from mcpServer.payments_api.balancer import Balancer
+from mcpServer.payments_api.client import PaymentsApiClient
+from mcpServer.payments_api.resilience import ResiliencePolicy
+
+
+def _balancer(n: int, now, **kw) -> Balancer:
+    urls = [f"http://replica{i}" for i in range(n)]
+    return Balancer(urls, lambda u: httpx.AsyncClient(base_url=u), health_interval=0, clock=lambda: now[0],
+                    rng=random.Random(7), **kw)
+
+
+def test_passive_ejection_backs_off_and_panics_when_nothing_is_left():
+    now = [0.0]
+
+    async def _run():
+        lb = _balancer(2, now, eject_failures=2, eject_secs=10, eject_max_secs=25)
+        a, b = lb.replicas
+
+        def fail(r, times=1):
+            for _ in range(times):
+                r.outstanding += 1
+                lb.done(r, None, True)
+
+        fail(a, 2)
+        assert not a.available(now[0]) and all(lb.pick() is b for _ in range(20))
+        now[0] = 10.0
+        assert a.available(now[0])
+        fail(a, 2)
+        assert a.ejected_until == 30.0               # second ejection: twice as long
+        fail(b, 2)                                  # both ejected: try them all rather than fail
+        picked = lb.pick()
+        await lb.close()
+        return picked, lb.stats()
+    picked, stats = asyncio.run(_run())
+    assert picked is not None and stats["panics"] == 1 and stats["available"] == 0 and stats["ejections"] == 3
+
+
+def _stand_ins(*p50s, faults=None):
+    return [ServedStandIn(build_app(latency_ms=Latency(ms), faults=(faults or {}).get(i)))
+            for i, ms in enumerate(p50s)]
+
+
+def _spread(api: PaymentsApiClient, calls: int, concurrency: int):
+    async def _run():
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one(i):
+            async with sem:
+                await api.get_customer(i % 50 + 1)
+        await asyncio.gather(*(one(i) for i in range(calls)))
+        stats = api.stats()["balancer"]
+        await api.close()
+        return stats
+    return asyncio.run(_run())
+
+
+def test_ewma_sends_most_requests_to_the_fast_replica():
+    fast, slow = _stand_ins(2, 40)
+    with fast, slow:
+        api = PaymentsApiClient(base_url=f"{fast.base_url},{slow.base_url}", coalesce=False)
+        stats = _spread(api, calls=200, concurrency=8)
+    by = stats["byReplica"]
+    assert stats["policy"] == "ewma" and by[fast.base_url]["requests"] > 3 * by[slow.base_url]["requests"]
+    assert by[fast.base_url]["ewmaMs"] < by[slow.base_url]["ewmaMs"]
+
+
+def test_least_outstanding_spreads_load_over_equal_replicas():
+    servers = _stand_ins(10, 10, 10)
+    with servers[0], servers[1], servers[2]:
+        api = PaymentsApiClient(base_url=",".join(s.base_url for s in servers), coalesce=False)
+        api._lb().policy = "least_outstanding"
+        stats = _spread(api, calls=150, concurrency=9)
+        hits = [sum(s.app.state.hits.values()) for s in servers]
+    assert sum(hits) == 150 and min(hits) >= 30
+    assert all(r["outstanding"] == 0 for r in stats["byReplica"].values())
+
+
+def test_failing_replica_is_ejected_and_reintroduced_by_health_checks():
+    faults = Faults(error_rate=1.0, status=503)
+    good, bad = _stand_ins(1, 1, faults={1: faults})
+    with good, bad:
+        api = PaymentsApiClient(base_url=f"{good.base_url},{bad.base_url}", coalesce=False,
+                                resilience=ResiliencePolicy(attempts=3, base_delay=0.001, breaker_threshold=1000))
+        lb = api._lb()
+        lb.health_interval, lb.eject_failures = 0, 1
+
+        async def _run():
+            for i in range(40):                      # the retry re-picks among the rest, so every call succeeds
+                assert (await api.get_customer(i % 50 + 1))["id"] == i % 50 + 1
+            ejected = not lb.replicas[1].available(lb._clock())
+            await lb.check()                         # still failing: the probe keeps it out
+            still_out = not lb.replicas[1].available(lb._clock())
+            faults.error_rate = 0.0
+            await lb.check()
+            back = lb.replicas[1].available(lb._clock())
+            before = lb.replicas[1].requests
+            for i in range(40):
+                await api.get_customer(i % 50 + 1)
+            served = lb.replicas[1].requests - before
+            await api.close()
+            return ejected, still_out, back, served
+        ejected, still_out, back, served = asyncio.run(_run())
+    assert ejected and still_out and back and served > 0
+    assert bad.app.state.hits and sum(good.app.state.hits.values()) >= 40
+
+
+def test_rate_limited_replica_is_not_ejected():
+    faults = Faults(error_rate=1.0, status=429)
+    good, limited = _stand_ins(1, 1, faults={1: faults})
+    with good, limited:
+        api = PaymentsApiClient(base_url=f"{good.base_url},{limited.base_url}", coalesce=False,
+                                resilience=ResiliencePolicy(attempts=3, base_delay=0.001, breaker_threshold=1000))
+        lb = api._lb()
+        lb.health_interval, lb.eject_failures = 0, 1
+
+        async def _run():
+            for i in range(20):
+                try:
+                    await api.get_customer(i % 50 + 1)
+                except httpx.HTTPStatusError as e:          # all three tries may land on the limited one
+                    assert e.response.status_code == 429
+            r = lb.replicas[1]
+            await api.close()
+            return r.available(lb._clock()), r.requests, r.errors, r.ejections
+        available, requests, errors, ejections = asyncio.run(_run())
+    assert available and requests > 0 and errors == ejections == 0
+    assert limited.app.state.hits
@@ -0,0 +1,31 @@
+import asyncio
+import httpx
+from fastmcp import Client
+
+from mcpServer.bench.standin import build_app
+from mcpServer.payments_api import client as client_mod
+from mcpServer.payments_api.client import PaymentsApiClient
+from mcpServer.runtime import mcp
+from mcpServer.tools import customers, transactions, payments  # noqa: F401  (registers tools)
+
+BASE = "http://standin/api/v1/service"
+HEADERS = {"x-mcp-api-key": "lovethisapp"}
+
+def test_payments_by_transactions_reports_per_id_errors(monkeypatch):
+    app = build_app()
+    data = app.state.data
+    paid = [t for t in data.payment_by_tx][:3]
+    pending = next(t["id"] for t in data.transactions.values() if t["id"] not in data.payment_by_tx)
+    monkeypatch.setattr(client_mod, "_shared",
+                        PaymentsApiClient(base_url=BASE, transport=httpx.ASGITransport(app=app)))
+
+    async def _run():
+        async with Client(mcp) as c:
+            res = await c.call_tool("get_payments_by_transactions",
+                                    {"input": {"transactionIds": paid + [pending, paid[0]]}, "headers": HEADERS})
+        out = res.structured_content
+        assert out["requested"] == 4 and out["found"] == 3
+        assert [p["transactionId"] for p in out["items"]] == paid
+        assert out["errors"] == [{"id": pending, "status": 404, "error": "Not Found"}]
+        await client_mod._shared.close()
+    asyncio.run(_run())
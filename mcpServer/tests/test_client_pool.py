@@ -0,0 +1,28 @@
+import asyncio
+import httpx
+
+from mcpServer.bench.standin import build_app
+from mcpServer.payments_api import client as client_mod
+from mcpServer.payments_api.client import PaymentsApiClient, get_payments_api, close_payments_api
+
+BASE = "http://standin/api/v1/service"
+
+def test_shared_client_is_process_wide():
+    async def _run():
+        a = get_payments_api()
+        assert get_payments_api() is a
+        await close_payments_api()
+        assert client_mod._shared is None
+        assert get_payments_api() is not a
+        await close_payments_api()
+    asyncio.run(_run())
+
+def test_client_reuses_one_pool_across_calls():
+    async def _run():
+        api = PaymentsApiClient(base_url=BASE, transport=httpx.ASGITransport(app=build_app()))
+        first = await api._ac()
+        assert (await api.get_customer(1))["id"] == 1
+        assert (await api.get_payment(1))["id"] == 1
+        assert await api._ac() is first
+        await api.close()
+    asyncio.run(_run())
@@ -0,0 +1,66 @@
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from fastmcp import Client
+
+pytest.importorskip("numpy")
+
+from mcpServer.bench.standin import build_app
+from mcpServer.payments_api import client as client_mod
+from mcpServer.payments_api.client import PaymentsApiClient
+from mcpServer.runtime import mcp
+from mcpServer.tools import analytics  # noqa: F401  (registers tools)
+
+BASE = "http://standin/api/v1/service"
+HEADERS = {"x-mcp-api-key": "lovethisapp"}
+FROM = (datetime.utcnow() - timedelta(days=180)).strftime("%Y-%m-%d")
+TO = (datetime.utcnow() + timedelta(days=1)).strftime("%Y-%m-%d")
+
+def _expected(app, ids=None, currency=None):
+    by_cust, by_cat = defaultdict(float), defaultdict(float)
+    for t in app.state.data.transactions.values():
+        if t["status"] != "COMPLETED" or not (f"{FROM}T00:00:00" <= t["createdAt"] <= f"{TO}T23:59:59"):
+            continue
+        if (ids and t["customerId"] not in ids) or (currency and t["currency"] != currency):
+            continue
+        by_cust[t["customerId"]] += t["amount"]
+        by_cat[t["category"]] += t["amount"]
+    return by_cust, by_cat
+
+def _call(monkeypatch, app, args):
+    monkeypatch.setattr(client_mod, "_shared",
+                        PaymentsApiClient(base_url=BASE, transport=httpx.ASGITransport(app=app)))
+
+    async def _run():
+        async with Client(mcp) as c:
+            res = await c.call_tool("cohort_analytics", {"input": {"from": FROM, "to": TO, **args}, "headers": HEADERS})
+        await client_mod._shared.close()
+        return res.structured_content
+    return asyncio.run(_run())
+
+def test_cohort_for_customer_list(monkeypatch):
+    app = build_app()
+    ids = [3, 9, 27, 9, 44]
+    out = _call(monkeypatch, app, {"customerIds": ids, "topN": 2})
+    by_cust, by_cat = _expected(app, set(ids))
+    assert out["source"] == "per-customer" and out["totals"]["customers"] == 4
+    rows = {r[0]: r for r in out["customers"]["rows"]}
+    assert set(rows) == {3, 9, 27, 44}
+    assert all(rows[c][1] == pytest.approx(by_cust[c], abs=0.01) for c in rows)
+    assert out["topCustomers"] == sorted(by_cust, key=by_cust.get, reverse=True)[:2]
+    assert out["topCategories"] == sorted(by_cat, key=by_cat.get, reverse=True)[:2]
+    assert app.state.hits[("GET", "/analytics/spend-by-category")] == 4
+
+def test_cohort_by_filter_walks_listing_once(monkeypatch):
+    app = build_app()
+    out = _call(monkeypatch, app, {"currency": "EUR"})
+    by_cust, by_cat = _expected(app, currency="EUR")
+    assert out["source"] == "listing" and out["truncated"] is False
+    assert out["totals"]["customersWithSpend"] == len(by_cust)
+    assert out["totals"]["totalAmount"] == pytest.approx(sum(by_cust.values()), abs=0.01)
+    cats = {r[0]: r[1] for r in out["categories"]["rows"]}
+    assert cats == pytest.approx(dict(by_cat), abs=0.01)
+    assert app.state.hits[("GET", "/analytics/spend-by-category")] == 0
@@ -0,0 +1,56 @@
+import asyncio
+import json
+
+import httpx
+from fastmcp import Client
+
+from mcpServer.bench.standin import build_app
+from mcpServer.models.wire import CategorySpendItem
+from mcpServer.payments_api import client as client_mod
+from mcpServer.payments_api.client import PaymentsApiClient
+from mcpServer.runtime import mcp
+from mcpServer.tools import analytics, transactions  # noqa: F401  (registers tools)
+from mcpServer.util.columnar import from_table, to_table
+
+BASE = "http://standin/api/v1/service"
+HEADERS = {"x-mcp-api-key": "lovethisapp"}
+WINDOW = {"from": "2000-01-01T00:00:00", "to": "2100-01-01T00:00:00"}
+
+
+def _both(monkeypatch, tool, args):
+    monkeypatch.setattr(client_mod, "_shared",
+                        PaymentsApiClient(base_url=BASE, transport=httpx.ASGITransport(app=build_app())))
+
+    async def _run():
+        async with Client(mcp) as c:
+            out = [await c.call_tool(tool, {"input": {**args, "format": fmt}, "headers": HEADERS})
+                   for fmt in ("rows", "columnar")]
+        await client_mod._shared.close()
+        return [(r.structured_content, r.content[0].text) for r in out]
+    return asyncio.run(_run())
+
+
+def test_table_dictionary_encodes_repeated_strings_only():
+    rows = [{"id": i, "category": ["Food", "Travel"][i % 2], "note": f"n{i}", "amount": i * 1.5} for i in range(6)]
+    table = to_table(rows)
+    assert table["columns"] == ["id", "category", "note", "amount"]
+    assert table["dictionaries"] == {"category": ["Food", "Travel"]}
+    assert [r[1] for r in table["rows"]] == [0, 1, 0, 1, 0, 1] and table["rows"][2][2] == "n2"
+    assert from_table(table) == rows
+    items = [CategorySpendItem("Food", 12.0, 3, "USD"), CategorySpendItem("Rent", 900.0, 1, "USD")]
+    assert to_table(items, encode=False)["rows"] == [["Food", 12.0, 3, "USD"], ["Rent", 900.0, 1, "USD"]]
+
+
+def test_search_transactions_columnar_round_trips_and_is_smaller(monkeypatch):
+    (rows, rows_text), (cols, cols_text) = _both(monkeypatch, "search_transactions", {"size": 50})
+    assert from_table(cols["content"]) == rows["content"]
+    assert cols["totalElements"] == rows["totalElements"] and "status" in cols["content"]["dictionaries"]
+    assert len(cols_text) < len(rows_text) * 0.6
+
+
+def test_analytics_tools_columnar(monkeypatch):
+    (rows, _), (cols, _) = _both(monkeypatch, "spend_by_category", {"customerId": 3, **WINDOW})
+    assert from_table(cols["items"]) == rows["items"] and cols["customerId"] == 3
+    (rows, _), (cols, cols_text) = _both(monkeypatch, "time_series", {"customerId": 3, "bucket": "month", **WINDOW})
+    assert cols["series"]["columns"] == ["timestampStart", "amount"]
+    assert from_table(cols["series"]) == rows["series"] and json.loads(cols_text) == cols
@@ -0,0 +1,77 @@
+import asyncio
+import csv
+import hashlib
+import io
+import json
+
+import httpx
+import pytest
+from fastmcp import Client
+
+from mcpServer.bench.standin import build_app
+from mcpServer.payments_api import client as client_mod
+from mcpServer.payments_api.client import PaymentsApiClient
+from mcpServer.runtime import http_app, mcp
+from mcpServer.tools import transactions  # noqa: F401  (registers tools)
+from mcpServer.util import export as export_mod
+
+BASE = "http://standin/api/v1/service"
+HEADERS = {"x-mcp-api-key": "lovethisapp"}
+
+
+def _export(monkeypatch, tmp_path, args, app=None):
+    monkeypatch.setattr(export_mod, "EXPORT_DIR", str(tmp_path))
+    app = app or build_app()
+    monkeypatch.setattr(client_mod, "_shared",
+                        PaymentsApiClient(base_url=BASE, transport=httpx.ASGITransport(app=app)))
+    progress = []
+
+    async def on_progress(done, total, message):
+        progress.append(done)
+
+    async def _run():
+        async with Client(mcp, progress_handler=on_progress) as c:
+            res = await c.call_tool("export_transactions", {"input": args, "headers": HEADERS})
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=http_app()), base_url="http://mcp") as web:
+            ok = await web.get(res.structured_content["downloadPath"], headers=HEADERS)
+            denied = await web.get(res.structured_content["downloadPath"])
+            missing = await web.get("/exports/" + "x" * 24, headers=HEADERS)
+        await client_mod._shared.close()
+        return res.structured_content, ok, (denied.status_code, missing.status_code), progress
+    return app, asyncio.run(_run())
+
+
+def test_ndjson_export_streams_every_page_and_is_downloadable(monkeypatch, tmp_path):
+    monkeypatch.setattr(transactions, "EXPORT_PAGE_SIZE", 7)
+    app, (out, resp, errors, progress) = _export(monkeypatch, tmp_path, {"status": "COMPLETED"})
+    expected = sorted(t["id"] for t in app.state.data.transactions.values() if t["status"] == "COMPLETED")
+    rows = [json.loads(line) for line in resp.content.splitlines()]
+    assert [r["id"] for r in rows] == expected and out["rows"] == len(expected) == out["totalElements"]
+    assert out["pages"] == -(-len(expected) // 7) and out["truncated"] is False and progress[-1] == len(expected)
+    assert hashlib.sha256(resp.content).hexdigest() == out["sha256"] and out["bytes"] == len(resp.content)
+    assert resp.headers["content-type"].startswith("application/x-ndjson") and errors == (401, 404)
+    assert sorted(p.name for p in tmp_path.iterdir()) == [f"{out['exportId']}.ndjson"]
+
+
+def test_csv_export_with_cap(monkeypatch, tmp_path):
+    app, (out, resp, _, _) = _export(monkeypatch, tmp_path, {"customerId": 4, "format": "csv", "maxRows": 5})
+    table = list(csv.DictReader(io.StringIO(resp.text)))
+    assert len(table) == out["rows"] == 5 and out["truncated"] is True
+    first = app.state.data.transactions[int(table[0]["id"])]
+    assert table[0]["customerId"] == "4" and float(table[0]["amount"]) == first["amount"]
+    assert list(table[0]) == export_mod.COLUMNS
+
+
+def test_failed_export_leaves_no_file(monkeypatch, tmp_path):
+    from fastmcp.exceptions import ToolError
+    from mcpServer.bench.standin import Faults
+    monkeypatch.setattr(transactions, "EXPORT_PAGE_SIZE", 10)
+    with pytest.raises(ToolError):
+        _export(monkeypatch, tmp_path, {}, app=build_app(faults=Faults(error_rate=1.0, status=500)))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_parquet_export(monkeypatch, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    _, (out, resp, _, _) = _export(monkeypatch, tmp_path, {"format": "parquet"})
+    assert pq.read_table(io.BytesIO(resp.content)).num_rows == out["rows"] > 0
@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+import httpx
+from fastmcp import Client
+
+from mcpServer.bench.standin import build_app
+from mcpServer.models.wire import Customer, Transaction, CategorySpendItem
+from mcpServer.payments_api import client as client_mod, codec
+from mcpServer.payments_api.client import PaymentsApiClient
+from mcpServer.runtime import mcp
+from mcpServer.tools import customers, transactions, analytics  # noqa: F401  (registers tools)
+
+BASE = "http://standin/api/v1/service"
+HEADERS = {"x-mcp-api-key": "lovethisapp"}
+
+
+def test_wire_types_mirror_upstream_records_and_encode_like_dicts(monkeypatch):
+    row = {"id": 3, "customerId": 1, "amount": 12.5, "currency": "USD", "category": "Retail",
+           "status": "COMPLETED", "createdAt": "2025-03-24T01:06:36", "description": None, "extra": 1}
+    tx = Transaction.from_json(row)
+    assert not hasattr(tx, "__dict__") and tx.amount == 12.5
+    page = {"content": Transaction.many([row]), "totalElements": 1}
+    expected = {"content": [{k: v for k, v in row.items() if k != "extra"}], "totalElements": 1}
+    assert json.loads(codec.dumps(page)) == expected
+    monkeypatch.setattr(codec, "FAST", False)           # json module fallback gives the same document
+    assert json.loads(codec.dumps(page)) == expected
+    assert codec.loads(b'{"a":[1,2.5,null]}') == {"a": [1, 2.5, None]}
+    assert Customer.from_json({"id": 1}).email is None
+
+
+def test_tools_return_same_structured_and_text_content(monkeypatch):
+    app = build_app()
+    monkeypatch.setattr(client_mod, "_shared", PaymentsApiClient(base_url=BASE, transport=httpx.ASGITransport(app=app)))
+
+    async def _run():
+        async with Client(mcp) as c:
+            cust = await c.call_tool("get_customer", {"input": {"id": 4}, "headers": HEADERS})
+            page = await c.call_tool("search_transactions",
+                                     {"input": {"customerId": 4, "size": 25}, "headers": HEADERS})
+            cats = await c.call_tool("spend_by_category", {"input": {"customerId": 4, "from": "2020-01-01", "to": "2030-01-01"}, "headers": HEADERS})
+        await client_mod._shared.close()
+        return cust, page, cats
+
+    cust, page, cats = asyncio.run(_run())
+    for res in (cust, page, cats):
+        assert json.loads(res.content[0].text) == res.structured_content
+    assert cust.structured_content["id"] == 4
+    assert len(page.structured_content["content"]) == 25
+    items = cats.structured_content["items"]
+    assert items and set(items[0]) == set(CategorySpendItem.__dataclass_fields__)
+    assert all(isinstance(i["amount"], float) for i in items)
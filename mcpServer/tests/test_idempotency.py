@@ -0,0 +1,114 @@
+import asyncio
+import sqlite3
+import time
+
+import httpx
+import pytest
+
+from mcpServer.bench.standin import build_app
+from mcpServer.payments_api.client import PaymentsApiClient
+from mcpServer.payments_api.idempotency import IdempotencyStore, SqliteBackend
+from mcpServer.util.errors import IdempotencyConflict
+
+BASE = "http://standin/api/v1/service"
+CREATE = ("POST", "/transactions")
+TX = {"customerId": 4, "amount": 12.5, "currency": "USD", "category": "Dining", "description": None}
+
+def _api(app, store=None) -> PaymentsApiClient:
+    # coalescing off: the store alone must absorb the duplicates
+    return PaymentsApiClient(base_url=BASE, transport=httpx.ASGITransport(app=app), coalesce=False,
+                             idempotency=store or IdempotencyStore())
+
+def test_repeated_key_replays_and_mismatch_is_rejected():
+    app = build_app()
+
+    async def _run():
+        api = _api(app)
+        first = await api.create_transaction(dict(TX), "k-1")
+        again = await api.create_transaction(dict(TX), "k-1")
+        with pytest.raises(IdempotencyConflict):
+            await api.create_transaction({**TX, "amount": 99.0}, "k-1")
+        with pytest.raises(IdempotencyConflict):
+            await api.cancel_transaction(first["id"], "k-1")          # same key, other operation
+        other = await api.create_transaction(dict(TX), "k-2")
+        unkeyed = [await api.create_transaction(dict(TX), None) for _ in range(2)]
+        await api.close()
+        return api.idempotency.stats(), first, again, other, unkeyed
+    stats, first, again, other, unkeyed = asyncio.run(_run())
+    assert again == first and other["id"] != first["id"] and unkeyed[0]["id"] != unkeyed[1]["id"]
+    assert app.state.hits[CREATE] == 4
+    assert stats["replays"] == 1 and stats["conflicts"] == 2 and stats["writes"] == 2
+
+def test_concurrent_duplicates_wait_for_the_first_write():
+    app = build_app(latency_ms=30)
+    pending = next(t["id"] for t in app.state.data.transactions.values() if t["id"] not in app.state.data.payment_by_tx)
+
+    async def _run():
+        api = _api(app)
+        results = await asyncio.gather(*(
+            api.make_payment({"transactionId": pending, "method": "UPI"}, "pay-1") for _ in range(10)))
+        await api.close()
+        return api.idempotency.stats(), results
+    stats, results = asyncio.run(_run())
+    assert app.state.hits[("POST", "/payments")] == 1
+    assert all(r == results[0] for r in results) and stats["joined"] == 9
+
+def test_failed_write_is_not_recorded():
+    app = build_app()
+
+    async def _run():
+        api = _api(app)
+        with pytest.raises(httpx.HTTPStatusError):
+            await api.retry_payment(10_000, "retry-1")
+        with pytest.raises(httpx.HTTPStatusError):
+            await api.retry_payment(10_000, "retry-1")
+        await api.close()
+    asyncio.run(_run())
+    assert app.state.hits[("POST", "/payments/{id:int}/retry")] == 2
+
+def test_sqlite_backend_survives_restart(tmp_path):
+    app = build_app()
+    path = str(tmp_path / "idem.db")
+
+    async def _run():
+        first_store = IdempotencyStore(SqliteBackend(path))
+        api = _api(app, first_store)
+        first = await api.create_transaction(dict(TX), "persist-1")
+        first_store.backend.close()
+        api.idempotency = IdempotencyStore(SqliteBackend(path))      # "restarted" server, same file
+        again = await api.create_transaction(dict(TX), "persist-1")
+        await api.close()
+        return first, again
+    first, again = asyncio.run(_run())
+    assert again == first and app.state.hits[CREATE] == 1
+
+def test_sqlite_backend_runs_off_the_event_loop(tmp_path):
+    app = build_app()
+    path = str(tmp_path / "idem.db")
+    other = sqlite3.connect(path, isolation_level=None)
+
+    async def _run():
+        api = _api(app, IdempotencyStore(SqliteBackend(path, busy_timeout=0.3)))
+        first = await api.create_transaction(dict(TX), "locked-1")
+        other.execute("BEGIN IMMEDIATE")                              # another process holds the write lock
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+        t = asyncio.ensure_future(ticker())
+        t0 = time.perf_counter()
+        second = await api.create_transaction(dict(TX), "locked-2")   # its record times out, the write doesn't
+        elapsed = time.perf_counter() - t0
+        t.cancel()
+        other.execute("COMMIT")
+        again = await api.create_transaction(dict(TX), "locked-1")
+        await api.close()
+        return first, second, again, elapsed, ticks
+    first, second, again, elapsed, ticks = asyncio.run(_run())
+    other.close()
+    assert again == first and second["id"] != first["id"]
+    assert elapsed >= 0.25 and ticks >= 10                             # the loop kept running meanwhile
+    assert app.state.hits[CREATE] == 2
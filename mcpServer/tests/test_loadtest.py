@@ -0,0 +1,54 @@
+import asyncio
+
+from mcpServer.bench.loadtest import build_report, parse_mix, run_load, scrape
+from mcpServer.bench.standin import Faults, Latency, ServedStandIn, StandInData, build_app
+from mcpServer.payments_api import client as client_mod
+from mcpServer.payments_api.client import PaymentsApiClient
+from mcpServer.runtime import http_app
+from mcpServer.tools import customers, payments, transactions  # noqa: F401  (registers tools)
+
+
+def test_standin_is_seeded_from_data_sql():
+    data = StandInData.from_sql()
+    assert (len(data.customers), len(data.transactions), len(data.payments)) == (50, 300, 300)
+    assert data.customers[2] == {"id": 2, "fullName": "Michael Perry", "email": "mark37@gmail.com",
+                                 "phoneNumber": "606.147.0905"}
+    tx = data.transactions[100]
+    assert (tx["customerId"], tx["amount"], tx["status"], tx["createdAt"]) == (15, 808.5, "PENDING", "2025-02-17T17:29:48")
+    assert all(t["customerId"] in data.customers for t in data.transactions.values())
+    assert data.payments[data.payment_by_tx[3]]["method"] == "Wallet" and data._next_tx == 301
+
+
+def test_latency_and_error_distributions():
+    lat = Latency(10, 40, routes={("GET", "/slow"): Latency(100)})
+    samples = sorted(lat.sample(("GET", "/x")) for _ in range(20000))
+    assert 9 < samples[10000] < 11 and 33 < samples[19800] < 48
+    assert lat.sample(("GET", "/slow")) == 100 and Latency(5).sample(("GET", "/x")) == 5
+    faults = Faults(error_rate=1.0, statuses={503: 3, 500: 1}, seed=4)
+    picked = [faults.pick(("GET", "/x"))[0] for _ in range(4000)]
+    assert set(picked) == {500, 503} and 0.2 < picked.count(500) / len(picked) < 0.3
+
+
+def test_load_run_reports_percentiles_and_upstream_calls_per_tool(monkeypatch):
+    data = StandInData.from_sql()
+    upstream_app = build_app(data, latency_ms=Latency(1, 5))
+    with ServedStandIn(upstream_app) as upstream:
+        monkeypatch.setattr(client_mod, "_shared", PaymentsApiClient(base_url=upstream.base_url))
+        with ServedStandIn(http_app()) as server:
+            url = f"http://{server.host}:{server.port}"
+            marks = {}
+
+            def mark():
+                marks["before"], marks["hits"] = scrape(url), sum(upstream_app.state.hits.values())
+
+            mix = parse_mix("get_customer=1,list_customer_transactions=1,get_payment_by_transaction=1")
+            lat, err, secs = asyncio.run(run_load(url, data, mix, concurrency=3, duration=1.5, warmup=0.5,
+                                                  on_measure_start=mark))
+            after = scrape(url)
+            hits = sum(upstream_app.state.hits.values()) - marks["hits"]
+    report = build_report(lat, err, secs, marks["before"], after, hits, {"mix": mix})
+    assert report["errors"] == 0 and report["calls"] > 10 and set(report["tools"]) == set(mix)
+    listing = report["tools"]["list_customer_transactions"]
+    assert listing["p50Ms"] <= listing["p95Ms"] <= listing["p99Ms"] and listing["upstreamPerCall"] == 1.0
+    assert 0 < report["tools"]["get_customer"]["upstreamPerCall"] <= 1.0          # cache hits make it < 1
+    assert 0 < report["upstreamPerCall"] <= 1.0
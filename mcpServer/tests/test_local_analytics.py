@@ -0,0 +1,68 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+pytest.importorskip("numpy")
+
+from mcpServer.bench.standin import build_app
+from mcpServer.payments_api.client import PaymentsApiClient
+from mcpServer.payments_api.columnar import ColumnarStore
+
+BASE = "http://standin/api/v1/service"
+SUMMARY_KEYS = ("customerId", "baseCurrency", "totalAmount", "transactionCount", "averageTicket")
+
+def _pair(app):
+    transport = httpx.ASGITransport(app=app)
+    upstream = PaymentsApiClient(base_url=BASE, transport=transport, coalesce=False)
+    local = PaymentsApiClient(base_url=BASE, transport=transport, coalesce=False, local=ColumnarStore())
+    return upstream, local
+
+def _windows():
+    now = datetime.utcnow().replace(microsecond=0)
+    for days in (1, 30, 365, 500):
+        yield (now - timedelta(days=days)).isoformat(), (now + timedelta(days=1)).isoformat()
+    yield (now - timedelta(days=200)).strftime("%Y-%m-%dT00:00:00"), (now - timedelta(days=100)).strftime("%Y-%m-%dT23:59:59")
+
+def test_local_engine_matches_upstream():
+    app = build_app()
+
+    async def _run():
+        upstream, local = _pair(app)
+        for cid in (1, 17, 50):
+            for frm, to in _windows():
+                q = {"customerId": cid, "from": frm, "to": to, "fxBase": "USD"}
+                up, lo = await upstream.spend_summary(q), await local.spend_summary(q)
+                assert {k: up[k] for k in SUMMARY_KEYS} == {k: lo[k] for k in SUMMARY_KEYS}
+                key = lambda r: r["category"]
+                q = {"customerId": cid, "from": frm, "to": to}
+                assert sorted(await upstream.spend_by_category(q), key=key) == sorted(await local.spend_by_category(q), key=key)
+                for bucket in ("day", "week", "month"):
+                    for category in (None, "Dining", "Unknown"):
+                        q = {"customerId": cid, "from": frm, "to": to, "bucket": bucket, "category": category}
+                        q = {k: v for k, v in q.items() if v is not None}
+                        assert await upstream.time_series(q) == await local.time_series(q)
+        await upstream.close()
+    asyncio.run(_run())
+    # one listing walk per customer, every other query answered locally
+    assert app.state.hits[("GET", "/transactions")] == 3
+
+def test_local_engine_follows_mcp_writes():
+    app = build_app()
+    frm, to = "2000-01-01T00:00:00", (datetime.utcnow() + timedelta(days=1)).isoformat(timespec="seconds")
+    q = {"customerId": 5, "from": frm, "to": to, "fxBase": "USD"}
+
+    async def _run():
+        upstream, local = _pair(app)
+        before = await local.spend_summary(q)
+        tx = await local.create_transaction(
+            {"customerId": 5, "amount": 40.5, "currency": "USD", "category": "Dining"}, None)
+        assert (await local.spend_summary(q))["transactionCount"] == before["transactionCount"]   # still PENDING
+        await local.make_payment({"transactionId": tx["id"], "method": "UPI"}, None)
+        after = await local.spend_summary(q)
+        assert after["transactionCount"] == before["transactionCount"] + 1
+        assert after == {**(await upstream.spend_summary(q)), "periodFrom": after["periodFrom"], "periodTo": after["periodTo"]}
+        await upstream.close()
+    asyncio.run(_run())
+    assert app.state.hits[("GET", "/transactions")] == 1
@@ -0,0 +1,62 @@
+import io
+import json
+import logging
+import random
+
+from mcpServer.util import logs
+from mcpServer.util.logs import JsonFormatter, Sampler, parse_rates, redact, truncate
+
+
+def _record(name="mcpServer.tools.test", level=logging.INFO, msg="tool input", **fields):
+    rec = logging.LogRecord(name, level, __file__, 1, msg, None, None)
+    rec.fields = fields
+    return rec
+
+
+def test_redacts_emails_and_phones_but_not_dates_or_ids():
+    text = "mail terriromero@yahoo.com, call 8769415396 or 606.147.0905 or (159)485-6147x0 or +1 415-555-0100"
+    out = redact(text)
+    assert "yahoo" not in out and out.count("<phone>") == 4 and "<email>" in out
+    keep = "tx 12345 at 2025-03-24T01:06:36 amount 670.26 id 1736000000123"
+    assert redact(keep) == keep
+
+
+def test_formatter_masks_pii_keys_and_truncates_large_payloads():
+    fmt = JsonFormatter(max_field_chars=200, redact_pii=True)
+    rows = [{"id": i, "description": "x" * 50} for i in range(50)]
+    line = fmt.format(_record(customer={"id": 2, "email": "mark37@gmail.com", "phoneNumber": "555-0102",
+                                        "fullName": "Michael Perry"}, rows=rows, note="y" * 500))
+    out = json.loads(line)
+    assert out["logger"] == "mcpServer.tools.test" and out["msg"] == "tool input" and out["level"] == "INFO"
+    assert out["customer"] == {"id": 2, "email": "<redacted>", "phoneNumber": "<redacted>", "fullName": "Michael Perry"}
+    assert isinstance(out["rows"], str) and out["rows"].endswith("more chars>") and len(out["rows"]) < 240
+    assert out["note"] == truncate("y" * 500, 200)
+
+
+def test_sampler_uses_longest_prefix_and_keeps_warnings():
+    sampler = Sampler(parse_rates("mcpServer=0.5, mcpServer.tools=0, mcpServer.tools.customers=1"), rng=random.Random(7))
+    assert sampler.rate("mcpServer.tools.customers") == 1.0
+    assert sampler.rate("mcpServer.tools.transactions") == 0.0
+    assert sampler.rate("mcpServer.client") == 0.5 and sampler.rate("agent.tools") == 1.0
+    assert not sampler.filter(_record("mcpServer.tools.transactions"))
+    assert sampler.filter(_record("mcpServer.tools.transactions", level=logging.WARNING))
+    kept = sum(sampler.filter(_record("mcpServer.client")) for _ in range(1000))
+    assert 400 < kept < 600 and sampler.dropped == 1 + 1000 - kept
+
+
+def test_queue_writer_thread_end_to_end():
+    logs.shutdown_logging()
+    sink = io.StringIO()
+    try:
+        logs.setup_logging(stream=sink, level="DEBUG", sample_rates="mcpServer.tools.quiet=0")
+        log = logs.get_logger("mcpServer.tools.loud")
+        payload = {"email": "a@b.co", "items": [1, 2, 3]}
+        logs.log_event(log, logging.INFO, "tool result", tool="x", result=payload)
+        log.info("lazy %s", {"phone": "call 8769415396"})
+        logs.log_event(logs.get_logger("mcpServer.tools.quiet"), logging.INFO, "dropped")
+        assert logs.logging_stats()["droppedSampled"] == 1
+    finally:
+        logs.shutdown_logging()            # drains the queue
+    lines = [json.loads(l) for l in sink.getvalue().splitlines()]
+    assert [l["msg"] for l in lines] == ["tool result", "lazy {'phone': 'call <phone>'}"]
+    assert lines[0]["result"] == {"email": "<redacted>", "items": [1, 2, 3]} and lines[0]["tool"] == "x"
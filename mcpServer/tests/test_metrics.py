@@ -0,0 +1,50 @@
+import asyncio
+import httpx
+from fastmcp import Client
+
+from mcpServer.bench.standin import build_app
+from mcpServer.payments_api import client as client_mod
+from mcpServer.payments_api.client import PaymentsApiClient
+from mcpServer.runtime import http_app, mcp
+from mcpServer.tools import customers  # noqa: F401  (registers tools)
+from mcpServer.util.metrics import REGISTRY, Histogram
+
+BASE = "http://standin/api/v1/service"
+HEADERS = {"x-mcp-api-key": "lovethisapp"}
+
+def _value(text: str, prefix: str) -> float:
+    return float(next(line for line in text.splitlines() if line.startswith(prefix)).rsplit(" ", 1)[1])
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram("t_seconds", "test", ("tool",), buckets=(0.1, 1.0))
+    for v in (0.05, 0.1, 0.5, 3.0):
+        h.observe(v, "x")
+    lines = h.render()
+    assert 't_seconds_bucket{tool="x",le="0.1"} 2' in lines
+    assert 't_seconds_bucket{tool="x",le="1"} 3' in lines
+    assert 't_seconds_bucket{tool="x",le="+Inf"} 4' in lines
+    assert 't_seconds_count{tool="x"} 4' in lines
+
+def test_tool_calls_are_measured_and_served_on_metrics_route(monkeypatch):
+    monkeypatch.setattr(client_mod, "_shared",
+                        PaymentsApiClient(base_url=BASE, transport=httpx.ASGITransport(app=build_app(latency_ms=5))))
+    before = REGISTRY.render()
+    calls0 = _value(before, 'mcp_tool_calls_total{tool="get_customer"}') if 'tool="get_customer"' in before else 0
+
+    async def _run():
+        async with Client(mcp) as c:
+            await c.call_tool("get_customer", {"input": {"id": 3}, "headers": HEADERS})
+            await c.call_tool("get_customer", {"input": {"id": 4}, "headers": {}}, raise_on_error=False)
+        await client_mod._shared.close()
+        transport = httpx.ASGITransport(app=http_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://mcp") as http:
+            return await http.get("/metrics")
+    resp = asyncio.run(_run())
+    assert resp.status_code == 200 and resp.headers["content-type"].startswith("text/plain")
+    text = resp.text
+    assert _value(text, 'mcp_tool_calls_total{tool="get_customer"}') == calls0 + 2
+    assert _value(text, 'mcp_tool_errors_total{tool="get_customer",exception="PermissionError"}') >= 1
+    assert _value(text, 'mcp_tool_in_flight{tool="get_customer"}') == 0
+    assert _value(text, 'mcp_tool_upstream_seconds_sum{tool="get_customer"}') >= 0.005
+    assert 'mcp_upstream_request_seconds_count{method="GET",endpoint="/customers/{id}"}' in text
+    assert 'mcp_client_stat{component="singleflight",stat="upstreamCalls"}' in text
@@ -0,0 +1,75 @@
+import asyncio
+import httpx
+from fastmcp import Client
+
+from mcpServer.bench.standin import build_app
+from mcpServer.payments_api import client as client_mod
+from mcpServer.payments_api.client import PaymentsApiClient
+from mcpServer.runtime import mcp
+from mcpServer.tools import customers, transactions  # noqa: F401  (registers tools)
+
+BASE = "http://standin/api/v1/service"
+HEADERS = {"x-mcp-api-key": "lovethisapp"}
+SEARCH = ("GET", "/transactions")
+
+def _api(app) -> PaymentsApiClient:
+    return PaymentsApiClient(base_url=BASE, transport=httpx.ASGITransport(app=app))
+
+def test_paginate_walks_every_page_in_order():
+    app = build_app()
+    expected = sorted((t for t in app.state.data.transactions.values() if t["status"] == "COMPLETED"),
+                      key=lambda t: t["createdAt"], reverse=True)
+
+    async def _run():
+        api = _api(app)
+        rows = []
+        async for page in api.paginate("/transactions", {"status": "COMPLETED", "sort": "createdAt,desc"}, page_size=50):
+            rows.extend(page["content"])
+        await api.close()
+        return rows
+    rows = asyncio.run(_run())
+    assert [r["id"] for r in rows] == [t["id"] for t in expected]
+    assert app.state.hits[SEARCH] == -(-len(expected) // 50)
+
+def test_paginate_stops_at_cap_and_cancels_prefetch():
+    app = build_app(latency_ms=20)
+
+    async def _run():
+        api = _api(app)
+        pages = api.iter_transactions({}, max_rows=120)
+        got = []
+        async for page in pages:
+            got.append(len(page["content"]))
+        # caller walking away mid-listing must not leave the next page downloading
+        early = api.paginate("/transactions", {}, page_size=10)
+        first = await early.__anext__()
+        await asyncio.sleep(0.005)             # prefetch of page 2 is now waiting on the upstream
+        await early.aclose()
+        await asyncio.sleep(0.05)
+        await api.close()
+        return got, first
+    got, first = asyncio.run(_run())
+    assert got == [120] and len(first["content"]) == 10
+    assert app.state.hits[SEARCH] == 3          # cap page, then page 1 + its cancelled prefetch; no page 3
+
+def test_list_customer_transactions_all_tool(monkeypatch):
+    app = build_app()
+    owned = [t["id"] for t in app.state.data.transactions.values() if t["customerId"] == 7]
+    monkeypatch.setattr(client_mod, "_shared", _api(app))
+    progress = []
+
+    async def on_progress(progress_, total, message):
+        progress.append((progress_, total))
+
+    async def _run():
+        async with Client(mcp, progress_handler=on_progress) as c:
+            full = await c.call_tool("list_customer_transactions_all", {"input": {"id": 7}, "headers": HEADERS})
+            capped = await c.call_tool("list_customer_transactions_all",
+                                       {"input": {"id": 7, "maxRows": 5}, "headers": HEADERS})
+        await client_mod._shared.close()
+        return full.structured_content, capped.structured_content
+    full, capped = asyncio.run(_run())
+    assert sorted(r["id"] for r in full["items"]) == sorted(owned)
+    assert full["truncated"] is False and full["totalElements"] == len(owned)
+    assert capped["returned"] == 5 and capped["truncated"] is True and capped["pages"] == 1
+    assert progress[-1] == (5, 5)
@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastmcp import Client
+from fastmcp.exceptions import ToolError
+
+from mcpServer.bench.standin import build_app
+from mcpServer.payments_api import client as client_mod
+from mcpServer.payments_api.client import PaymentsApiClient
+from mcpServer.runtime import mcp
+from mcpServer.tools import customers, payments, transactions  # noqa: F401  (registers tools)
+from mcpServer.util.projection import check_fields, page_for_limit
+
+BASE = "http://standin/api/v1/service"
+HEADERS = {"x-mcp-api-key": "lovethisapp"}
+
+
+def _recording(app, queries):
+    """The stand-in, noting the query string of every upstream request."""
+    async def asgi(scope, receive, send):
+        if scope["type"] == "http":
+            queries.append(dict(httpx.QueryParams(scope["query_string"].decode())))
+        await app(scope, receive, send)
+    return asgi
+
+
+def _call(app, monkeypatch, tool, args):
+    monkeypatch.setattr(client_mod, "_shared",
+                        PaymentsApiClient(base_url=BASE, transport=httpx.ASGITransport(app=app)))
+
+    async def _run():
+        async with Client(mcp) as c:
+            res = await c.call_tool(tool, {"input": args, "headers": HEADERS})
+        await client_mod._shared.close()
+        return res.structured_content
+    return asyncio.run(_run())
+
+
+def test_page_for_limit_picks_the_smallest_covering_page():
+    assert page_for_limit(0, 10, None) == (0, 10, 0)
+    assert page_for_limit(0, 10, 3) == (0, 3, 0)
+    assert page_for_limit(2, 10, 3) == (5, 4, 0)          # rows 20-22 = page 5 of 4, from its first row
+    assert page_for_limit(1, 10, 4) == (2, 5, 0)
+    assert page_for_limit(1, 7, 3) == (1, 5, 2)           # rows 7-9 straddle pages of 3 and 4; rows 5-9 hold them
+    for page, size, limit in [(1, 7, 3), (3, 9, 5), (4, 10, 7), (0, 5, 5)]:
+        up_page, up_size, off = page_for_limit(page, size, limit)
+        assert up_page * up_size + off == page * size and off + limit <= up_size <= size
+
+
+def test_limit_fetches_only_that_many_rows_and_fields_trim_them(monkeypatch):
+    app = build_app()
+    queries = []
+    latest = sorted((t for t in app.state.data.transactions.values() if t["customerId"] == 15),
+                    key=lambda t: t["createdAt"], reverse=True)[:3]
+    body = _call(_recording(app, queries), monkeypatch, "search_transactions",
+                 {"customerId": 15, "limit": 3, "sort": "createdAt,desc", "fields": ["amount", "createdAt"]})
+    assert queries[-1]["size"] == "3" and queries[-1]["page"] == "0"
+    assert body["content"] == [{"id": t["id"], "amount": t["amount"], "createdAt": t["createdAt"]} for t in latest]
+    assert body["numberOfElements"] == 3 and body["size"] == 3 and body["limit"] == 3
+
+
+def test_limit_within_an_explicit_page(monkeypatch):
+    app = build_app()
+    queries = []
+    ordered = sorted(app.state.data.transactions.values(), key=lambda t: t["createdAt"], reverse=True)
+    body = _call(_recording(app, queries), monkeypatch, "search_transactions",
+                 {"page": 1, "size": 7, "limit": 3, "sort": "createdAt,desc"})
+    assert (queries[-1]["page"], queries[-1]["size"]) == ("1", "5")
+    assert [r["id"] for r in body["content"]] == [t["id"] for t in ordered[7:10]]
+    assert (body["number"], body["size"]) == (1, 7)
+
+
+def test_fields_on_getters_and_batches(monkeypatch):
+    app = build_app()
+    customer = _call(app, monkeypatch, "get_customer", {"id": 2, "fields": ["email"]})
+    assert customer == {"id": 2, "email": app.state.data.customers[2]["email"]}
+    batch = _call(app, monkeypatch, "get_payments_by_transactions", {"transactionIds": [3, 4], "fields": ["method"]})
+    assert batch["found"] == 2 and all(set(item) == {"id", "method"} for item in batch["items"])
+    full = _call(app, monkeypatch, "get_transaction", {"id": 5})
+    trimmed = _call(app, monkeypatch, "get_transaction", {"id": 5, "fields": ["status"]})
+    assert trimmed == {"id": 5, "status": full["status"]}
+    assert len(json.dumps(trimmed)) < len(json.dumps(full)) / 2
+
+
+def test_unknown_field_is_a_tool_error(monkeypatch):
+    with pytest.raises(ValueError, match="valid:"):
+        check_fields("customer", ["fullname"])
+    with pytest.raises(ToolError, match="unknown transaction field"):
+        _call(build_app(), monkeypatch, "get_transaction", {"id": 5, "fields": ["amout"]})
@@ -0,0 +1,171 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from mcpServer.bench.standin import Faults, ServedStandIn, build_app
+from mcpServer.payments_api import client as client_mod
+from mcpServer.payments_api.admission import AdmissionRejected
+from mcpServer.payments_api.client import PaymentsApiClient
+from mcpServer.payments_api.resilience import CircuitOpen, ResiliencePolicy
+
+BASE = "http://standin/api/v1/service"
+CUSTOMER = ("GET", "/customers/{id:int}")
+PAYMENT = ("GET", "/payments/{id:int}")
+SEARCH = ("GET", "/transactions")
+CREATE = ("POST", "/transactions")
+TX = {"customerId": 2, "amount": 5.0, "currency": "USD", "category": "Retail"}
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def _api(app, **policy) -> PaymentsApiClient:
+    policy = {"base_delay": 0.001, "max_delay": 0.002, **policy}
+    return PaymentsApiClient(base_url=BASE, transport=httpx.ASGITransport(app=app), coalesce=False,
+                             resilience=ResiliencePolicy(**policy))
+
+def test_gets_and_keyed_writes_retry_unkeyed_writes_do_not():
+    faults = Faults(fail_next=2)
+    app = build_app(faults=faults)
+
+    async def _run():
+        api = _api(app)
+        assert (await api.get_customer(3))["id"] == 3                 # two 503s, then success
+        faults.fail_next = 1
+        with pytest.raises(httpx.HTTPStatusError):
+            await api.create_transaction(dict(TX), None)                 # not safe to repeat
+        faults.fail_next = 1
+        assert (await api.create_transaction(dict(TX), "k-1"))["customerId"] == 2
+        faults.fail_next = 5
+        with pytest.raises(httpx.HTTPStatusError):
+            await api.get_customer(4)
+        await api.close()
+        return api.resilience.stats()
+    stats = asyncio.run(_run())
+    assert app.state.hits[CUSTOMER] == 3 + 3 and app.state.hits[CREATE] == 3
+    assert stats["retries"] == 2 + 1 + 2 and stats["retriesExhausted"] == 1
+
+def test_only_entity_gets_get_the_short_per_try_timeout(monkeypatch):
+    monkeypatch.setattr(client_mod, "REQUEST_TIMEOUT_SECS", 0.5)
+    monkeypatch.setattr(client_mod, "ENTITY_ATTEMPT_TIMEOUT_SECS", 0.1)
+    faults = Faults(slow_ms=300, routes={CUSTOMER, SEARCH})
+    app = build_app(faults=faults)
+
+    async def _run(base_url):                  # ASGITransport ignores timeouts: use a real socket
+        api = PaymentsApiClient(base_url=base_url, coalesce=False,
+                                resilience=ResiliencePolicy(base_delay=0.001, max_delay=0.002))
+        faults.slow_next = 1
+        assert (await api.get_customer(3))["id"] == 3                   # 300 ms > 0.1 s try: retried
+        faults.slow_next = 1
+        assert (await api.search_transactions({"customerId": 2}))["content"]   # slow, but within 0.5 s
+        faults.slow_ms, faults.slow_next = 800, 1
+        with pytest.raises(httpx.ReadTimeout):
+            await api.search_transactions({"customerId": 3})          # timed out reading: not sent again
+        await api.close()
+        return api.resilience.stats()
+    with ServedStandIn(app) as upstream:
+        stats = asyncio.run(_run(upstream.base_url))
+    assert app.state.hits[CUSTOMER] == 2 and app.state.hits[SEARCH] == 2
+    assert stats["retries"] == 1 and stats["retriesExhausted"] == 0
+
+def test_breaker_fails_fast_per_endpoint_and_recovers_after_probe():
+    faults = Faults(error_rate=1.0, routes={CUSTOMER})
+    app = build_app(faults=faults)
+    clock = FakeClock()
+
+    async def _run():
+        api = _api(app, attempts=1, breaker_threshold=3, breaker_reset_secs=10, clock=clock)
+        for i in range(3):
+            with pytest.raises(httpx.HTTPStatusError):
+                await api.get_customer(1 + i)
+        with pytest.raises(CircuitOpen):
+            await api.get_customer(9)                                   # no upstream hit
+        assert (await api.get_payment(1))["id"] == 1                    # other endpoints unaffected
+        assert api.resilience.stats()["openEndpoints"] == ["GET /customers/{id}"]
+        clock.now = 11
+        faults.error_rate = 0.0
+        assert (await api.get_customer(9))["id"] == 9                   # half-open probe succeeds
+        assert (await api.get_customer(10))["id"] == 10
+        await api.close()
+        return api.resilience.stats()
+    stats = asyncio.run(_run())
+    assert app.state.hits[CUSTOMER] == 5
+    assert stats["breakerOpened"] == 1 and stats["breakerRejected"] == 1 and stats["openEndpoints"] == []
+
+def test_cancelled_half_open_probe_frees_the_probe_slot():
+    faults = Faults(error_rate=1.0, slow_ms=500, routes={CUSTOMER})
+    app = build_app(faults=faults)
+    clock = FakeClock()
+
+    async def _run():
+        api = _api(app, attempts=1, breaker_threshold=1, breaker_reset_secs=10, clock=clock)
+        with pytest.raises(httpx.HTTPStatusError):
+            await api.get_customer(1)
+        clock.now = 11
+        faults.error_rate, faults.slow_next = 0.0, 1
+        probe = asyncio.ensure_future(api.get_customer(2))
+        await asyncio.sleep(0.05)
+        probe.cancel()                                                  # caller gave up mid-probe
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        assert api.resilience.stats()["openEndpoints"] == ["GET /customers/{id}"]
+        assert (await api.get_customer(3))["id"] == 3                   # the next caller gets to probe
+        await api.close()
+        return api.resilience.stats()
+    stats = asyncio.run(_run())
+    assert stats["breakerOpened"] == 1 and stats["breakerRejected"] == 0 and stats["openEndpoints"] == []
+
+def test_half_open_probe_refused_by_admission_frees_the_probe_slot():
+    faults = Faults(error_rate=1.0, routes={CUSTOMER})
+    app = build_app(faults=faults)
+    clock = FakeClock()
+
+    class _RejectOnce:
+        rejected = False
+
+        async def acquire(self, ep):
+            if not self.rejected:
+                self.rejected = True
+                raise AdmissionRejected("lane full")
+
+        def release(self, permit, latency, overloaded):
+            pass
+
+    async def _run():
+        api = _api(app, attempts=1, breaker_threshold=1, breaker_reset_secs=10, clock=clock)
+        with pytest.raises(httpx.HTTPStatusError):
+            await api.get_customer(1)
+        clock.now = 11
+        faults.error_rate = 0.0
+        api.admission = _RejectOnce()
+        with pytest.raises(AdmissionRejected):
+            await api.get_customer(2)                                   # the probe is turned away locally
+        assert (await api.get_customer(3))["id"] == 3                   # the next caller gets to probe
+        await api.close()
+        return api.resilience.stats()
+    stats = asyncio.run(_run())
+    assert stats["breakerOpened"] == 1 and stats["breakerRejected"] == 0 and stats["openEndpoints"] == []
+
+def test_hedged_get_beats_a_slow_primary():
+    faults = Faults(slow_ms=500, routes={PAYMENT})
+    app = build_app(faults=faults)
+
+    async def _run():
+        api = _api(app, hedge=True, hedge_min_samples=20, hedge_min_delay=0.02)
+        for i in range(20):
+            await api.get_payment(1 + i)
+        faults.slow_next = 1
+        t0 = time.perf_counter()
+        body = await api.get_payment(5)
+        elapsed = time.perf_counter() - t0
+        await api.close()
+        return body, elapsed, api.resilience.stats()
+    body, elapsed, stats = asyncio.run(_run())
+    assert body["id"] == 5 and elapsed < 0.3
+    assert stats["hedges"] == 1 and stats["hedgeWins"] == 1
+    assert app.state.hits[PAYMENT] == 22
@@ -0,0 +1,58 @@
+import asyncio
+import httpx
+
+from mcpServer.bench.standin import build_app
+from mcpServer.payments_api.cache import ResponseCache
+from mcpServer.payments_api.client import PaymentsApiClient
+
+BASE = "http://standin/api/v1/service"
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+def test_ttl_and_lru_eviction():
+    clock = FakeClock()
+    c = ResponseCache(ttl_secs=10, max_entries=2, max_bytes=1000, clock=clock)
+    c.put(("customer", 1), {"id": 1}, 10)
+    c.put(("customer", 2), {"id": 2}, 10)
+    assert c.get(("customer", 1)) == {"id": 1}        # 1 becomes most recent
+    c.put(("customer", 3), {"id": 3}, 10)             # evicts 2 (LRU)
+    assert c.get(("customer", 2)) is None
+    clock.now = 11
+    assert c.get(("customer", 1)) is None             # expired
+    s = c.stats()
+    assert (s["hits"], s["misses"], s["evictions"], s["expirations"]) == (1, 2, 1, 1)
+
+def test_byte_budget_and_stale_fill():
+    c = ResponseCache(ttl_secs=10, max_entries=100, max_bytes=25)
+    c.put("a", 1, 10)
+    c.put("b", 2, 10)
+    c.put("c", 3, 10)                                 # 30 bytes > 25 -> "a" goes
+    assert c.peek("a") is None and c.stats()["bytes"] == 20
+    epoch = c.epoch
+    c.invalidate("b")
+    c.put("b", 2, 10, epoch=epoch)                    # fill raced with a write: dropped
+    assert c.peek("b") is None
+
+def test_writes_invalidate_related_entries():
+    async def _run():
+        app = build_app()
+        api = PaymentsApiClient(base_url=BASE, transport=httpx.ASGITransport(app=app), cache=ResponseCache())
+        pay = await api.get_payment(1)
+        tx_id = pay["transactionId"]
+        tx = await api.get_transaction(tx_id)
+        await api.get_payment_by_tx(tx_id)
+        await api.get_customer(tx["customerId"])
+        await api.get_payment(1)
+        assert app.state.hits[("GET", "/payments/{id:int}")] == 1
+
+        await api.fail_payment(1, "R01", None)
+        for key in (("payment", 1), ("transaction", tx_id), ("payment_by_tx", tx_id), ("customer", tx["customerId"])):
+            assert api.cache.peek(key) is None
+        assert (await api.get_payment(1))["status"] == "FAILED"
+        assert app.state.hits[("GET", "/payments/{id:int}")] == 2
+        await api.close()
+    asyncio.run(_run())
@@ -0,0 +1,94 @@
+import asyncio
+
+import httpx
+import pytest
+
+from mcpServer.bench.standin import build_app
+from mcpServer.payments_api.cache import ResponseCache
+from mcpServer.payments_api.client import PaymentsApiClient
+from mcpServer.payments_api.revalidate import ValidatorStore
+
+BASE = "http://standin/api/v1/service"
+
+
+def _client(app, cache=None) -> PaymentsApiClient:
+    return PaymentsApiClient(base_url=BASE, transport=httpx.ASGITransport(app=app), cache=cache,
+                             revalidator=ValidatorStore())
+
+
+@pytest.mark.parametrize("validators", ["etag", "last-modified"])
+def test_304_serves_stored_body_until_entity_changes(validators):
+    app = build_app(validators=validators)
+    data = app.state.data
+    pay_id = next(iter(data.payments))
+
+    async def _run():
+        api = _client(app)
+        first = await api.get_payment(pay_id)
+        again = await api.get_payment(pay_id)
+        assert again == first and app.state.not_modified[("GET", "/payments/{id:int}")] == 1
+        data.payments[pay_id]["status"] = "FAILED"          # changed behind our back: never served stale
+        changed = await api.get_payment(pay_id)
+        assert changed["status"] == "FAILED" and changed != first
+        assert (await api.get_payment(pay_id))["status"] == "FAILED"
+        stats = api.stats()["revalidation"]
+        assert stats["conditionalRequests"] == 3 and stats["notModified"] == 2 and stats["changed"] == 1
+        assert stats["bytesSaved"] > 0
+        await api.close()
+    asyncio.run(_run())
+
+
+def test_without_validators_same_bytes_skip_decode_and_changes_show():
+    app = build_app()
+    data = app.state.data
+
+    async def _run():
+        api = _client(app)
+        first = await api.get_customer(4)
+        again = await api.get_customer(4)
+        again["fullName"] = "mutated by caller"                 # callers get copies of the stored body
+        assert (await api.get_customer(4)) == first
+        data.customers[4]["fullName"] = "Renamed"
+        assert (await api.get_customer(4))["fullName"] == "Renamed"
+        stats = api.stats()["revalidation"]
+        assert stats["conditionalRequests"] == 0 and stats["unchangedBody"] == 2 and stats["changed"] == 1
+        assert app.state.hits[("GET", "/customers/{id:int}")] == 4
+        await api.close()
+    asyncio.run(_run())
+
+
+def test_every_read_revalidates_and_404_forgets():
+    app = build_app(validators="etag")
+    data = app.state.data
+    tx_id = next(iter(data.transactions))
+
+    async def _run():
+        api = _client(app, cache=ResponseCache(ttl_secs=60))
+        await api.get_transaction(tx_id)
+        await api.get_transaction(tx_id)
+        assert app.state.hits[("GET", "/transactions/{id:int}")] == 2
+        assert app.state.not_modified[("GET", "/transactions/{id:int}")] == 1
+        del data.transactions[tx_id]
+        with pytest.raises(httpx.HTTPStatusError):
+            await api.get_transaction(tx_id)
+        assert api.revalidator.get(("transaction", tx_id)) is None
+        await api.close()
+    asyncio.run(_run())
+
+
+def test_status_change_within_the_ttl_is_seen():
+    app = build_app(validators="etag")
+    data = app.state.data
+    pay_id = next(iter(data.payments))
+
+    async def _run():
+        api = _client(app, cache=ResponseCache(ttl_secs=60))
+        tx_id = (await api.get_payment(pay_id))["transactionId"]
+        await api.get_payment_by_tx(tx_id)
+        data.payments[pay_id]["status"] = "FAILED"              # changed upstream, cache entries still fresh
+        assert (await api.get_payment(pay_id))["status"] == "FAILED"
+        assert (await api.get_payment_by_tx(tx_id))["status"] == "FAILED"
+        assert len(api.cache) == 0 and api.cache.stats()["hits"] == 0      # validators live in the store only
+        assert api._peek_payment_tx(pay_id) == tx_id                          # write paths still follow links
+        await api.close()
+    asyncio.run(_run())
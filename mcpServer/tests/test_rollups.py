@@ -0,0 +1,74 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from mcpServer.bench.standin import build_app
+from mcpServer.payments_api.client import PaymentsApiClient
+from mcpServer.payments_api.columnar import ColumnarStore
+
+BASE = "http://standin/api/v1/service"
+
+def _rows(n=3000, seed=3):
+    rnd = random.Random(seed)
+    start = datetime(2021, 1, 1)
+    return [{
+        "id": i, "customerId": 1, "amount": round(rnd.uniform(1, 500), 2),
+        "category": rnd.choice(["A", "B", "C"]), "currency": "USD",
+        "status": rnd.choice(["COMPLETED", "COMPLETED", "PENDING", "FAILED"]),
+        "createdAt": (start + timedelta(seconds=rnd.randint(0, 4 * 365 * 86400))).isoformat(),
+    } for i in range(1, n + 1)]
+
+def _windows(rnd):
+    for _ in range(200):
+        a = datetime(2020, 12, 1) + timedelta(seconds=rnd.randint(0, 4 * 365 * 86400))
+        b = a + timedelta(seconds=rnd.choice([0, 3600, 86399, 86400, 90 * 86400, 5 * 365 * 86400]) + rnd.randint(0, 7200))
+        yield {"customerId": 1, "from": a.isoformat(), "to": b.isoformat()}
+    yield {"customerId": 1, "from": "2022-03-01T00:00:00", "to": "2022-03-31T23:59:59"}
+
+def test_rollup_windows_match_raw_scan_through_writes():
+    rows = _rows()
+    rolled, raw = ColumnarStore(rollups=True), ColumnarStore(rollups=False)
+    rolled.load(1, rows)
+    raw.load(1, rows)
+    rnd = random.Random(11)
+    key = lambda r: r["category"]
+    for i, q in enumerate(_windows(rnd)):
+        assert rolled.spend_summary(q) == raw.spend_summary(q)
+        assert sorted(rolled.spend_by_category(q), key=key) == sorted(raw.spend_by_category(q), key=key)
+        # interleave the writes the MCP server applies: new rows, cancels, payment outcomes
+        tx = dict(rnd.choice(rows), status=rnd.choice(["COMPLETED", "FAILED"]))
+        if i % 3 == 0:
+            tx.update(id=10_000 + i, createdAt=(datetime(2025, 1, 1) + timedelta(hours=i)).isoformat(),
+                      category=rnd.choice(["A", "D"]))
+        paid = rnd.choice(rows)["id"]
+        for store in (rolled, raw):
+            store.upsert(tx)
+            store.set_status(paid, "COMPLETED")
+    assert rolled.stats()["queries"] == raw.stats()["queries"]
+
+def test_reconcile_reports_drift_from_outside_writes():
+    app = build_app()
+    to = (datetime.utcnow() + timedelta(days=1)).isoformat(timespec="seconds")
+    q = {"customerId": 3, "from": "2000-01-01T00:00:00", "to": to, "fxBase": "USD"}
+
+    async def _run():
+        api = PaymentsApiClient(base_url=BASE, transport=httpx.ASGITransport(app=app), local=ColumnarStore())
+        before = await api.spend_summary(q)
+        await api.reconcile_local()
+        assert api.local.stats()["drifted"] == 0
+        # a write that bypassed this server
+        pending = next(t for t in app.state.data.transactions.values()
+                       if t["customerId"] == 3 and t["status"] == "PENDING")
+        pending["status"] = "COMPLETED"
+        await api.reconcile_local()
+        after = await api.spend_summary(q)
+        await api.close()
+        return api.local.stats(), before, after
+    stats, before, after = asyncio.run(_run())
+    assert stats["reconciled"] == 2 and stats["drifted"] == 1
+    assert after["transactionCount"] == before["transactionCount"] + 1
@@ -0,0 +1,50 @@
+import asyncio
+import httpx
+
+from mcpServer.bench.standin import build_app
+from mcpServer.payments_api.client import PaymentsApiClient
+
+BASE = "http://standin/api/v1/service"
+
+def _client(app):
+    # no caches: every read that isn't coalesced goes upstream
+    return PaymentsApiClient(base_url=BASE, transport=httpx.ASGITransport(app=app))
+
+def test_1000_concurrent_identical_reads_hit_upstream_once():
+    async def _run():
+        app = build_app(latency_ms=50)
+        api = _client(app)
+        results = await asyncio.gather(*(api.get_customer(7) for _ in range(1000)))
+        assert app.state.hits[("GET", "/customers/{id:int}")] == 1
+        assert all(r == results[0] for r in results)
+        assert len({id(r) for r in results}) == 1000        # each caller owns its body
+        assert api.stats()["singleflight"] == {"upstreamCalls": 1, "saved": 999, "inFlight": 0}
+        await api.close()
+    asyncio.run(_run())
+
+def test_param_order_is_normalized_and_errors_are_shared():
+    async def _run():
+        app = build_app(latency_ms=20)
+        api = _client(app)
+        await asyncio.gather(
+            api.search_transactions({"customerId": 1, "page": 0, "size": 5}),
+            api.search_transactions({"size": 5, "page": 0, "customerId": 1}),
+        )
+        assert app.state.hits[("GET", "/transactions")] == 1
+        errors = await asyncio.gather(*(api.get_customer(999999) for _ in range(10)), return_exceptions=True)
+        assert all(isinstance(e, httpx.HTTPStatusError) for e in errors)
+        assert app.state.hits[("GET", "/customers/{id:int}")] == 1
+        await api.close()
+    asyncio.run(_run())
+
+def test_keyed_writes_coalesce_but_unkeyed_writes_do_not():
+    async def _run():
+        app = build_app(latency_ms=20)
+        api = _client(app)
+        payload = {"customerId": 1, "amount": 10, "currency": "USD", "category": "Retail"}
+        keyed = await asyncio.gather(*(api.create_transaction(payload, "idem-1") for _ in range(5)))
+        assert len({t["id"] for t in keyed}) == 1
+        await asyncio.gather(*(api.create_transaction(payload, None) for _ in range(2)))
+        assert app.state.hits[("POST", "/transactions")] == 3
+        await api.close()
+    asyncio.run(_run())
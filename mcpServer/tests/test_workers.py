@@ -0,0 +1,160 @@
+import asyncio
+import json
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+import pytest
+from fastmcp import Client
+
+from mcpServer.bench.standin import ServedStandIn, _free_port, build_app
+from mcpServer.payments_api.cache import ResponseCache
+from mcpServer.payments_api.shared_cache import SharedCacheTier
+from mcpServer.util.metrics import Counter, Gauge, Histogram, Registry, merge, snapshot
+from mcpServer.workers import Supervisor, resolve_workers
+
+HEADERS = {"x-mcp-api-key": "lovethisapp"}
+
+
+def _worker_registry(calls: int, latency: float, entries: int) -> Registry:
+    reg = Registry()
+    reg.add(Counter("t_calls_total", "calls", ("tool",))).inc("get_customer", by=calls)
+    reg.add(Histogram("t_seconds", "latency", ("tool",), buckets=(0.1, 1.0))).observe(latency, "get_customer")
+    g = reg.add(Gauge("t_cache_entries", "entries"))
+    g.per_worker = True
+    g.set(value=entries)
+    return reg
+
+
+def test_merge_sums_counters_and_histograms_and_labels_per_worker_gauges():
+    snaps = json.loads(json.dumps({"0": snapshot(_worker_registry(3, 0.05, 10)),
+                                   "1": snapshot(_worker_registry(4, 0.5, 20))}))      # as read back from disk
+    text = merge(snaps).render()
+    assert 't_calls_total{tool="get_customer"} 7' in text
+    assert 't_seconds_bucket{tool="get_customer",le="0.1"} 1' in text
+    assert 't_seconds_count{tool="get_customer"} 2' in text
+    assert 't_cache_entries{worker="0"} 10' in text and 't_cache_entries{worker="1"} 20' in text
+    assert "mcp_workers_reporting 2" in text
+
+
+def test_resolve_workers():
+    assert resolve_workers("3") == 3
+    assert resolve_workers("auto") == resolve_workers("0") >= 1
+
+
+def test_supervisor_backs_off_and_gives_up_on_a_crash_looping_worker():
+    starts = []
+
+    class _CrashingProcess:
+        exitcode = 1
+
+        def __init__(self, **_):
+            self.pid = 1000 + len(starts)
+
+        def start(self):
+            starts.append(time.monotonic())
+
+        def is_alive(self):
+            return False
+
+    class _Ctx:
+        Event = threading.Event
+        Process = _CrashingProcess
+
+    sup = Supervisor(1, "127.0.0.1", 0, backoff=0.05, max_quick_exits=3)
+    sup._ctx = _Ctx()
+    sup._procs[0] = sup._start(0, wait=False)
+    deadline = time.monotonic() + 5
+    while not sup._stop and time.monotonic() < deadline:
+        sup._replace_dead()
+        time.sleep(0.005)
+    assert sup.failed and len(starts) == 3                               # started, respawned twice, gave up
+    assert starts[1] - starts[0] >= 0.05 and starts[2] - starts[1] >= 0.1
+
+
+def test_shared_tier_serves_other_workers_and_sees_their_invalidations(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    a = ResponseCache(ttl_secs=60, shared=SharedCacheTier(path), namespace="entity")
+    b = ResponseCache(ttl_secs=60, shared=SharedCacheTier(path), namespace="entity")
+    a.put(("customer", 7), {"id": 7, "fullName": "Ann"}, 30, tags=[("customer", 7)])
+    a.shared.flush()
+    assert b.get(("customer", 7)) == {"id": 7, "fullName": "Ann"}
+    assert b.stats()["sharedHits"] == 1 and b.get(("customer", 7)) is not None      # now in b's memory tier
+    assert ("customer", 7) in b._tags[("customer", 7)]                              # with its tag
+    assert len(b) == 1 and b.stats()["sharedEntries"] == 1
+    assert b.tagged(("customer", 7)) == [("customer", 7)]
+    a.invalidate(("customer", 7))
+    a.shared.flush()
+    c = ResponseCache(ttl_secs=60, shared=SharedCacheTier(path), namespace="entity")
+    assert c.get(("customer", 7)) is None
+    assert ResponseCache(shared=SharedCacheTier(path), namespace="analytics").get(("customer", 7)) is None
+
+
+def test_shared_tier_writes_do_not_wait_for_a_locked_file(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    tier = SharedCacheTier(path)
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")                                    # another worker holds the write lock
+    t0 = time.perf_counter()
+    tier.put("entity", ("customer", 7), {"id": 7}, 30, ttl=60)
+    tier.delete("entity", [("customer", 8)])
+    assert time.perf_counter() - t0 < 0.1
+    assert tier.get("entity", ("customer", 7)) is None                  # queued: a miss, not a wait
+    other.execute("COMMIT")
+    tier.flush()
+    assert tier.get("entity", ("customer", 7))[0] == {"id": 7}
+    tier.close()
+    other.close()
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGHUP"), reason="POSIX signals")
+def test_supervisor_serves_through_a_rolling_reload_and_drains(tmp_path):
+    log_path = tmp_path / "server.log"
+    with ServedStandIn(build_app()) as upstream, open(log_path, "w") as log:
+        port = _free_port("127.0.0.1")
+        env = {**os.environ, "MCP_WORKERS": "2", "MCP_HOST": "127.0.0.1", "MCP_PORT": str(port),
+               "MY_PAYMENTS_BASE_URL": upstream.base_url, "WORKER_METRICS_DIR": str(tmp_path / "metrics"),
+               "WORKER_DRAIN_SECS": "2", "LOG_LEVEL": "INFO"}
+        proc = subprocess.Popen([sys.executable, "-m", "mcpServer.app"], env=env,
+                                stdout=subprocess.DEVNULL, stderr=log)
+        url = f"http://127.0.0.1:{port}"
+
+        async def _call(ids) -> list:
+            out = []
+            for i in ids:
+                async with Client(f"{url}/mcp") as c:
+                    res = await c.call_tool("get_customer", {"input": {"id": i}, "headers": HEADERS})
+                    out.append(res.structured_content["id"])
+            return out
+
+        def _wait(done, what):
+            deadline = time.monotonic() + 60
+            while not done():
+                assert proc.poll() is None and time.monotonic() < deadline, f"{what}: {log_path.read_text()}"
+                time.sleep(0.1)
+
+        def _workers_reporting():
+            try:
+                return "mcp_workers_reporting 2" in httpx.get(f"{url}/metrics").text
+            except httpx.TransportError:
+                return False
+
+        try:
+            _wait(_workers_reporting, "workers did not start")
+            assert asyncio.run(_call([1, 2, 3, 4, 5, 1])) == [1, 2, 3, 4, 5, 1]
+            proc.send_signal(signal.SIGHUP)
+            while "reload complete" not in log_path.read_text():
+                assert asyncio.run(_call([2, 3])) == [2, 3]                # served throughout the reload
+                time.sleep(0.1)
+            text = httpx.get(f"{url}/metrics").text
+            assert 'mcp_tool_calls_total{tool="get_customer"}' in text and "mcp_workers_reporting 2" in text
+        finally:
+            proc.send_signal(signal.SIGTERM)
+            proc.wait(timeout=30)
+        assert proc.returncode == 0, log_path.read_text()
+        assert log_path.read_text().count("started (pid") == 4
@@ -1,14 +1,23 @@
+import logging
+
 from mcpServer.runtime import mcp
 
 
-from mcpServer.payments_api.client import PaymentsApiClient
-from mcpServer.models.dto import SpendSummaryIn, SpendByCategoryIn, TimeSeriesIn, SpendByCategoryOut
+from mcpServer.payments_api.client import get_payments_api
+from mcpServer.models.wire import CategorySpendItem
+from mcpServer.models.dto import SpendSummaryIn, SpendByCategoryIn, TimeSeriesIn, SpendByCategoryOut, CohortAnalyticsIn, CohortOut
 from mcpServer.util.auth import assert_mcp_auth
+from mcpServer.util.cohort import cohort_analytics
+from mcpServer.util.columnar import columnar
+from mcpServer.util.logs import get_logger, log_event
+from mcpServer.util.results import tool_result
 from mcpServer.config import DEFAULT_FX_BASE
 from datetime import datetime
 
 ISO_FMT = "%Y-%m-%dT%H:%M:%S"
 
+log = get_logger("mcpServer.tools.analytics")
+
 def _normalize_iso(dt: str, is_end: bool = False) -> str:
     if dt is None:
         return None
@@ -39,59 +48,47 @@ def _normalize_iso(dt: str, is_end: bool = False) -> str:
 @mcp.tool(name="spend_summary", description="Summarize completed spend for a customer in a time window.")
 async def spend_summary(input: SpendSummaryIn, headers: dict) -> dict:
     assert_mcp_auth(headers)
-    api = PaymentsApiClient()
+    api = get_payments_api()
     params = {
         "customerId": input.customerId,
         "from": _normalize_iso(input.from_),
         "to": _normalize_iso(input.to),
         "fxBase": input.fxBase or DEFAULT_FX_BASE,
     }
-    try:
-        return await api.spend_summary(params)
-    finally:
-        await api.close()
+    return tool_result(await api.spend_summary(params))
 
 @mcp.tool(name="spend_by_category", 
-          description="Category-wise spend totals for a customer.", 
+          description="Category-wise spend totals for a customer. format=\"columnar\" returns `items` as "
+                      "{columns, rows, dictionaries}.",
           output_schema=SpendByCategoryOut.model_json_schema())
 async def spend_by_category(input: SpendByCategoryIn, headers: dict) -> dict:
     assert_mcp_auth(headers)
-    print("Request received with parameters: ", input)
-    api = PaymentsApiClient()
+    log_event(log, logging.INFO, "tool input", tool="spend_by_category", input=input)
+    api = get_payments_api()
     params = {"customerId": input.customerId, "from": _normalize_iso(input.from_), "to": _normalize_iso(input.to)}
-    try:
-        raw = await api.spend_by_category(params)  # upstream may return a list
-        print(raw)
-        # Normalize to a dict for FastMCP
-        if isinstance(raw, dict):
-            items = raw.get("items", [])
-        else:
-            items = raw or []
+    raw = await api.spend_by_category(params)  # upstream may return a list
+    log_event(log, logging.DEBUG, "upstream result", tool="spend_by_category", raw=raw)
+    # Normalize to a dict for FastMCP
+    if isinstance(raw, dict):
+        items = raw.get("items", [])
+    else:
+        items = raw or []
 
-        normalized = {
-            "customerId": input.customerId,
-            "from_": params["from"],
-            "to": params["to"],
-            "baseCurrency": DEFAULT_FX_BASE,
-            "items": [
-            {
-                "category": r.get("category", ""),
-                "amount": float(r.get("totalAmount", 0) or 0),
-                "transactionCount": r.get("transactionCount", 0),
-                "currency": r.get("currency", DEFAULT_FX_BASE),
-            }
-            for r in items
-            ],
-        }
-        print("Normalized spend by category:", normalized)
-        return normalized
-    finally:
-        await api.close()
+    normalized = {
+        "customerId": input.customerId,
+        "from_": params["from"],
+        "to": params["to"],
+        "baseCurrency": DEFAULT_FX_BASE,
+        "items": [CategorySpendItem.from_upstream(r, DEFAULT_FX_BASE) for r in items],
+    }
+    log_event(log, logging.DEBUG, "tool result", tool="spend_by_category", result=normalized)
+    return tool_result(columnar(normalized, "items", input.format), typed=True)
 
-@mcp.tool(name="time_series", description="Time-series (day|week|month) spend for a customer; optional category filter.")
+@mcp.tool(name="time_series", description="Time-series (day|week|month) spend for a customer; optional category filter. "
+                                          "format=\"columnar\" returns `series` as {columns, rows}.")
 async def time_series(input: TimeSeriesIn, headers: dict) -> dict:
     assert_mcp_auth(headers)
-    api = PaymentsApiClient()
+    api = get_payments_api()
     params = {
         "customerId": input.customerId,
         "bucket": input.bucket,
@@ -99,7 +96,15 @@ async def time_series(input: TimeSeriesIn, headers: dict) -> dict:
         "to": _normalize_iso(input.to),
         "category": input.category,
     }
-    try:
-        return await api.time_series(params)
-    finally:
-        await api.close()
+    return tool_result(columnar(await api.time_series(params), "series", input.format))
+
+@mcp.tool(name="cohort_analytics",
+          description="Spend across many customers in one window: per-customer and category tables, totals and top-N. "
+                      "Pass customerIds, or omit them to cover every customer (optionally filtered by category/currency).",
+          output_schema=CohortOut.model_json_schema(by_alias=True))
+async def cohort_analytics_tool(input: CohortAnalyticsIn, headers: dict) -> dict:
+    assert_mcp_auth(headers)
+    api = get_payments_api()
+    params = {"from": _normalize_iso(input.from_), "to": _normalize_iso(input.to, is_end=True)}
+    return tool_result(await cohort_analytics(api, input.customerIds, params, category=input.category,
+                                              currency=input.currency, top_n=input.topN))
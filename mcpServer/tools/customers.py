@@ -1,48 +1,85 @@
+import logging
+
+from fastmcp import Context
+
 from mcpServer.runtime import mcp
 
-from mcpServer.payments_api.client import PaymentsApiClient
-from mcpServer.models.dto import CreateCustomerIn, GetCustomerIn, ListCustomerTxIn
+from mcpServer.payments_api.client import get_payments_api
+from mcpServer.models.dto import (
+    CreateCustomerIn, GetCustomerIn, GetCustomersBatchIn, ListCustomerTxIn, ListCustomerTxAllIn,
+    BatchOut, PagedRowsOut,
+)
 from mcpServer.util.auth import assert_mcp_auth
+from mcpServer.util.batch import fan_out
+from mcpServer.util.paginate import collect_pages
+from mcpServer.util.logs import get_logger, log_event
+from mcpServer.util.projection import check_fields, limit_page, page_for_limit, project, project_items, shown_size
+from mcpServer.util.results import tool_result
+
+log = get_logger("mcpServer.tools.customers")
 
 @mcp.tool(name="create_customer", description="Create a customer if it does not exist by email; returns existing if already present.")
 async def create_customer(input: CreateCustomerIn, headers: dict) -> dict:
-    print("create customer input: ", input)
+    log_event(log, logging.INFO, "tool input", tool="create_customer", input=input)
     assert_mcp_auth(headers)
-    api = PaymentsApiClient()
-    try:
-        result = await api.create_customer(input.model_dump(by_alias=True, exclude_none=True))
-        print("Created customer: ", result)
-        return result
-    finally:
-        await api.close()
+    api = get_payments_api()
+    result = await api.create_customer(input.model_dump(by_alias=True, exclude_none=True))
+    log_event(log, logging.DEBUG, "tool result", tool="create_customer", result=result)
+    return result
 
 @mcp.tool(name="get_customer", description="Fetch a customer by id.")
 async def get_customer(input: GetCustomerIn, headers: dict) -> dict:
-    print("Request received with parameters: ", input)
+    log_event(log, logging.INFO, "tool input", tool="get_customer", input=input)
+    assert_mcp_auth(headers)
+    fields = check_fields("customer", input.fields)
+    api = get_payments_api()
+    result = project(await api.get_customer(input.id), fields)
+    log_event(log, logging.DEBUG, "tool result", tool="get_customer", result=result)
+    return tool_result(result)
+
+@mcp.tool(name="get_customers_batch",
+          description="Fetch many customers by id in one call; returns found items plus per-id errors.",
+          output_schema=BatchOut.model_json_schema())
+async def get_customers_batch(input: GetCustomersBatchIn, headers: dict) -> dict:
     assert_mcp_auth(headers)
-    api = PaymentsApiClient()
-    try:
-        result = await api.get_customer(input.id)
-        print("Fetched customer details: ", result)
-        return result
-    finally:
-        await api.close()
-
-@mcp.tool(name="list_customer_transactions", description="List transactions for a customer with optional filters/pagination.")
+    api = get_payments_api()
+    return tool_result(await fan_out(input.ids, api.get_customer))
+
+@mcp.tool(name="list_customer_transactions",
+          description="List transactions for a customer with optional filters/pagination. Optional `limit` "
+                      "(first N rows) and `fields` (only these transaction keys per row).")
 async def list_customer_transactions(input: ListCustomerTxIn, headers: dict) -> dict:
     assert_mcp_auth(headers)
-    api = PaymentsApiClient()
+    fields = check_fields("transaction", input.fields)
+    size = shown_size(input)
+    page, upstream_size, offset = page_for_limit(input.page, size, input.limit)
+    api = get_payments_api()
+    params = {
+        "status": input.status or None,
+        "category": input.category or None,
+        "currency": input.currency or None,
+        "from": input.from_,
+        "to": input.to,
+        "page": page,
+        "size": upstream_size,
+        "sort": input.sort,
+    }
+    body = await api.list_customer_transactions(input.id, params)
+    return tool_result(project_items(limit_page(body, input.page, size, offset, input.limit), "content", fields))
+
+@mcp.tool(name="list_customer_transactions_all",
+          description="List every transaction of a customer matching the filters (all pages, server-side) up to maxRows.",
+          output_schema=PagedRowsOut.model_json_schema())
+async def list_customer_transactions_all(input: ListCustomerTxAllIn, headers: dict, ctx: Context) -> dict:
+    assert_mcp_auth(headers)
+    api = get_payments_api()
     params = {
         "status": input.status or None,
         "category": input.category or None,
         "currency": input.currency or None,
         "from": input.from_,
         "to": input.to,
-        "page": input.page,
-        "size": input.size,
         "sort": input.sort,
     }
-    try:
-        return await api.list_customer_transactions(input.id, params)
-    finally:
-        await api.close()
\ No newline at end of file
+    pages = api.iter_customer_transactions(input.id, params, max_rows=input.maxRows)
+    return tool_result(await collect_pages(pages, input.maxRows, ctx))
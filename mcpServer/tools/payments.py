@@ -1,52 +1,51 @@
 from mcpServer.runtime import mcp
 
-from mcpServer.payments_api.client import PaymentsApiClient
+from mcpServer.payments_api.client import get_payments_api
 from mcpServer.models.dto import (
-    MakePaymentIn, GetPaymentIn, GetPaymentByTxIn, RetryPaymentIn, FailPaymentIn
+    MakePaymentIn, GetPaymentIn, GetPaymentByTxIn, GetPaymentsByTransactionsIn, RetryPaymentIn, FailPaymentIn, BatchOut
 )
 from ..util.auth import assert_mcp_auth
+from ..util.batch import fan_out
+from ..util.projection import check_fields, project, project_items
+from ..util.results import tool_result
 
 @mcp.tool(name="make_payment", description="Make a payment for a transaction.")
 async def make_payment(input: MakePaymentIn, headers: dict) -> dict:
     assert_mcp_auth(headers)
-    api = PaymentsApiClient()
-    try:
-        return await api.make_payment({"transactionId": input.transactionId, "method": input.method}, input.idempotencyKey)
-    finally:
-        await api.close()
+    api = get_payments_api()
+    return await api.make_payment({"transactionId": input.transactionId, "method": input.method}, input.idempotencyKey)
 
 @mcp.tool(name="get_payment", description="Fetch a payment by id.")
 async def get_payment(input: GetPaymentIn, headers: dict) -> dict:
     assert_mcp_auth(headers)
-    api = PaymentsApiClient()
-    try:
-        return await api.get_payment(input.id)
-    finally:
-        await api.close()
+    fields = check_fields("payment", input.fields)
+    api = get_payments_api()
+    return tool_result(project(await api.get_payment(input.id), fields))
 
 @mcp.tool(name="get_payment_by_transaction", description="Fetch payment by transaction id.")
 async def get_payment_by_transaction(input: GetPaymentByTxIn, headers: dict) -> dict:
     assert_mcp_auth(headers)
-    api = PaymentsApiClient()
-    try:
-        return await api.get_payment_by_tx(input.transactionId)
-    finally:
-        await api.close()
+    fields = check_fields("payment", input.fields)
+    api = get_payments_api()
+    return tool_result(project(await api.get_payment_by_tx(input.transactionId), fields))
+
+@mcp.tool(name="get_payments_by_transactions",
+          description="Fetch the payment for each of many transaction ids in one call; errors are reported per transaction id.",
+          output_schema=BatchOut.model_json_schema())
+async def get_payments_by_transactions(input: GetPaymentsByTransactionsIn, headers: dict) -> dict:
+    assert_mcp_auth(headers)
+    fields = check_fields("payment", input.fields)
+    api = get_payments_api()
+    return tool_result(project_items(await fan_out(input.transactionIds, api.get_payment_by_tx), "items", fields))
 
 @mcp.tool(name="retry_payment", description="Retry a failed payment.")
 async def retry_payment(input: RetryPaymentIn, headers: dict) -> dict:
     assert_mcp_auth(headers)
-    api = PaymentsApiClient()
-    try:
-        return await api.retry_payment(input.id, input.idempotencyKey)
-    finally:
-        await api.close()
+    api = get_payments_api()
+    return await api.retry_payment(input.id, input.idempotencyKey)
 
 @mcp.tool(name="fail_payment", description="Mark a payment as failed with a reason code.")
 async def fail_payment(input: FailPaymentIn, headers: dict) -> dict:
     assert_mcp_auth(headers)
-    api = PaymentsApiClient()
-    try:
-        return await api.fail_payment(input.id, input.reasonCode, input.idempotencyKey)
-    finally:
-        await api.close()
+    api = get_payments_api()
+    return await api.fail_payment(input.id, input.reasonCode, input.idempotencyKey)
@@ -1,16 +1,34 @@
+import logging
+import os
+
+from fastmcp import Context
+from starlette.requests import Request
+from starlette.responses import FileResponse, JSONResponse
+
 from mcpServer.runtime import mcp
 
-from mcpServer.payments_api.client import PaymentsApiClient
+from mcpServer.payments_api.client import get_payments_api
 from mcpServer.models.dto import (
-    CreateTransactionIn, GetTransactionIn, SearchTransactionsIn, CancelTransactionIn
+    CreateTransactionIn, GetTransactionIn, GetTransactionsBatchIn, SearchTransactionsIn, SearchTransactionsAllIn,
+    CancelTransactionIn, BatchOut, PagedRowsOut, ExportTransactionsIn, ExportOut
 )
+from mcpServer.config import EXPORT_PAGE_SIZE
 from ..util.auth import assert_mcp_auth
+from ..util.batch import fan_out
+from ..util.paginate import collect_pages
+from ..util.logs import get_logger, log_event
+from ..util.columnar import columnar
+from ..util.export import export_pages, export_path, media_type
+from ..util.projection import check_fields, limit_page, page_for_limit, project, project_items, shown_size
+from ..util.results import tool_result
 from mcpServer.tools.analytics import _normalize_iso
 
+log = get_logger("mcpServer.tools.transactions")
+
 @mcp.tool(name="create_transaction", description="Create a transaction for a customer.")
 async def create_transaction(input: CreateTransactionIn, headers: dict) -> dict:
     assert_mcp_auth(headers)
-    api = PaymentsApiClient()
+    api = get_payments_api()
     payload = {
         "customerId": input.customerId,
         "amount": input.amount,
@@ -18,25 +36,35 @@ async def create_transaction(input: CreateTransactionIn, headers: dict) -> dict:
         "category": input.category,
         "description": input.description,
     }
-    try:
-        return await api.create_transaction(payload, input.idempotencyKey)
-    finally:
-        await api.close()
+    return await api.create_transaction(payload, input.idempotencyKey)
 
 @mcp.tool(name="get_transaction", description="Fetch a transaction by id.")
 async def get_transaction(input: GetTransactionIn, headers: dict) -> dict:
     assert_mcp_auth(headers)
-    api = PaymentsApiClient()
-    try:
-        return await api.get_transaction(input.id)
-    finally:
-        await api.close()
+    api = get_payments_api()
+    fields = check_fields("transaction", input.fields)
+    return tool_result(project(await api.get_transaction(input.id), fields))
+
+@mcp.tool(name="get_transactions_batch",
+          description="Fetch many transactions by id in one call; returns found items plus per-id errors.",
+          output_schema=BatchOut.model_json_schema())
+async def get_transactions_batch(input: GetTransactionsBatchIn, headers: dict) -> dict:
+    assert_mcp_auth(headers)
+    api = get_payments_api()
+    return tool_result(await fan_out(input.ids, api.get_transaction))
 
-@mcp.tool(name="search_transactions", description="Search transactions with filters and pagination.")
+@mcp.tool(name="search_transactions",
+          description="Search transactions with filters and pagination. Optional `limit` (first N rows, e.g. the "
+                      "last N with sort createdAt,desc) and `fields` (only these transaction keys per row). "
+                      "format=\"columnar\" returns `content` as {columns, rows, dictionaries}: keys once, repeated "
+                      "strings as indexes into dictionaries[column].")
 async def search_transactions(input: SearchTransactionsIn, headers: dict) -> dict:
     assert_mcp_auth(headers)
-    print("Request received with parameters: ", input)
-    api = PaymentsApiClient()
+    log_event(log, logging.INFO, "tool input", tool="search_transactions", input=input)
+    fields = check_fields("transaction", input.fields)
+    size = shown_size(input)
+    page, upstream_size, offset = page_for_limit(input.page, size, input.limit)
+    api = get_payments_api()
     params = {
         "customerId": input.customerId,
         "status": input.status,
@@ -44,20 +72,67 @@ async def search_transactions(input: SearchTransactionsIn, headers: dict) -> dic
         "currency": input.currency,
         "from": _normalize_iso(input.from_),
         "to": _normalize_iso(input.to),
-        "page": input.page,
-        "size": input.size,
+        "page": page,
+        "size": upstream_size,
         "sort": input.sort,
     }
+    body = await api.search_transactions({k: v for k, v in params.items() if v not in (None, "")})
+    body = project_items(limit_page(body, input.page, size, offset, input.limit), "content", fields)
+    return tool_result(columnar(body, "content", input.format))
+
+@mcp.tool(name="search_transactions_all",
+          description="Search transactions and return every match (walks all pages server-side) up to maxRows.",
+          output_schema=PagedRowsOut.model_json_schema())
+async def search_transactions_all(input: SearchTransactionsAllIn, headers: dict, ctx: Context) -> dict:
+    assert_mcp_auth(headers)
+    api = get_payments_api()
+    params = {
+        "customerId": input.customerId,
+        "status": input.status,
+        "category": input.category,
+        "currency": input.currency,
+        "from": _normalize_iso(input.from_),
+        "to": _normalize_iso(input.to),
+        "sort": input.sort,
+    }
+    pages = api.iter_transactions({k: v for k, v in params.items() if v not in (None, "")}, max_rows=input.maxRows)
+    return tool_result(await collect_pages(pages, input.maxRows, ctx))
+
+@mcp.tool(name="export_transactions",
+          description="Export ALL transactions matching the filters to a file (ndjson, csv, or parquet when available) "
+                      "instead of returning them. Returns exportId, row count, sha256 and downloadPath; use it for "
+                      "requests like 'all transactions for customer X this year'.",
+          output_schema=ExportOut.model_json_schema())
+async def export_transactions(input: ExportTransactionsIn, headers: dict, ctx: Context) -> dict:
+    assert_mcp_auth(headers)
+    log_event(log, logging.INFO, "tool input", tool="export_transactions", input=input)
+    api = get_payments_api()
+    params = {
+        "customerId": input.customerId,
+        "status": input.status,
+        "category": input.category,
+        "currency": input.currency,
+        "from": _normalize_iso(input.from_),
+        "to": _normalize_iso(input.to),
+        "sort": input.sort,
+    }
+    pages = api.iter_transactions({k: v for k, v in params.items() if v not in (None, "")},
+                                  max_rows=input.maxRows, page_size=EXPORT_PAGE_SIZE)
+    return tool_result(await export_pages(pages, input.format, input.maxRows, ctx))
+
+@mcp.custom_route("/exports/{export_id}", methods=["GET"])
+async def download_export(request: Request):
     try:
-        return await api.search_transactions({k: v for k, v in params.items() if v not in (None, "")})
-    finally:
-        await api.close()
+        assert_mcp_auth(request.headers)
+    except PermissionError as e:
+        return JSONResponse({"error": str(e)}, status_code=401)
+    path = export_path(request.path_params["export_id"])
+    if path is None:
+        return JSONResponse({"error": "export not found or expired"}, status_code=404)
+    return FileResponse(path, media_type=media_type(path), filename=os.path.basename(path))
 
 @mcp.tool(name="cancel_transaction", description="Cancel a pending transaction (sets FAILED).")
 async def cancel_transaction(input: CancelTransactionIn, headers: dict) -> dict:
     assert_mcp_auth(headers)
-    api = PaymentsApiClient()
-    try:
-        return await api.cancel_transaction(input.id, input.idempotencyKey)
-    finally:
-        await api.close()
+    api = get_payments_api()
+    return await api.cancel_transaction(input.id, input.idempotencyKey)
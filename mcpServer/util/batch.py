@@ -0,0 +1,35 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List
+
+import httpx
+
+from ..config import BATCH_CONCURRENCY
+
+async def fan_out(
+    ids: Iterable[int],
+    fetch: Callable[[int], Awaitable[Dict[str, Any]]],
+    concurrency: int = BATCH_CONCURRENCY,
+) -> Dict[str, Any]:
+    """Fetch each id with at most `concurrency` upstream calls in flight.
+
+    One failing id never fails the batch: it is reported under "errors" with the upstream status.
+    """
+    unique: List[int] = list(dict.fromkeys(ids))      # de-dupe, keep caller order
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(i: int):
+        async with sem:
+            try:
+                return i, await fetch(i), None
+            except httpx.HTTPStatusError as e:
+                return i, None, {"id": i, "status": e.response.status_code, "error": e.response.reason_phrase}
+            except httpx.HTTPError as e:
+                return i, None, {"id": i, "status": None, "error": f"{type(e).__name__}: {e}"}
+
+    items, errors = [], []
+    for i, body, err in await asyncio.gather(*(one(i) for i in unique)):
+        if err is None:
+            items.append(body)
+        else:
+            errors.append(err)
+    return {"requested": len(unique), "found": len(items), "items": items, "errors": errors}
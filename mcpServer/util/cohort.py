@@ -0,0 +1,147 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+import numpy as np
+
+from ..config import COHORT_CONCURRENCY, COHORT_MAX_ROWS
+
+# Cohort analytics: many customers, one window, one compact answer.
+# Everything is reduced to (customer, category, amount, count) rows first and grouped with numpy,
+# whether the rows come from per-customer spend-by-category calls or from one transaction listing.
+
+
+class _Rows:
+    def __init__(self):
+        self.customer: List[int] = []
+        self.category: List[str] = []
+        self.amount: List[float] = []
+        self.count: List[int] = []
+
+    def add(self, customer_id: int, category: str, amount: float, count: int) -> None:
+        self.customer.append(customer_id)
+        self.category.append(category or "")
+        self.amount.append(amount)
+        self.count.append(count)
+
+
+async def _per_customer(api, ids: Sequence[int], params: Dict[str, Any], category: Optional[str], rows: _Rows,
+                        concurrency: int) -> List[Dict[str, Any]]:
+    """One spend-by-category call per customer (served by the analytics cache / local engine when on)."""
+    sem = asyncio.Semaphore(max(1, concurrency))
+    errors: List[Dict[str, Any]] = []
+
+    async def one(cid: int):
+        async with sem:
+            try:
+                return cid, await api.spend_by_category({**params, "customerId": cid})
+            except httpx.HTTPStatusError as e:
+                errors.append({"id": cid, "status": e.response.status_code, "error": e.response.reason_phrase})
+            except httpx.HTTPError as e:
+                errors.append({"id": cid, "status": None, "error": f"{type(e).__name__}: {e}"})
+            return cid, None
+
+    for cid, raw in await asyncio.gather(*(one(cid) for cid in ids)):
+        items = raw.get("items", []) if isinstance(raw, dict) else raw or []
+        for r in items:
+            if category and r.get("category") != category:
+                continue
+            rows.add(cid, r.get("category", ""), float(r.get("totalAmount", 0) or 0), int(r.get("transactionCount", 0) or 0))
+    return errors
+
+
+async def _from_listing(api, ids: Optional[Sequence[int]], params: Dict[str, Any], rows: _Rows, max_rows: int) -> bool:
+    """Walk COMPLETED transactions in the window once; returns True when max_rows cut the walk short."""
+    wanted = set(ids) if ids else None
+    query = {**params, "status": "COMPLETED", "sort": "id,asc"}
+    if ids and len(ids) == 1:
+        query["customerId"] = ids[0]
+    seen, total = 0, None
+    async for page in api.iter_transactions(query, max_rows=max_rows):
+        if total is None:
+            total = page.get("totalElements")
+        for t in page["content"]:
+            seen += 1
+            if wanted is None or t.get("customerId") in wanted:
+                rows.add(t["customerId"], t.get("category", ""), float(t.get("amount") or 0), 1)
+    return total is not None and seen < total
+
+
+def _table(columns: List[str], rows: List[list]) -> Dict[str, Any]:
+    return {"columns": columns, "rows": rows}
+
+
+def summarize(rows: _Rows, ids: Optional[Sequence[int]], top_n: int) -> Dict[str, Any]:
+    """Group (customer, category) rows into per-customer, per-category and overall totals plus rankings."""
+    customer = np.asarray(rows.customer, dtype=np.int64)
+    amount = np.asarray(rows.amount, dtype=np.float64)
+    count = np.asarray(rows.count, dtype=np.int64)
+    categories, cat_idx = np.unique(np.asarray(rows.category, dtype=object), return_inverse=True)
+    # requested customers with no spend still get a (zero) row
+    universe = np.union1d(np.asarray(ids or [], dtype=np.int64), customer)
+    cust_idx = np.searchsorted(universe, customer)
+    n_cust, n_cat = len(universe), len(categories)
+
+    cust_amount = np.bincount(cust_idx, weights=amount, minlength=n_cust)
+    cust_count = np.bincount(cust_idx, weights=count, minlength=n_cust).astype(np.int64)
+    cat_amount = np.bincount(cat_idx, weights=amount, minlength=n_cat)
+    cat_count = np.bincount(cat_idx, weights=count, minlength=n_cat).astype(np.int64)
+    grid = np.bincount(cust_idx * n_cat + cat_idx, weights=amount, minlength=n_cust * n_cat).reshape(n_cust, n_cat)
+    cat_customers = np.count_nonzero(grid > 0, axis=0)
+    top_cat = grid.argmax(axis=1) if n_cat else np.zeros(n_cust, dtype=np.int64)
+
+    total, txs = float(amount.sum()), int(count.sum())
+    by_cust = np.lexsort((universe, -cust_amount))           # amount desc, then id
+    by_cat = np.argsort(-cat_amount, kind="stable")
+    return {
+        "totals": {
+            "customers": n_cust,
+            "customersWithSpend": int(np.count_nonzero(cust_count)),
+            "totalAmount": round(total, 2),
+            "transactionCount": txs,
+            "averageTicket": round(total / txs, 2) if txs else 0.0,
+        },
+        "customers": _table(
+            ["customerId", "totalAmount", "transactionCount", "topCategory"],
+            [[int(universe[i]), round(float(cust_amount[i]), 2), int(cust_count[i]),
+              str(categories[top_cat[i]]) if cust_count[i] else None] for i in by_cust.tolist()],
+        ),
+        "categories": _table(
+            ["category", "totalAmount", "transactionCount", "customers", "share"],
+            [[str(categories[k]), round(float(cat_amount[k]), 2), int(cat_count[k]), int(cat_customers[k]),
+              round(float(cat_amount[k]) / total, 4) if total else 0.0] for k in by_cat.tolist()],
+        ),
+        "topCustomers": [int(universe[i]) for i in by_cust[:top_n].tolist() if cust_count[i]],
+        "topCategories": [str(categories[k]) for k in by_cat[:top_n].tolist()],
+    }
+
+
+async def cohort_analytics(
+    api,
+    ids: Optional[Sequence[int]],
+    params: Dict[str, Any],
+    category: Optional[str] = None,
+    currency: Optional[str] = None,
+    top_n: int = 5,
+    concurrency: int = COHORT_CONCURRENCY,
+    max_rows: int = COHORT_MAX_ROWS,
+) -> Dict[str, Any]:
+    """`params` holds the normalized window ({"from", "to"}).
+
+    A customer list without a currency filter fans out spend-by-category per customer (bounded
+    concurrency); a filter-only cohort, or a currency filter, walks the transaction listing once.
+    """
+    ids = list(dict.fromkeys(ids)) if ids else None
+    rows = _Rows()
+    errors: List[Dict[str, Any]] = []
+    truncated = False
+    if ids and not currency:
+        source = "per-customer"
+        errors = await _per_customer(api, ids, params, category, rows, concurrency)
+    else:
+        source = "listing"
+        filters = {k: v for k, v in (("category", category), ("currency", currency)) if v}
+        truncated = await _from_listing(api, ids, {**params, **filters}, rows, max_rows)
+    out = summarize(rows, ids, top_n)
+    return {"from": params.get("from"), "to": params.get("to"), "source": source, "truncated": truncated,
+            **out, "errors": errors}
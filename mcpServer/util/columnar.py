@@ -0,0 +1,52 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+# `format="columnar"` on the row-returning tools: the list under one key of the result becomes a table,
+#   {"columns": [...], "rows": [[...], ...], "dictionaries": {"category": ["Groceries", ...]}}
+# Key names are sent once instead of per row, and a string column whose values repeat is sent as
+# indexes into its dictionary (rows hold 0, 1, 0, ... and `dictionaries[column]` the distinct values).
+# The rest of the result (page envelope, customerId, ...) is unchanged.
+
+FORMATS = ("rows", "columnar")
+
+
+def _as_dict(row: Any) -> Dict[str, Any]:
+    if isinstance(row, dict):
+        return row
+    return {f: getattr(row, f) for f in row.__dataclass_fields__}          # models/wire.py rows
+
+
+def to_table(rows: Sequence[Any], columns: Optional[List[str]] = None, encode: bool = True) -> Dict[str, Any]:
+    """Rows (dicts or wire dataclasses) as a table; `columns` defaults to every key, in first-seen order."""
+    dicts = [_as_dict(r) for r in rows]
+    if columns is None:
+        columns = list(dict.fromkeys(k for d in dicts for k in d))
+    table = [[d.get(c) for c in columns] for d in dicts]
+    dictionaries: Dict[str, List[str]] = {}
+    if encode:
+        for i, col in enumerate(columns):
+            values = [r[i] for r in table]
+            if not values or not all(isinstance(v, str) for v in values):
+                continue
+            distinct = list(dict.fromkeys(values))
+            if len(distinct) * 2 > len(values):                    # mostly unique: indexes would not pay
+                continue
+            index = {v: n for n, v in enumerate(distinct)}
+            for r in table:
+                r[i] = index[r[i]]
+            dictionaries[col] = distinct
+    return {"columns": columns, "rows": table, "dictionaries": dictionaries}
+
+
+def from_table(table: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The rows back as dicts (what a caller or test decodes a columnar result with)."""
+    columns, dictionaries = table["columns"], table.get("dictionaries") or {}
+    lookups = [dictionaries.get(c) for c in columns]
+    return [{c: (lk[v] if lk is not None and v is not None else v) for c, lk, v in zip(columns, lookups, row)}
+            for row in table["rows"]]
+
+
+def columnar(body: Dict[str, Any], key: str, fmt: str) -> Dict[str, Any]:
+    """`body` with its `key` list as a table when fmt == "columnar"; otherwise `body` as is."""
+    if fmt != "columnar" or not isinstance(body, dict):
+        return body
+    return {**body, key: to_table(body.get(key) or ())}
@@ -1,3 +1,4 @@
 class BadRequest(Exception): ...
 class NotFound(Exception): ...
 class UpstreamError(Exception): ...
+class IdempotencyConflict(Exception): ...   # same Idempotency-Key, different request
@@ -0,0 +1,189 @@
+import asyncio
+import csv
+import hashlib
+import io
+import os
+import re
+import secrets
+import tempfile
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastmcp import Context
+
+from mcpServer.config import EXPORT_DIR, EXPORT_ROW_GROUP, EXPORT_TTL_SECS
+from mcpServer.models.wire import Transaction
+from mcpServer.payments_api.codec import dumps
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:                      # optional: only the parquet format needs it
+    pyarrow = None
+
+# Bulk exports: rows from a PaymentsApiClient.paginate() walk written to a file page by page.
+# Only the page being written is held in memory (plus the parquet row group being filled); the
+# walk prefetches the next page while this one is encoded and written on a worker thread.
+# The file is written as <id>.<ext>.part and renamed once complete, so a download never sees half a file.
+
+COLUMNS: List[str] = list(Transaction.__dataclass_fields__)
+EXTENSIONS = {"ndjson": "ndjson", "csv": "csv", "parquet": "parquet"}
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+_ID = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+
+
+class _NdjsonWriter:
+    def __init__(self, path: str):
+        self.f = open(path, "wb")
+        self.sha = hashlib.sha256()
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        data = b"".join(dumps(r) + b"\n" for r in rows)
+        self.sha.update(data)
+        self.f.write(data)
+
+    def close(self) -> str:
+        self.f.close()
+        return self.sha.hexdigest()
+
+
+class _CsvWriter(_NdjsonWriter):
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._write_lines([COLUMNS])
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        self._write_lines([[r.get(c) for c in COLUMNS] for r in rows])
+
+    def _write_lines(self, lines: List[List[Any]]) -> None:
+        buf = io.StringIO()
+        csv.writer(buf, lineterminator="\n").writerows(lines)
+        data = buf.getvalue().encode()
+        self.sha.update(data)
+        self.f.write(data)
+
+
+class _ParquetWriter:
+    TYPES = {"id": "int64", "customerId": "int64", "amount": "float64"}     # the rest are strings
+
+    def __init__(self, path: str):
+        self.path = path
+        self.schema = pyarrow.schema([(c, self.TYPES.get(c, "string")) for c in COLUMNS])
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+        self.pending: List[Dict[str, Any]] = []
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        self.pending.extend(rows)
+        if len(self.pending) >= EXPORT_ROW_GROUP:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self.pending:
+            cols = {c: [r.get(c) for r in self.pending] for c in COLUMNS}
+            self.writer.write_table(pyarrow.Table.from_pydict(cols, schema=self.schema))
+            self.pending = []
+
+    def close(self) -> str:
+        self._flush()
+        self.writer.close()
+        sha = hashlib.sha256()
+        with open(self.path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+
+_WRITERS = {"ndjson": _NdjsonWriter, "csv": _CsvWriter, "parquet": _ParquetWriter}
+
+
+def export_dir() -> str:
+    path = EXPORT_DIR or os.path.join(tempfile.gettempdir(), "mcp-exports")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def export_path(export_id: str) -> Optional[str]:
+    """The finished, unexpired file of an export, or None (also for ids that could not be ours)."""
+    if not _ID.match(export_id):
+        return None
+    root = export_dir()
+    for fmt, ext in EXTENSIONS.items():
+        path = os.path.join(root, f"{export_id}.{ext}")
+        try:
+            if time.time() - os.path.getmtime(path) < EXPORT_TTL_SECS:
+                return path
+        except FileNotFoundError:
+            continue
+    return None
+
+
+def media_type(path: str) -> str:
+    return MEDIA_TYPES[next(f for f, ext in EXTENSIONS.items() if path.endswith("." + ext))]
+
+
+def purge_expired() -> int:
+    root, now, removed = export_dir(), time.time(), 0
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        try:
+            if now - os.path.getmtime(path) >= EXPORT_TTL_SECS:
+                os.remove(path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+async def export_pages(
+    pages: AsyncIterator[Dict[str, Any]],
+    fmt: str,
+    max_rows: int,
+    ctx: Optional[Context] = None,
+) -> Dict[str, Any]:
+    """Write every row of a paginate() walk to a new export file; returns its handle, not the rows."""
+    if fmt == "parquet" and pyarrow is None:
+        raise ValueError("format 'parquet' needs pyarrow installed; use 'ndjson' or 'csv'")
+    await asyncio.to_thread(purge_expired)
+    export_id = secrets.token_urlsafe(18)
+    path = os.path.join(export_dir(), f"{export_id}.{EXTENSIONS[fmt]}")
+    writer = await asyncio.to_thread(_WRITERS[fmt], path + ".part")
+    rows = count = 0
+    total: Optional[int] = None
+    try:
+        async for page in pages:
+            count += 1
+            if total is None:
+                total = page.get("totalElements")
+            await asyncio.to_thread(writer.write, page["content"])     # next page is downloading meanwhile
+            rows += len(page["content"])
+            if ctx is not None:
+                goal = min(max_rows, total) if total is not None else max_rows
+                await ctx.report_progress(progress=rows, total=goal, message=f"page {count}: {rows} rows written")
+        sha256 = await asyncio.to_thread(writer.close)
+        os.replace(path + ".part", path)
+    except BaseException:
+        await asyncio.to_thread(_discard, writer, path + ".part")
+        raise
+    return {
+        "exportId": export_id,
+        "format": fmt,
+        "rows": rows,
+        "bytes": os.path.getsize(path),
+        "sha256": sha256,
+        "downloadPath": f"/exports/{export_id}",
+        "expiresInSecs": EXPORT_TTL_SECS,
+        "totalElements": total,
+        "truncated": total is not None and rows < total,
+        "pages": count,
+    }
+
+
+def _discard(writer, part: str) -> None:
+    try:
+        writer.close()
+    except Exception:
+        pass
+    try:
+        os.remove(part)
+    except FileNotFoundError:
+        pass
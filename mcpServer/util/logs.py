@@ -0,0 +1,207 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, TextIO
+
+from ..config import LOG_LEVEL, LOG_SAMPLE_RATES, LOG_MAX_FIELD_CHARS, LOG_REDACT_PII, LOG_QUEUE_SIZE
+
+# Structured JSON logs for mcpServer, agent and agent_multi.
+# The calling (event loop) thread only builds a LogRecord and puts it on a bounded queue; a
+# background thread does everything that costs time: walking payloads, PII redaction, JSON
+# encoding, truncation and the write itself. Payloads are passed by reference, so only log
+# objects that are not mutated afterwards (tool inputs and results are not).
+
+ROOTS = ("mcpServer", "agent", "agent_multi")    # top-level logger namespaces that get the queue handler ("mcp" is the SDK's)
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+PHONE_RE = re.compile(r"(?<![\w+])(?:\+\d{1,3}[\s.-]?)?(?:\(\d{3}\)\s?|\d{3}[\s.-]?)\d{3}[\s.-]?\d{4}(?:x\d+)?(?!\w)")
+PII_KEYS = {"email", "phone", "phonenumber", "phone_number"}
+
+
+def redact(text: str) -> str:
+    return PHONE_RE.sub("<phone>", EMAIL_RE.sub("<email>", text))
+
+
+def truncate(text: str, limit: int) -> str:
+    if limit <= 0 or len(text) <= limit:
+        return text
+    return f"{text[:limit]}...<{len(text) - limit} more chars>"
+
+
+def _plain(value: Any, pii: bool, max_items: int) -> Any:
+    """JSON-ready copy of a payload: models dumped, PII keys masked, strings redacted.
+
+    Lists are cut at `max_items` (the field would be truncated past that anyway), so a
+    1000-row result costs the writer thread no more than a short one.
+    """
+    if hasattr(value, "model_dump"):
+        value = value.model_dump(mode="json", by_alias=True, exclude_none=True)
+    elif hasattr(value, "__dataclass_fields__"):
+        value = {f: getattr(value, f) for f in value.__dataclass_fields__}
+    if isinstance(value, dict):
+        return {str(k): ("<redacted>" if pii and str(k).lower() in PII_KEYS and v else _plain(v, pii, max_items))
+                for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        items = list(value)
+        out = [_plain(v, pii, max_items) for v in items[:max_items]]
+        if len(items) > max_items:
+            out.append(f"...<{len(items) - max_items} more items>")
+        return out
+    if isinstance(value, str):
+        return redact(value) if pii else value
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return redact(str(value)) if pii else str(value)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, then the record's `fields`."""
+
+    def __init__(self, max_field_chars: int = LOG_MAX_FIELD_CHARS, redact_pii: bool = LOG_REDACT_PII):
+        super().__init__()
+        self.max_field_chars = max_field_chars
+        self.redact_pii = redact_pii
+        self.max_items = max(1, max_field_chars // 16) if max_field_chars > 0 else 1 << 30   # >= 16 JSON chars per item
+
+    def format(self, record: logging.LogRecord) -> str:
+        msg = record.getMessage()
+        out: Dict[str, Any] = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": redact(msg) if self.redact_pii else msg,
+        }
+        for k, v in (getattr(record, "fields", None) or {}).items():
+            v = _plain(v, self.redact_pii, self.max_items)
+            if isinstance(v, (dict, list)):
+                text = json.dumps(v, separators=(",", ":"), default=str)
+                # oversized payloads are kept as (truncated) JSON text rather than dropped
+                v = truncate(text, self.max_field_chars) if len(text) > self.max_field_chars > 0 else v
+            elif isinstance(v, str):
+                v = truncate(v, self.max_field_chars)
+            out[k] = v
+        if record.exc_info:
+            out["exc"] = truncate(self.formatException(record.exc_info), self.max_field_chars * 4)
+        return json.dumps(out, separators=(",", ":"), default=str)
+
+
+def parse_rates(spec: str) -> Dict[str, float]:
+    rates: Dict[str, float] = {}
+    for part in (spec or "").split(","):
+        name, _, rate = part.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+class Sampler(logging.Filter):
+    """Keep a share of records below WARNING per logger; the longest matching name prefix wins."""
+
+    def __init__(self, rates: Dict[str, float], rng: Optional[random.Random] = None):
+        super().__init__()
+        self.rates = rates
+        self._rng = rng or random.Random()
+        self._resolved: Dict[str, float] = {}
+        self.dropped = 0
+
+    def rate(self, name: str) -> float:
+        r = self._resolved.get(name)
+        if r is None:
+            r, best = 1.0, -1
+            for prefix, rate in self.rates.items():
+                if (name == prefix or name.startswith(prefix + ".")) and len(prefix) > best:
+                    r, best = rate, len(prefix)
+            self._resolved[name] = r
+        return r
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        r = self.rate(record.name)
+        if r >= 1.0 or self._rng.random() < r:
+            return True
+        self.dropped += 1
+        return False
+
+
+class _EnqueueHandler(QueueHandler):
+    """QueueHandler.prepare formats the message in the caller's thread; here the record goes as-is."""
+
+    def __init__(self, q: "queue.Queue[logging.LogRecord]"):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1              # never block the event loop on a slow log sink
+
+
+_lock = threading.Lock()
+_handler: Optional[_EnqueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging(stream: Optional[TextIO] = None, level: str = LOG_LEVEL, sample_rates: str = LOG_SAMPLE_RATES,
+                  queue_size: int = LOG_QUEUE_SIZE) -> None:
+    """Attach the queue handler to the ROOTS loggers and start the writer thread (once per process)."""
+    global _handler, _listener
+    with _lock:
+        if _handler is not None:
+            return
+        q: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=queue_size)
+        sink = logging.StreamHandler(stream or sys.stderr)      # stdout carries the stdio MCP transport
+        sink.setFormatter(JsonFormatter())
+        _handler = _EnqueueHandler(q)
+        _handler.addFilter(Sampler(parse_rates(sample_rates)))
+        for name in ROOTS:
+            root = logging.getLogger(name)
+            root.setLevel(level)
+            root.addHandler(_handler)
+            root.propagate = False
+        _listener = QueueListener(q, sink)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _handler, _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+        for name in ROOTS:
+            if _handler is not None:
+                logging.getLogger(name).removeHandler(_handler)
+        _handler = _listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    setup_logging()
+    return logging.getLogger(name)
+
+
+def log_event(logger: logging.Logger, level: int, msg: str, **fields: Any) -> None:
+    """Structured record; nothing is built when the level is off."""
+    if logger.isEnabledFor(level):
+        logger.log(level, msg, extra={"fields": fields})
+
+
+def logging_stats() -> Dict[str, Any]:
+    sampler = next((f for f in _handler.filters if isinstance(f, Sampler)), None) if _handler else None
+    return {
+        "queued": _handler.queue.qsize() if _handler else 0,
+        "droppedFull": _handler.dropped if _handler else 0,
+        "droppedSampled": sampler.dropped if sampler else 0,
+    }
@@ -0,0 +1,269 @@
+import asyncio
+import glob
+import json
+import os
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+# Prometheus text-format metrics without a client library.
+# Everything is updated from the event loop thread, so plain ints/floats need no locks; each worker
+# process keeps its own series. Histogram bucket arrays are allocated once per label set.
+# In multi-worker mode each worker writes a JSON snapshot of its series to a shared directory and
+# /metrics serves their merge: counters and histograms summed, gauges summed unless `per_worker`.
+# The snapshot is taken on the loop; writing it and reading the others happen on a worker thread.
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0)
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+Labels = Tuple[str, ...]
+
+
+def _fmt_labels(names: Tuple[str, ...], values: Labels, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(v: Any) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _num(v: float) -> str:
+    return repr(float(v)) if isinstance(v, float) and not float(v).is_integer() else str(int(v))
+
+
+class _Metric:
+    kind = ""
+    per_worker = False                 # merged with a `worker` label instead of summed
+
+    def __init__(self, name: str, doc: str, labels: Tuple[str, ...] = ()):
+        self.name, self.doc, self.labels = name, doc, labels
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, doc, labels)
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, by: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + by
+
+    def render(self) -> List[str]:
+        return self.header() + [f"{self.name}{_fmt_labels(self.labels, k)} {_num(v)}" for k, v in self.values.items()]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, by: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) - by
+
+    def set(self, *labels: str, value: float) -> None:
+        self.values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, doc, labels)
+        self.buckets = tuple(sorted(buckets))
+        self.series: Dict[Labels, List[float]] = {}        # per label set: [count per bucket..., +Inf, sum]
+
+    def observe(self, value: float, *labels: str) -> None:
+        s = self.series.get(labels)
+        if s is None:
+            s = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        s[bisect_left(self.buckets, value)] += 1
+        s[-1] += value
+
+    def render(self) -> List[str]:
+        out = self.header()
+        for k, s in self.series.items():
+            running = 0
+            for le, n in zip(self.buckets + (float("inf"),), s):
+                running += n
+                bound = 'le="+Inf"' if le == float("inf") else f'le="{_num(le)}"'
+                out.append(f"{self.name}_bucket{_fmt_labels(self.labels, k, bound)} {running}")
+            out.append(f"{self.name}_sum{_fmt_labels(self.labels, k)} {s[-1]!r}")
+            out.append(f"{self.name}_count{_fmt_labels(self.labels, k)} {running}")
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[_Metric] = []
+        self.collectors: List[Callable[[], Iterable[_Metric]]] = []   # built at scrape time (e.g. cache stats)
+
+    def add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def collect(self) -> List[_Metric]:
+        out = list(self.metrics)
+        for collect in self.collectors:
+            out += collect()
+        return out
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for m in self.collect():
+            lines += m.render()
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+TOOL_CALLS = REGISTRY.add(Counter("mcp_tool_calls_total", "MCP tool calls.", ("tool",)))
+TOOL_ERRORS = REGISTRY.add(Counter("mcp_tool_errors_total", "MCP tool calls that raised, by exception type.", ("tool", "exception")))
+TOOL_IN_FLIGHT = REGISTRY.add(Gauge("mcp_tool_in_flight", "MCP tool calls currently running.", ("tool",)))
+TOOL_SECONDS = REGISTRY.add(Histogram("mcp_tool_duration_seconds", "Wall time of a tool call.", ("tool",)))
+TOOL_UPSTREAM_SECONDS = REGISTRY.add(Histogram(
+    "mcp_tool_upstream_seconds", "Time a tool call spent waiting on upstream HTTP requests.", ("tool",)))
+TOOL_UPSTREAM_REQUESTS = REGISTRY.add(Counter(
+    "mcp_tool_upstream_requests_total", "Upstream HTTP attempts made on behalf of tool calls.", ("tool",)))
+TOOL_RESPONSE_BYTES = REGISTRY.add(Histogram(
+    "mcp_tool_response_bytes", "Size of the tool result text.", ("tool",), SIZE_BUCKETS))
+UPSTREAM_SECONDS = REGISTRY.add(Histogram(
+    "mcp_upstream_request_seconds", "Upstream HTTP attempt latency.", ("method", "endpoint")))
+UPSTREAM_IN_FLIGHT = REGISTRY.add(Gauge("mcp_upstream_in_flight", "Upstream HTTP requests in flight."))
+ADMISSION_LIMIT = REGISTRY.add(Gauge("mcp_upstream_admission_limit", "Current adaptive upstream concurrency limit."))
+ADMISSION_QUEUE = REGISTRY.add(Gauge(
+    "mcp_upstream_admission_queue", "Upstream requests waiting for admission.", ("lane",)))
+ADMISSION_WAIT_SECONDS = REGISTRY.add(Histogram(
+    "mcp_upstream_admission_wait_seconds", "Time upstream requests waited for admission.", ("lane",)))
+ADMISSION_REJECTED = REGISTRY.add(Counter(
+    "mcp_upstream_admission_rejected_total", "Upstream requests refused by admission control.", ("lane", "reason")))
+ADMISSION_LIMIT_CHANGES = REGISTRY.add(Counter(
+    "mcp_upstream_admission_limit_changes_total", "Changes of the whole-number concurrency limit.", ("direction",)))
+
+# [upstream seconds, upstream attempts] accumulated by the tool call running in this context (set by ToolMetrics).
+_upstream_acc: ContextVar[Optional[List[float]]] = ContextVar("mcp_upstream_acc", default=None)
+
+
+def observe_upstream(method: str, endpoint: str, secs: float) -> None:
+    UPSTREAM_SECONDS.observe(secs, method, endpoint)
+    acc = _upstream_acc.get()
+    if acc is not None:
+        acc[0] += secs
+        acc[1] += 1
+
+
+class ToolMetrics(Middleware):
+    """Per-tool call count, errors, in-flight, total vs upstream time, result size."""
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        tool = context.message.name
+        TOOL_CALLS.inc(tool)
+        TOOL_IN_FLIGHT.inc(tool)
+        acc = [0.0, 0]
+        token = _upstream_acc.set(acc)
+        t0 = time.perf_counter()
+        try:
+            result = await call_next(context)
+        except Exception as e:
+            TOOL_ERRORS.inc(tool, type(e.__cause__ or e).__name__)   # fastmcp wraps tool errors in ToolError
+            raise
+        finally:
+            TOOL_SECONDS.observe(time.perf_counter() - t0, tool)
+            TOOL_UPSTREAM_SECONDS.observe(acc[0], tool)
+            TOOL_UPSTREAM_REQUESTS.inc(tool, by=acc[1])
+            TOOL_IN_FLIGHT.dec(tool)
+            _upstream_acc.reset(token)
+        TOOL_RESPONSE_BYTES.observe(sum(len(getattr(c, "text", "") or "") for c in result.content or ()), tool)
+        return result
+
+
+def stats_collector(stats: Callable[[], Dict[str, Any]]) -> Callable[[], Iterable[_Metric]]:
+    """Expose the numeric parts of PaymentsApiClient.stats() as gauges, read at scrape time."""
+    def collect():
+        g = Gauge("mcp_client_stat", "PaymentsApiClient counters (cache, coalescing, resilience, ...).",
+                  ("component", "stat"))
+        g.per_worker = True                      # ratios and sizes don't add up across workers
+        for component, values in (stats() or {}).items():
+            for k, v in (values or {}).items():
+                if isinstance(v, (int, float)) and not isinstance(v, bool):
+                    g.set(component, k, value=v)
+        return [g]
+    return collect
+
+
+# --- multi-worker aggregation ---
+
+def snapshot(registry: Registry = REGISTRY) -> List[Dict[str, Any]]:
+    out = []
+    for m in registry.collect():
+        d: Dict[str, Any] = {"name": m.name, "doc": m.doc, "kind": m.kind, "labels": list(m.labels),
+                             "perWorker": m.per_worker}
+        if isinstance(m, Histogram):
+            d["buckets"] = list(m.buckets)
+            d["series"] = [[list(k), s] for k, s in m.series.items()]
+        else:
+            d["values"] = [[list(k), v] for k, v in m.values.items()]
+        out.append(d)
+    return out
+
+
+def _write(directory: str, worker: str, snap: List[Dict[str, Any]]) -> None:
+    path = os.path.join(directory, f"worker-{worker}.json")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(snap, f, separators=(",", ":"))
+    os.replace(tmp, path)                        # readers never see a half-written file
+
+
+async def write_snapshot(directory: str, worker: str, registry: Registry = REGISTRY) -> None:
+    await asyncio.to_thread(_write, directory, worker, snapshot(registry))
+
+
+def merge(snapshots: Dict[str, List[Dict[str, Any]]]) -> Registry:
+    """One registry holding the sum (or per-worker series) of every worker's snapshot."""
+    merged = Registry()
+    by_name: Dict[str, _Metric] = {}
+    for worker, metrics in sorted(snapshots.items()):
+        for d in metrics:
+            labels = tuple(d["labels"]) + (("worker",) if d["perWorker"] else ())
+            m = by_name.get(d["name"])
+            if m is None:
+                if d["kind"] == "histogram":
+                    m = Histogram(d["name"], d["doc"], labels, tuple(d["buckets"]))
+                else:
+                    m = (Gauge if d["kind"] == "gauge" else Counter)(d["name"], d["doc"], labels)
+                by_name[d["name"]] = merged.add(m)
+            extra = (worker,) if d["perWorker"] else ()
+            if isinstance(m, Histogram):
+                for k, s in d["series"]:
+                    acc = m.series.setdefault(tuple(k) + extra, [0] * len(s))
+                    for i, v in enumerate(s):
+                        acc[i] += v
+            else:
+                for k, v in d["values"]:
+                    m.inc(*(tuple(k) + extra), by=v)
+    merged.add(Gauge("mcp_workers_reporting", "Worker processes with a metrics snapshot.")).set(value=len(snapshots))
+    return merged
+
+
+async def render_workers(directory: str, worker: str) -> str:
+    """Refresh this worker's snapshot, then render the merge of all of them."""
+    return await asyncio.to_thread(_render_workers, directory, worker, snapshot())
+
+
+def _render_workers(directory: str, worker: str, snap: List[Dict[str, Any]]) -> str:
+    _write(directory, worker, snap)
+    snapshots = {}
+    for path in glob.glob(os.path.join(directory, "worker-*.json")):
+        try:
+            with open(path) as f:
+                snapshots[os.path.basename(path)[len("worker-"):-len(".json")]] = json.load(f)
+        except (OSError, ValueError):
+            continue                             # a worker is replacing its file right now
+    return merge(snapshots).render()
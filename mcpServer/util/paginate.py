@@ -0,0 +1,27 @@
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastmcp import Context
+
+async def collect_pages(
+    pages: AsyncIterator[Dict[str, Any]],
+    max_rows: int,
+    ctx: Optional[Context] = None,
+) -> Dict[str, Any]:
+    """Drain a PaymentsApiClient.paginate() generator into one result of at most `max_rows` items.
+
+    With a Context, a progress notification goes out per page, so HTTP clients see the walk advance
+    before the final result arrives.
+    """
+    items: list = []
+    total: Optional[int] = None
+    count = 0
+    async for page in pages:
+        count += 1
+        if total is None:
+            total = page.get("totalElements")
+        items.extend(page["content"])
+        if ctx is not None:
+            goal = min(max_rows, total) if total is not None else max_rows
+            await ctx.report_progress(progress=len(items), total=goal, message=f"page {count}: {len(items)} rows")
+    truncated = total is not None and len(items) < total
+    return {"items": items, "returned": len(items), "totalElements": total, "truncated": truncated, "pages": count}
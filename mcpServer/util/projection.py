@@ -0,0 +1,71 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from mcpServer.models.wire import Customer, Payment, Transaction
+
+# `fields` / `limit` on the read tools: trim what goes back to the LLM before it leaves the server.
+# The client and its caches keep whole upstream bodies; projection builds new dicts from them.
+# `id` is always kept so a trimmed row can still be referred to in a follow-up call.
+
+FIELDS: Dict[str, Tuple[str, ...]] = {
+    "customer": tuple(Customer.__dataclass_fields__),
+    "transaction": tuple(Transaction.__dataclass_fields__),
+    "payment": tuple(Payment.__dataclass_fields__),
+}
+
+
+def check_fields(entity: str, fields: Optional[Iterable[str]]) -> Optional[List[str]]:
+    """The requested field list (with `id` first), or ValueError naming the valid fields."""
+    if not fields:
+        return None
+    known = FIELDS[entity]
+    unknown = [f for f in fields if f not in known]
+    if unknown:
+        raise ValueError(f"unknown {entity} field(s) {unknown}; valid: {list(known)}")
+    return ["id"] + [f for f in dict.fromkeys(fields) if f != "id"]
+
+
+def project(row: Optional[Dict[str, Any]], fields: Optional[List[str]]) -> Optional[Dict[str, Any]]:
+    if fields is None or row is None:
+        return row
+    return {f: row[f] for f in fields if f in row}
+
+
+def project_items(body: Dict[str, Any], key: str, fields: Optional[List[str]]) -> Dict[str, Any]:
+    """Page / batch body with each row under `key` projected; the envelope is kept."""
+    if fields is None:
+        return body
+    return {**body, key: [project(r, fields) for r in body.get(key) or ()]}
+
+
+def shown_size(input) -> int:
+    """Page size the caller meant: `limit` alone ("last 3 transactions") asks for a page of that many."""
+    return input.limit if input.limit and "size" not in input.model_fields_set else input.size
+
+
+def page_for_limit(page: int, size: int, limit: Optional[int]) -> Tuple[int, int, int]:
+    """(upstream page, upstream size, offset into it) for the first `limit` rows of page `page` of `size`.
+
+    The smallest page size that holds those rows in one upstream page, so few rows beyond the ones the
+    caller sees are fetched and decoded: `limit=3` on page 0 is page 0 of size 3; on page 2 of size 10
+    (rows 20-22) it is page 5 of size 4.
+    """
+    if limit is None or limit >= size:
+        return page, size, 0
+    start = page * size
+    for s in range(limit, size + 1):
+        if start // s == (start + limit - 1) // s:
+            return start // s, s, start - (start // s) * s
+    return page, size, 0                    # unreachable: s == size always fits
+
+
+def limit_page(body: Dict[str, Any], page: int, size: int, offset: int, limit: Optional[int]) -> Dict[str, Any]:
+    """An upstream page fetched per page_for_limit(), re-described as the first `limit` rows of `page`/`size`."""
+    if limit is None:
+        return body
+    rows = (body.get("content") or [])[offset:offset + limit]
+    total = body.get("totalElements")
+    out = {**body, "content": rows, "number": page, "size": size, "numberOfElements": len(rows), "limit": limit}
+    if total is not None:
+        pages = (total + size - 1) // size
+        out.update(totalPages=pages, first=page == 0, last=page >= pages - 1, empty=not rows)
+    return out
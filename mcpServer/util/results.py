@@ -0,0 +1,20 @@
+from typing import Any, Dict
+
+from fastmcp.tools.tool import ToolResult
+from mcp.types import TextContent
+
+from ..payments_api.codec import dumps_str, loads
+
+# Tool results without FastMCP's generic conversion: it walks the whole result with
+# pydantic_core.to_jsonable_python for the structured content and again to build the text.
+# Upstream bodies are already plain JSON values, so they are encoded once (orjson) and passed through.
+# Tools keep their `-> dict` annotations, so the advertised output schemas do not change.
+
+
+def tool_result(body: Dict[str, Any], typed: bool = False) -> ToolResult:
+    """`body` as text + structured content. typed=True when it holds models/wire.py instances."""
+    text = dumps_str(body)
+    result = ToolResult(content=[TextContent(type="text", text=text)])
+    structured = loads(text) if typed else body
+    result.structured_content = structured if isinstance(structured, dict) else None   # MCP wants an object
+    return result
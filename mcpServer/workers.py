@@ -0,0 +1,238 @@
+"""Multi-process HTTP serving: a supervisor process running N uvicorn workers of the MCP app.
+
+    MCP_WORKERS=auto python -m mcpServer.app
+
+Workers share one listening socket bound by the supervisor before they start (pre-fork), or with
+WORKER_REUSEPORT=1 each binds its own SO_REUSEPORT socket and the kernel spreads connections.
+Each worker serves the stateless streamable-HTTP app (an MCP session cannot follow a client to another
+process) and keeps its own upstream pool and caches; SHARED_CACHE_PATH adds a host-wide tier.
+
+Signals to the supervisor:
+  SIGHUP           rolling restart: per slot, start a new worker, wait until it serves, then SIGTERM
+                   the old one, which stops accepting and finishes in-flight calls (WORKER_DRAIN_SECS)
+  SIGTERM/SIGINT   drain and stop every worker, then exit
+A worker that dies is replaced in its slot. One that dies soon after starting is replaced after a
+backoff that doubles per quick exit (WORKER_RESTART_BACKOFF_SECS); after WORKER_MAX_QUICK_EXITS in a
+row the supervisor stops the rest and exits with status 1 instead of crash-looping.
+"""
+import logging
+import multiprocessing as mp
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+from mcpServer.config import (
+    METRICS_ENABLED, WORKER_DRAIN_SECS, WORKER_METRICS_DIR, WORKER_REUSEPORT,
+    WORKER_RESTART_BACKOFF_SECS, WORKER_MAX_QUICK_EXITS,
+)
+from mcpServer.util.logs import get_logger
+
+log = get_logger("mcpServer.workers")
+
+START_TIMEOUT_SECS = 60.0         # a new worker must be serving within this, or the reload is abandoned
+QUICK_EXIT_SECS = 30.0            # a worker dying sooner than this after its start counts as a crash loop
+MAX_BACKOFF_SECS = 30.0
+
+
+def resolve_workers(value: str) -> int:
+    """MCP_WORKERS: a count, or "auto" / "0" / "" for one per CPU this process may run on."""
+    if value.strip().lower() in ("", "0", "auto"):
+        try:
+            return len(os.sched_getaffinity(0))
+        except AttributeError:                   # not on Linux
+            return os.cpu_count() or 1
+    return max(1, int(value))
+
+
+def bind_socket(host: str, port: int, reuseport: bool = False) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuseport:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+class _RouterClosedNoise(logging.Filter):
+    """mcp 1.12 logs a traceback per stateless JSON-mode request once the response is sent and its
+    stream is closed (ClosedResourceError in the message router); nothing failed."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        exc = record.exc_info[1] if record.exc_info else None
+        return not (record.msg == "Error in message router" and type(exc).__name__ == "ClosedResourceError")
+
+
+def _worker_main(sock: Optional[socket.socket], host: str, port: int, drain: float, ready) -> None:
+    """Worker process entry point (spawned, so it imports the server fresh)."""
+    import uvicorn
+
+    from mcpServer.app import load_components
+    from mcpServer.runtime import http_app
+
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)       # reloads are the supervisor's business
+    logging.getLogger("mcp.server.streamable_http").addFilter(_RouterClosedNoise())
+    if sock is None:
+        sock = bind_socket(host, port, reuseport=True)
+    load_components()
+
+    class _Server(uvicorn.Server):
+        async def startup(self, sockets=None):
+            await super().startup(sockets)
+            if not self.should_exit:
+                ready.set()
+
+    # JSON (not SSE) POST responses: sse_starlette ends every open event stream as soon as uvicorn gets
+    # SIGTERM, which would cut in-flight tool calls instead of letting them drain
+    app = http_app(stateless_http=True, json_response=True)
+    config = uvicorn.Config(app, lifespan="on", timeout_graceful_shutdown=drain)
+    _Server(config).run(sockets=[sock])
+
+
+class Supervisor:
+    def __init__(self, workers: int, host: str, port: int, reuseport: bool = WORKER_REUSEPORT,
+                 drain: float = WORKER_DRAIN_SECS, metrics_dir: str = WORKER_METRICS_DIR,
+                 backoff: float = WORKER_RESTART_BACKOFF_SECS, max_quick_exits: int = WORKER_MAX_QUICK_EXITS):
+        self.workers, self.host, self.port = workers, host, port
+        self.reuseport, self.drain = reuseport, drain
+        self.metrics_dir = metrics_dir
+        self.backoff, self.max_quick_exits = backoff, max_quick_exits
+        self._ctx = mp.get_context("spawn")
+        self._sock: Optional[socket.socket] = None
+        self._procs: Dict[int, mp.Process] = {}
+        self._ready: Dict[int, Any] = {}          # pid -> Event; must outlive the child's unpickling of it
+        self._started: Dict[int, float] = {}      # slot -> when its current worker was started
+        self._quick_exits: Dict[int, int] = {}    # slot -> workers in a row that died soon after starting
+        self._respawn_at: Dict[int, float] = {}   # slot -> when its dead worker gets replaced
+        self.failed = False
+        self._stop = False
+        self._reload = False
+        self._own_metrics_dir = False
+
+    # --- lifecycle ---
+
+    def run(self) -> None:
+        self._prepare_metrics_dir()
+        if not self.reuseport:
+            self._sock = bind_socket(self.host, self.port)
+        signal.signal(signal.SIGHUP, lambda *_: setattr(self, "_reload", True))
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, lambda *_: setattr(self, "_stop", True))
+        log.info("supervisor pid %s: %s workers on %s:%s (%s)", os.getpid(), self.workers, self.host, self.port,
+                 "SO_REUSEPORT" if self.reuseport else "shared socket")
+        try:
+            for slot in range(self.workers):
+                self._procs[slot] = self._start(slot, wait=False)
+            while not self._stop:
+                time.sleep(0.2)
+                if self._reload:
+                    self._reload = False
+                    self.reload()
+                self._replace_dead()
+        finally:
+            self.shutdown()
+        if self.failed:
+            sys.exit(1)
+
+    def reload(self) -> None:
+        """Rolling restart; at every point at least `workers - 1` old or new workers are serving."""
+        log.info("reload: restarting %s workers one by one", len(self._procs))
+        for slot in sorted(self._procs):
+            if self._stop:
+                return
+            fresh = self._start(slot, wait=True)
+            if fresh is None:
+                log.error("reload abandoned: the new worker for slot %s did not start", slot)
+                return
+            old, self._procs[slot] = self._procs[slot], fresh
+            self._retire(old)
+        log.info("reload complete")
+
+    def shutdown(self) -> None:
+        for p in self._procs.values():
+            if p.is_alive():
+                p.terminate()
+        deadline = time.monotonic() + self.drain + 5
+        for p in self._procs.values():
+            p.join(max(0.0, deadline - time.monotonic()))
+            if p.is_alive():
+                p.kill()
+                p.join()
+        self._procs.clear()
+        if self._sock is not None:
+            self._sock.close()
+        if self._own_metrics_dir:
+            shutil.rmtree(self.metrics_dir, ignore_errors=True)
+        log.info("supervisor stopped")
+
+    # --- workers ---
+
+    def _start(self, slot: int, wait: bool) -> Optional[mp.Process]:
+        ready = self._ctx.Event()
+        os.environ["MCP_WORKER_ID"] = str(slot)          # spawn copies the environment as of start()
+        p = self._ctx.Process(target=_worker_main, name=f"mcp-worker-{slot}", daemon=False,
+                              args=(self._sock, self.host, self.port, self.drain, ready))
+        p.start()
+        del os.environ["MCP_WORKER_ID"]
+        self._started[slot] = time.monotonic()
+        self._respawn_at.pop(slot, None)
+        self._ready[p.pid] = ready
+        log.info("worker %s started (pid %s)", slot, p.pid)
+        if not wait:
+            return p
+        deadline = time.monotonic() + START_TIMEOUT_SECS
+        while not ready.wait(0.2):
+            if not p.is_alive() or self._stop or time.monotonic() > deadline:
+                self._retire(p)
+                return None
+        return p
+
+    def _retire(self, p: mp.Process) -> None:
+        self._ready.pop(p.pid, None)
+        if p.is_alive():
+            p.terminate()                  # uvicorn: stop accepting, finish in-flight within the drain
+            p.join(self.drain + 5)
+        if p.is_alive():
+            log.warning("worker pid %s did not drain in time, killing", p.pid)
+            p.kill()
+            p.join()
+
+    def _replace_dead(self) -> None:
+        now = time.monotonic()
+        for slot, p in list(self._procs.items()):
+            if p.is_alive() or self._stop:
+                continue
+            if slot not in self._respawn_at:
+                self._ready.pop(p.pid, None)
+                quick = now - self._started.get(slot, now) < QUICK_EXIT_SECS
+                n = self._quick_exits[slot] = self._quick_exits.get(slot, 0) + 1 if quick else 0
+                if n >= self.max_quick_exits:
+                    log.error("worker %s exited with %s %s times in a row right after starting; giving up",
+                              slot, p.exitcode, n)
+                    self.failed = self._stop = True
+                    return
+                delay = min(MAX_BACKOFF_SECS, self.backoff * 2 ** (n - 1)) if n else 0.0
+                log.warning("worker %s (pid %s) exited with %s, replacing in %.1fs", slot, p.pid, p.exitcode, delay)
+                self._respawn_at[slot] = now + delay
+            if now >= self._respawn_at[slot]:
+                del self._respawn_at[slot]
+                self._procs[slot] = self._start(slot, wait=False)
+
+    def _prepare_metrics_dir(self) -> None:
+        if not METRICS_ENABLED:
+            return
+        if not self.metrics_dir:
+            self.metrics_dir = tempfile.mkdtemp(prefix="mcp-metrics-")
+            self._own_metrics_dir = True
+        os.makedirs(self.metrics_dir, exist_ok=True)
+        for name in os.listdir(self.metrics_dir):           # snapshots of a previous run
+            if name.startswith("worker-"):
+                os.remove(os.path.join(self.metrics_dir, name))
+        os.environ["WORKER_METRICS_DIR"] = self.metrics_dir
@@ -0,0 +1,25 @@
+package com.mcp.myPayments.config;
+
+import org.springframework.boot.web.servlet.FilterRegistrationBean;
+import org.springframework.context.annotation.Bean;
+import org.springframework.context.annotation.Configuration;
+import org.springframework.web.filter.ShallowEtagHeaderFilter;
+
+/**
+ * ETags (MD5 of the response body) on entity reads, so the MCP server can revalidate its cached
+ * customers / transactions / payments with If-None-Match and get a body-less 304 when nothing changed.
+ */
+@Configuration
+public class EtagConfig {
+
+    @Bean
+    public FilterRegistrationBean<ShallowEtagHeaderFilter> shallowEtagHeaderFilter() {
+        FilterRegistrationBean<ShallowEtagHeaderFilter> reg = new FilterRegistrationBean<>(new ShallowEtagHeaderFilter());
+        reg.addUrlPatterns(
+                "/api/v1/service/customers/*",
+                "/api/v1/service/transactions/*",
+                "/api/v1/service/payments/*");
+        reg.setName("etagFilter");
+        return reg;
+    }
+}